@@ -0,0 +1,116 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class InvalidPage(ValueError):
+    pass
+
+
+class CommentCursorPagination:
+    """
+    Keyset pagination over (position_field, id), newest first; position_field is `created` for comments.
+
+    A page is read with `WHERE created <= c AND (created < c OR id < i) ORDER BY created DESC, id DESC LIMIT n`,
+    which seeks the (created, id) index instead of skipping rows like OFFSET, so every page costs the same.
+    Cursors are opaque base64 tokens holding the boundary row and the direction.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    position_field = 'created'
+    default_page_size_setting = 'COMMENT_PAGE_SIZE'
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        queryset = queryset.order_by()
+        field = self.position_field
+
+        if cursor is None:
+            rows = list(queryset.order_by(f'-{field}', '-id')[:self.page_size + 1])
+            self.has_next, self.has_previous = len(rows) > self.page_size, False
+            rows = rows[:self.page_size]
+        elif cursor['reverse']:
+            # Rows newer than the cursor, read oldest first and flipped back
+            created, id = cursor['created'], cursor['id']
+            queryset = queryset.filter(Q(**{f'{field}__gte': created}) & (Q(**{f'{field}__gt': created}) | Q(id__gt=id)))
+            rows = list(queryset.order_by(field, 'id')[:self.page_size + 1])
+            self.has_next, self.has_previous = True, len(rows) > self.page_size
+            rows = rows[:self.page_size][::-1]
+        else:
+            created, id = cursor['created'], cursor['id']
+            queryset = queryset.filter(Q(**{f'{field}__lte': created}) & (Q(**{f'{field}__lt': created}) | Q(id__lt=id)))
+            rows = list(queryset.order_by(f'-{field}', '-id')[:self.page_size + 1])
+            self.has_next, self.has_previous = len(rows) > self.page_size, True
+            rows = rows[:self.page_size]
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            default = getattr(settings, self.default_page_size_setting)
+            page_size = int(request.query_params.get(self.page_size_query_param, default))
+        except ValueError:
+            raise InvalidPage(f'{self.page_size_query_param} must be an integer')
+        if not 1 <= page_size <= settings.COMMENT_MAX_PAGE_SIZE:
+            raise InvalidPage(f'{self.page_size_query_param} must be between 1 and {settings.COMMENT_MAX_PAGE_SIZE}')
+        return page_size
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Paged past the end: the previous page starts from the first page
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, row, reverse):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_paginated_response_data(self, data, message='successful'):
+        return {
+            'status': 'true',
+            'message': message,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'payload': data
+        }
+
+    def encode_cursor(self, row, reverse):
+        # Rows are model instances or `.values()` dicts
+        field = self.position_field
+        created, id = (row[field], row['id']) if isinstance(row, dict) else (getattr(row, field), row.id)
+        position = {'c': created.isoformat(), 'i': id, 'r': int(reverse)}
+        return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token):
+        if not token:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            return {
+                'created': datetime.fromisoformat(position['c']),
+                'id': int(position['i']),
+                'reverse': bool(position.get('r'))
+            }
+        except (ValueError, TypeError, KeyError):
+            raise InvalidPage('Invalid cursor')
+
+
+class AnalysisCursorPagination(CommentCursorPagination):
+    """Analyses of one comment, newest first, through the (comment, -analyzed_at) index."""
+    position_field = 'analyzed_at'
+    default_page_size_setting = 'COMMENT_ANALYSES_PAGE_SIZE'
@@ -1,5 +1,13 @@
-from rest_framework.serializers import ModelSerializer
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.serializers import (
+    CharField, ChoiceField, DateField, DateTimeField, DictField, IntegerField, ListField, ListSerializer, ModelSerializer, Serializer
+)
 
+from app.comments.enums import AGENT_STATUS
 from app.comments.models import Comment, CommentAnalyzer, CommentQualityScore
 
 
@@ -15,10 +23,72 @@ class CommentQualityScoreSerializer(ModelSerializer):
         exclude = ['comment']  # Exclude the foreign key to avoid recursion
 
 
+class CommentBulkCreateSerializer(ListSerializer):
+    """
+    Validates each comment on its own so one bad item does not reject the whole batch.
+    Invalid items are collected in `item_errors`, valid ones are upserted with one bulk_create.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.item_errors = []
+        self.valid_indexes = []
+        self.existing_ids = set()
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of comments.']})
+        if not data:
+            raise ValidationError({'non_field_errors': ['This list may not be empty.']})
+        if self.max_length is not None and len(data) > self.max_length:
+            raise ValidationError({'non_field_errors': [f'Ensure this list has at most {self.max_length} comments.']})
+
+        validated = []
+        self.item_errors = []
+        self.valid_indexes = []
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.child.run_validation(item))
+                self.valid_indexes.append(index)
+            except ValidationError as e:
+                self.item_errors.append({'index': index, 'errors': e.detail})
+        return validated
+
+    def create(self, validated_data):
+        """
+        Upserts on (source, content_id). Returns one comment per validated item; comments that were
+        already stored are listed in `existing_ids` and must not be sent to the agent again.
+        """
+        objs = [Comment(**item) for item in validated_data]
+
+        # A key sent twice in the same payload is inserted once
+        unique = {}
+        for obj in objs:
+            unique.setdefault((obj.source, obj.content_id), obj)
+
+        _, self.existing_ids = Comment.objects.upsert(list(unique.values()))
+        return [unique[(obj.source, obj.content_id)] for obj in objs]
+
+    @property
+    def created_objects(self):
+        """Newly inserted comments, once each, in request order."""
+        seen = set(self.existing_ids)
+        created = []
+        for obj in self.instance or []:
+            if obj.id not in seen:
+                seen.add(obj.id)
+                created.append(obj)
+        return created
+
+
 class CommentCreateSerializer(ModelSerializer):
     class Meta:
         model = Comment
+        list_serializer_class = CommentBulkCreateSerializer
+        # Duplicates of (source, content_id) are resolved by the views/upsert instead of failing validation
+        validators = []
         fields = [
+            'source',
             'customer_id',
             'product_name',
             'content_id',
@@ -29,16 +99,142 @@ class CommentCreateSerializer(ModelSerializer):
         ]
 
 
+class CommentStoredSerializer(CommentCreateSerializer):
+    """A created or replayed comment: the submitted fields and the id it is stored under."""
+
+    class Meta(CommentCreateSerializer.Meta):
+        fields = ['id'] + CommentCreateSerializer.Meta.fields
+
+
 class CommentListSerializer(ModelSerializer):
     class Meta:
         model = Comment
-        fields = '__all__'
+        exclude = ['idempotency_key']  # Private to the client that sent it
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class LeanListSerializer:
+    """
+    Read-only fast path for list endpoints. Serializes `.values()` rows with the field objects of
+    `serializer_class`, so the output matches the ModelSerializer without building a model instance,
+    a serializer or a ReturnDict per row. `fields` (e.g. from `?fields=id,status`) limits both
+    the output and the selected columns.
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        declared = serializer_class().fields
+        if fields:
+            names = [name.strip() for name in fields.split(',') if name.strip()]
+            unknown = [name for name in names if name not in declared]
+            if unknown:
+                raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+        else:
+            names = list(declared)
+
+        self.fields = [(name, declared[name].source, self.representation(declared[name])) for name in names]
+
+    @staticmethod
+    def representation(field):
+        """
+        The field's to_representation, except for ISO 8601 DateTimeFields whose timezone is resolved
+        once per page instead of once per value.
+        """
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if not isinstance(field, DateTimeField) or output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+        def to_representation(value):
+            if isinstance(value, str):
+                return value
+            if field_timezone is not None and timezone.is_aware(value):
+                value = value.astimezone(field_timezone)
+            else:
+                value = field.enforce_timezone(value)
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return to_representation
+
+    @property
+    def columns(self):
+        return [source for _, source, _ in self.fields]
+
+    def to_representation(self, rows):
+        return [
+            {
+                name: None if row[source] is None else to_representation(row[source])
+                for name, source, to_representation in self.fields
+            }
+            for row in rows
+        ]
 
 
 class CommentDetailSerializer(ModelSerializer):
-    analyzers = CommentAnalyzerSerializer(many=True, read_only=True)
+    # Only the latest analysis (prefetched to `latest_analyzers`), the history is paginated on comments/<id>/analyses
+    analyzers = CommentAnalyzerSerializer(source='latest_analyzers', many=True, read_only=True)
     quality_score = CommentQualityScoreSerializer(read_only=True)
 
     class Meta:
         model = Comment
-        fields = '__all__'
+        exclude = ['idempotency_key']
+
+
+class CommentBulkTransitionSerializer(Serializer):
+    ids = ListField(child=IntegerField(min_value=1), allow_empty=False, max_length=settings.COMMENT_BULK_MAX_ITEMS)
+
+    def validate_ids(self, value):
+        # Each comment is reported once, in request order
+        return list(dict.fromkeys(value))
+
+
+class CommentBulkApproveSerializer(CommentBulkTransitionSerializer):
+    responses = DictField(child=CharField(max_length=5000), required=False, default=dict)
+
+    def validate(self, attrs):
+        responses = {}
+        for key, text in attrs['responses'].items():
+            try:
+                responses[int(key)] = text
+            except ValueError:
+                raise ValidationError({'responses': [f'Invalid comment id: {key}']})
+
+        unknown = set(responses) - set(attrs['ids'])
+        if unknown:
+            raise ValidationError({'responses': [f'Ids not in ids: {sorted(unknown)}']})
+        attrs['responses'] = responses
+        return attrs
+
+
+class CommentBulkStatusSerializer(CommentBulkTransitionSerializer):
+    status = ChoiceField(choices=AGENT_STATUS)
+
+
+class CommentBatchQuerySerializer(Serializer):
+    ids = CharField()  # ?ids=3,1,2
+
+    def validate_ids(self, value):
+        try:
+            ids = [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise ValidationError('ids must be comma-separated integers')
+        if not ids:
+            raise ValidationError('At least one id is required')
+        if len(ids) > settings.COMMENT_BATCH_MAX_IDS:
+            raise ValidationError(f'Ensure there are at most {settings.COMMENT_BATCH_MAX_IDS} ids')
+        # Each comment is returned once, in request order
+        return list(dict.fromkeys(ids))
+
+
+class CommentAnalyticsQuerySerializer(Serializer):
+    product_name = CharField(max_length=100, required=False)
+    date_from = DateField(required=False)
+    date_to = DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get('date_from') and attrs.get('date_to') and attrs['date_from'] > attrs['date_to']:
+            raise ValidationError({'date_to': ['date_to must not be before date_from']})
+        return attrs
@@ -1,9 +1,23 @@
 from django.urls import path
 from app.comments.api.views import (
     CommentAPIView,
+    CommentAnalysesAPIView,
+    CommentAnalyticsAPIView,
+    CommentBatchAPIView,
+    CommentBulkCreateAPIView,
+    CommentClustersAPIView,
+    CommentExportAPIView,
+    CommentIngestAPIView,
+    CommentSearchAPIView,
+    KeywordCommentsAPIView,
+    TopKeywordsAPIView,
+    TrendingAPIView,
+    TrendingAlertsAPIView,
     UpdateAnsweredCommentsAPIView,
     CommentsByStatusAPIView,
     ApproveCommentAPIView,
+    BulkApproveCommentsAPIView,
+    BulkUpdateAnsweredCommentsAPIView,
     CommentDetailAPIView
 )
 
@@ -13,8 +27,22 @@ app_name = 'comments'
 
 urlpatterns = [
     path('', CommentAPIView.as_view(), name='tasks'),
+    path('bulk', CommentBulkCreateAPIView.as_view(), name='comments_bulk_create'),
+    path('ingest', CommentIngestAPIView.as_view(), name='comments_ingest'),
+    path('export', CommentExportAPIView.as_view(), name='comments_export'),
+    path('search', CommentSearchAPIView.as_view(), name='comments_search'),
+    path('keywords', KeywordCommentsAPIView.as_view(), name='keyword_comments'),
+    path('keywords/top', TopKeywordsAPIView.as_view(), name='top_keywords'),
+    path('analytics', CommentAnalyticsAPIView.as_view(), name='comments_analytics'),
+    path('trending', TrendingAPIView.as_view(), name='comments_trending'),
+    path('trending/alerts', TrendingAlertsAPIView.as_view(), name='comments_trending_alerts'),
+    path('clusters', CommentClustersAPIView.as_view(), name='comments_clusters'),
+    path('batch', CommentBatchAPIView.as_view(), name='comments_batch'),
     path('<int:comment_id>', CommentDetailAPIView.as_view(), name='comment_detail'),
+    path('<int:comment_id>/analyses', CommentAnalysesAPIView.as_view(), name='comment_analyses'),
     path('status/filter', CommentsByStatusAPIView.as_view(), name='comments_by_status'),
     path('approve', ApproveCommentAPIView.as_view(), name='approve_comment'),
+    path('approve/bulk', BulkApproveCommentsAPIView.as_view(), name='approve_comments_bulk'),
     path('update/answered', UpdateAnsweredCommentsAPIView.as_view(), name='update_answered_comments'),
+    path('update/answered/bulk', BulkUpdateAnsweredCommentsAPIView.as_view(), name='update_answered_comments_bulk'),
 ]
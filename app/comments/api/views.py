@@ -1,33 +1,88 @@
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Prefetch, Sum, Window
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from app.comments.api.serializers import CommentCreateSerializer, CommentListSerializer, CommentDetailSerializer
-from app.comments.models import Comment
+from app.comments.api.paginations import AnalysisCursorPagination, CommentCursorPagination, InvalidPage
+from app.comments.api.serializers import (
+    CommentAnalyzerSerializer,
+    CommentCreateSerializer,
+    CommentListSerializer,
+    CommentStoredSerializer,
+    CommentDetailSerializer,
+    CommentAnalyticsQuerySerializer,
+    CommentBatchQuerySerializer,
+    CommentBulkApproveSerializer,
+    CommentBulkStatusSerializer,
+    InvalidFields,
+    LeanListSerializer
+)
+from app.comments import caching, export, metrics, trending
+from app.comments.filters import CommentFilter
+from app.comments.ingest import ingest_ndjson
+from app.comments.enums import ROLLUP_DIMENSIONS, TERM_KINDS
+from app.comments.models import (
+    Comment, CommentAnalyzer, CommentClusterMember, CommentTerm, ProductDailyBreakdown, ProductDailyRollup, Term
+)
+from app.comments.search import search_comments, search_terms
+from app.comments.terms import term_key
+from app.comments.transitions import IllegalTransition, transition, bulk_transition, current_status
+from app.core import tracing
+from app.core.api.conditional import make_etag, not_modified, set_validators
 from integrations.ai.agents.agent_comment.langchain import creator
 
 
+# Fields that must match for an Idempotency-Key to replay the comment it was first sent with
+IDEMPOTENT_FIELDS = ['source', 'content_id', 'content']
+
+
 class CommentAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, *args, **kwargs):
-        query = Comment.objects.all()
-        serializer = CommentListSerializer(query, many=True)
-
-        resp = {
-            'status': 'true',
-            'message': 'successful',
-            'payload': serializer.data
-        }
-        response = Response(data=resp, status=status.HTTP_200_OK)
-        return response
+        return paginated_response(request, Comment.objects.all())
 
     def post(self, request, *args, **kwargs):
+        idempotency_key = request.headers.get('Idempotency-Key')
         serializer = CommentCreateSerializer(data=request.data)
 
         if serializer.is_valid():
-            obj = serializer.save()
+            data = serializer.validated_data
+            if idempotency_key:
+                existing = Comment.objects.filter(idempotency_key=idempotency_key).first()
+                if existing:
+                    return self.key_response(existing, data)
+
+            existing = Comment.objects.filter(source=data.get('source', ''), content_id=data['content_id']).first()
+            if existing:
+                return self.existing_response(existing)
+
+            try:
+                with transaction.atomic():
+                    obj = serializer.save(idempotency_key=idempotency_key or None)
+            except IntegrityError:
+                # A concurrent request with the same (source, content_id), or the same key, won the race
+                existing = Comment.objects.filter(
+                    source=data.get('source', ''), content_id=data['content_id']
+                ).order_by('id').first()
+                if existing is not None:
+                    return self.existing_response(existing)
+                if idempotency_key:
+                    existing = Comment.objects.filter(idempotency_key=idempotency_key).order_by('id').first()
+                if existing is None:
+                    raise
+                return self.key_response(existing, data)
+
+            tracing.current_span().set_attribute('comment.id', obj.id)
+            metrics.COMMENTS_INGESTED.labels(endpoint='single').inc()
 
             ## LLM Request
             creator.create(obj.id, obj.content)
@@ -35,7 +90,7 @@ class CommentAPIView(APIView):
             resp = {
                 'status': 'true',
                 'message': 'successful',
-                'payload': serializer.data
+                'payload': CommentStoredSerializer(obj).data
             }
             response = Response(data=resp, status=status.HTTP_201_CREATED)
             return response
@@ -47,6 +102,484 @@ class CommentAPIView(APIView):
         }
         return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
 
+    def key_response(self, comment, data):
+        """
+        Replays the comment an Idempotency-Key was first used for. A key sent again with another comment is a client
+        error: 422 instead of the unrelated stored comment.
+        """
+        if any(getattr(comment, field) != data.get(field, '') for field in IDEMPOTENT_FIELDS):
+            resp = {
+                'status': 'false',
+                'message': 'Idempotency-Key was already used for another comment',
+                'payload': {'id': comment.id}
+            }
+            return Response(data=resp, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        return self.existing_response(comment)
+
+    def existing_response(self, comment):
+        """Duplicate submissions return the stored comment without running the agent again."""
+        tracing.current_span().set_attribute('comment.id', comment.id)
+        resp = {
+            'status': 'true',
+            'message': 'Comment already exists',
+            'payload': CommentStoredSerializer(comment).data
+        }
+        return Response(data=resp, status=status.HTTP_200_OK, headers={'Idempotent-Replayed': 'true'})
+
+
+class CommentBulkCreateAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CommentCreateSerializer(data=request.data, many=True, max_length=settings.COMMENT_BULK_MAX_ITEMS)
+
+        if not serializer.is_valid():
+            resp = {
+                'status': 'false',
+                'message': 'error',
+                'payload': serializer.errors
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        objs = serializer.save() if serializer.validated_data else []
+        created = serializer.created_objects if objs else []
+        tracing.current_span().set_attribute('comment.count', len(created))
+        metrics.COMMENTS_INGESTED.labels(endpoint='bulk').inc(len(created))
+
+        ## LLM Request, processed in batches. Already stored comments are not sent again.
+        creator.enqueue_many([(obj.id, obj.content) for obj in created])
+
+        items = []
+        pending = {obj.id for obj in created}
+        for index, obj in zip(serializer.valid_indexes, objs):
+            items.append({'index': index, 'id': obj.id, 'status': 'created' if obj.id in pending else 'existing'})
+            pending.discard(obj.id)
+
+        resp = {
+            'status': 'true' if objs else 'false',
+            'message': 'successful' if objs else 'error',
+            'payload': {
+                'created': len(created),
+                'existing': len(objs) - len(created),
+                'failed': len(serializer.item_errors),
+                'items': items,
+                'errors': serializer.item_errors
+            }
+        }
+        return Response(data=resp, status=status.HTTP_201_CREATED if objs else status.HTTP_400_BAD_REQUEST)
+
+
+class CommentIngestAPIView(APIView):
+    """
+    Streams an NDJSON upload (one comment per line) into the database in chunks and
+    streams back one progress line per chunk followed by a summary line.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        try:
+            chunk_size = int(request.query_params.get('chunk_size', settings.COMMENT_INGEST_CHUNK_SIZE))
+        except ValueError:
+            chunk_size = 0
+
+        if not 1 <= chunk_size <= settings.COMMENT_BULK_MAX_ITEMS:
+            resp = {
+                'status': 'false',
+                'message': f'chunk_size must be between 1 and {settings.COMMENT_BULK_MAX_ITEMS}',
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        # The raw request stream, read line by line so the upload is never buffered as a whole
+        stream = request.stream
+        if stream is None:
+            resp = {
+                'status': 'false',
+                'message': 'Request body is required',
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        events = ingest_ndjson(stream, chunk_size, parent=tracing.capture_context())
+        lines = (json.dumps(event, ensure_ascii=False) + '\n' for event in events)
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson', status=status.HTTP_200_OK)
+
+
+class CommentExportAPIView(APIView):
+    """
+    Streams every comment matching the CommentFilter query parameters with its latest analysis and quality score,
+    as CSV or NDJSON (?output=), optionally zstd compressed (?compression=zstd). Rows are read and written in chunks,
+    so memory does not grow with the size of the export.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get('output', 'csv')
+        compression = request.query_params.get('compression') or None
+        message = None
+        if output not in export.FORMATS:
+            message = f'output must be one of: {", ".join(export.FORMATS)}'
+        elif compression is not None and compression not in export.COMPRESSIONS:
+            message = f'compression must be one of: {", ".join(export.COMPRESSIONS)}'
+        if message is not None:
+            resp = {
+                'status': 'false',
+                'message': message,
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        filterset = CommentFilter(request.query_params, queryset=Comment.objects.all())
+        if not filterset.is_valid():
+            resp = {
+                'status': 'false',
+                'message': 'error',
+                'payload': filterset.errors
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type, extension = export.FORMATS[output]
+        if compression:
+            content_type, compressed_extension = export.COMPRESSIONS[compression]
+            extension = f'{extension}.{compressed_extension}'
+        response = StreamingHttpResponse(
+            export.export_chunks(filterset.qs, output, compression, settings.COMMENT_EXPORT_CHUNK_SIZE),
+            content_type=content_type,
+            status=status.HTTP_200_OK
+        )
+        filename = f'comments-{timezone.now():%Y%m%d%H%M%S}.{extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class CommentSearchAPIView(APIView):
+    """Full-text search over comment content, response and product name, best matches first."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        if not search_terms(query):
+            resp = {
+                'status': 'false',
+                'message': 'q parameter is required',
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = int(request.query_params.get('limit', settings.COMMENT_SEARCH_LIMIT))
+            if not 1 <= limit <= settings.COMMENT_MAX_PAGE_SIZE:
+                raise ValueError
+            serializer = LeanListSerializer(CommentListSerializer, fields=request.query_params.get('fields'))
+        except InvalidFields as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            resp = {
+                'status': 'false',
+                'message': f'limit must be between 1 and {settings.COMMENT_MAX_PAGE_SIZE}',
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        matches = search_comments(query, limit)
+        tracing.current_span().set_attribute('search.results', len(matches))
+
+        columns = list(dict.fromkeys(serializer.columns + ['id']))
+        rows = {row['id']: row for row in Comment.objects.filter(id__in=[id for id, _ in matches]).values(*columns)}
+        found = [(rows[id], score) for id, score in matches if id in rows]
+        payload = serializer.to_representation(row for row, _ in found)
+        for item, (_, score) in zip(payload, found):
+            # bm25 is lower for better matches; exposed so that higher is better
+            item['score'] = None if score is None else round(-score, 4)
+
+        resp = {
+            'status': 'true',
+            'message': 'successful',
+            'payload': payload
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
+
+def term_kind(request):
+    """The ?kind= of a term endpoint, None for every kind. Raises ValueError for an unknown kind."""
+    kind = request.query_params.get('kind') or None
+    if kind is not None and kind not in dict(TERM_KINDS):
+        raise ValueError(f'Invalid kind: {kind}. Valid kinds: {", ".join(dict(TERM_KINDS))}')
+    return kind
+
+
+def term_limit(request):
+    message = f'limit must be between 1 and {settings.COMMENT_MAX_PAGE_SIZE}'
+    try:
+        limit = int(request.query_params.get('limit', settings.COMMENT_TOP_TERMS_LIMIT))
+    except ValueError:
+        raise ValueError(message)
+    if not 1 <= limit <= settings.COMMENT_MAX_PAGE_SIZE:
+        raise ValueError(message)
+    return limit
+
+
+class KeywordCommentsAPIView(APIView):
+    """Comments whose analyses name a keyword or issue, read through the term index and paginated like the comment list."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        key = term_key(request.query_params.get('keyword'))
+        try:
+            if not key:
+                raise ValueError('keyword parameter is required')
+            kind = term_kind(request)
+        except ValueError as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        terms = Term.objects.filter(key=key)
+        if kind:
+            terms = terms.filter(kind=kind)
+        links = CommentTerm.objects.filter(term__in=terms).values('comment_id')
+        return paginated_response(request, Comment.objects.filter(id__in=links))
+
+
+class TopKeywordsAPIView(APIView):
+    """Terms named in the most comments, optionally of one product and one kind."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            kind = term_kind(request)
+            limit = term_limit(request)
+        except ValueError as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        return caching.cached_response(
+            request, [caching.LISTS], lambda: self.build(request.query_params.get('product_name'), kind, limit)
+        )
+
+    def build(self, product_name, kind, limit):
+        links = CommentTerm.objects.all()
+        if product_name:
+            # Comments of the product come from their index, their terms from the (comment, term) constraint
+            links = links.filter(comment__product_name=product_name)
+        if kind:
+            links = links.filter(term__kind=kind)
+        rows = links.values('term_id', 'term__kind', 'term__name').annotate(
+            comments=Count('comment_id')
+        ).order_by('-comments', 'term__name')[:limit]
+
+        resp = {
+            'status': 'true',
+            'message': 'successful',
+            'payload': [
+                {'kind': row['term__kind'], 'name': row['term__name'], 'comments': row['comments']} for row in rows
+            ]
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
+
+class TrendingAPIView(APIView):
+    """Most frequent keywords and issues of the current sliding window, from the in-memory trending detector."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            kind = term_kind(request)
+            limit = term_limit(request)
+        except ValueError as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        detector = trending.get_detector()
+        window_start, window_end = detector.window_bounds()
+        resp = {
+            'status': 'true',
+            'message': 'successful',
+            'payload': {
+                'window_start': window_start,
+                'window_end': window_end,
+                'heavy_hitters': detector.heavy_hitters(request.query_params.get('product_name'), kind, limit),
+            }
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
+
+class TrendingAlertsAPIView(APIView):
+    """Latest keywords and issues flagged as trending, newest first."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = term_limit(request)
+        except ValueError as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        resp = {
+            'status': 'true',
+            'message': 'successful',
+            'payload': trending.get_detector().recent_alerts(request.query_params.get('product_name'), limit)
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
+
+class CommentClustersAPIView(APIView):
+    """
+    Issue clusters of negative comments, largest first, with their most frequent keywords and the comments
+    closest to their centroid. Optionally limited to the comments of one product. Three queries.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            representatives = int(request.query_params.get('representatives', 3))
+            if not 1 <= representatives <= 20:
+                raise ValueError
+        except ValueError:
+            resp = {
+                'status': 'false',
+                'message': 'representatives must be between 1 and 20',
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        return caching.cached_response(
+            request, [caching.LISTS],
+            lambda: self.build(request.query_params.get('product_name'), representatives)
+        )
+
+    def build(self, product_name, representatives):
+        members = CommentClusterMember.objects.all()
+        terms = CommentTerm.objects.filter(term__kind='keyword', comment__cluster_membership__isnull=False)
+        if product_name:
+            members = members.filter(comment__product_name=product_name)
+            terms = terms.filter(comment__product_name=product_name)
+
+        clusters = {
+            row['cluster_id']: {'id': row['cluster_id'], 'size': row['size'], 'keywords': [], 'representatives': []}
+            for row in members.values('cluster_id').annotate(size=Count('id')).order_by('-size', 'cluster_id')
+        }
+        for row in terms.values(cluster_id=F('comment__cluster_membership__cluster_id'), name=F('term__name')).annotate(
+            comments=Count('comment_id')
+        ).order_by('-comments', 'name'):
+            keywords = clusters[row['cluster_id']]['keywords']
+            if len(keywords) < 5:
+                keywords.append(row['name'])
+        for row in members.annotate(
+            rank=Window(RowNumber(), partition_by=[F('cluster_id')], order_by=F('similarity').desc())
+        ).filter(rank__lte=representatives).values(
+            'cluster_id', 'comment_id', 'similarity', 'comment__product_name', 'comment__content'
+        ).order_by('cluster_id', 'rank'):
+            clusters[row['cluster_id']]['representatives'].append({
+                'id': row['comment_id'],
+                'product_name': row['comment__product_name'],
+                'content': row['comment__content'],
+                'similarity': row['similarity'],
+            })
+
+        resp = {
+            'status': 'true',
+            'message': 'successful',
+            'payload': list(clusters.values())
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
+
+def average(total, count):
+    return round(total / count, 2) if count else None
+
+
+class CommentAnalyticsAPIView(APIView):
+    """
+    Sentiment, category and urgency distributions, average scores and a daily series of the analyses,
+    optionally of one product and a range of comment creation days. Only the rollup tables are read, two queries.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        serializer = CommentAnalyticsQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            resp = {
+                'status': 'false',
+                'message': 'error',
+                'payload': serializer.errors
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        return caching.cached_response(request, [caching.LISTS], lambda: self.build(serializer.validated_data))
+
+    def build(self, params):
+        filters = {}
+        if params.get('product_name'):
+            filters['product_name'] = params['product_name']
+        if params.get('date_from'):
+            filters['day__gte'] = params['date_from']
+        if params.get('date_to'):
+            filters['day__lte'] = params['date_to']
+
+        days = list(ProductDailyRollup.objects.filter(**filters).values('day').annotate(
+            analyses_sum=Sum('analyses'),
+            score_sum=Sum('sentiment_score_sum'),
+            quality_count_sum=Sum('quality_count'),
+            overall_sum=Sum('quality_overall_sum')
+        ).order_by('day'))
+        breakdown = ProductDailyBreakdown.objects.filter(**filters).values('dimension', 'value').annotate(
+            analyses_sum=Sum('analyses'),
+            score_sum=Sum('sentiment_score_sum')
+        ).order_by('dimension', '-analyses_sum', 'value')
+
+        analyses = sum(day['analyses_sum'] for day in days)
+        quality_count = sum(day['quality_count_sum'] for day in days)
+        payload = {
+            'analyses': analyses,
+            'average_sentiment_score': average(sum(day['score_sum'] for day in days), analyses),
+            'quality_count': quality_count,
+            'average_quality_overall': average(sum(day['overall_sum'] for day in days), quality_count),
+            **{dimension: [] for dimension, _ in ROLLUP_DIMENSIONS},
+            'days': [
+                {
+                    'day': day['day'].isoformat(),
+                    'analyses': day['analyses_sum'],
+                    'average_sentiment_score': average(day['score_sum'], day['analyses_sum']),
+                    'average_quality_overall': average(day['overall_sum'], day['quality_count_sum']),
+                }
+                for day in days
+            ],
+        }
+        for row in breakdown:
+            payload[row['dimension']].append({
+                'value': row['value'],
+                'analyses': row['analyses_sum'],
+                'average_sentiment_score': average(row['score_sum'], row['analyses_sum']),
+            })
+
+        resp = {
+            'status': 'true',
+            'message': 'successful',
+            'payload': payload
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
 
 class CommentsByStatusAPIView(APIView):
     permission_classes = [AllowAny]
@@ -62,16 +595,54 @@ class CommentsByStatusAPIView(APIView):
             }
             return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
 
-        query = Comment.objects.filter(status=comment_status)
-        serializer = CommentListSerializer(query, many=True)
+        return paginated_response(request, Comment.objects.filter(status=comment_status))
+
+
+def paginated_response(request, queryset):
+    """Cached list page; every comment write invalidates the lists."""
+    return caching.cached_response(request, [caching.LISTS], lambda: build_page(request, queryset))
 
+
+def build_page(request, queryset):
+    """
+    One keyset page of the comments matching the CommentFilter query parameters, newest first, with next/previous
+    cursor links. Only the columns of the `?fields=` sparse fieldset are selected and rows are serialized without model instances.
+    """
+    # Writes bump a comment's `updated`, so the newest one versions every list (one MAX over an index). Deletes
+    # and writes that leave `updated` alone bump the list version of app.comments.caching, read from the cache
+    version = Comment.objects.aggregate(updated=Max('updated'))['updated']
+    etag = make_etag(request, version, *caching.current_versions([caching.LISTS]))
+    response = not_modified(request, etag, version)
+    if response is not None:
+        return set_validators(response, etag, version)
+
+    filterset = CommentFilter(request.query_params, queryset=queryset)
+    if not filterset.is_valid():
         resp = {
-            'status': 'true',
-            'message': 'successful',
-            'payload': serializer.data
+            'status': 'false',
+            'message': 'error',
+            'payload': filterset.errors
         }
-        response = Response(data=resp, status=status.HTTP_200_OK)
-        return response
+        return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+    queryset = filterset.qs
+
+    paginator = CommentCursorPagination()
+    try:
+        serializer = LeanListSerializer(CommentListSerializer, fields=request.query_params.get('fields'))
+        # The cursor is built from created and id, so they are always selected
+        columns = list(dict.fromkeys(serializer.columns + ['created', 'id']))
+        page = paginator.paginate_queryset(queryset.values(*columns), request)
+    except (InvalidPage, InvalidFields) as e:
+        resp = {
+            'status': 'false',
+            'message': str(e),
+            'payload': {}
+        }
+        return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.to_representation(page)
+    response = Response(data=paginator.get_paginated_response_data(data), status=status.HTTP_200_OK)
+    return set_validators(response, etag, version)
 
 
 class UpdateAnsweredCommentsAPIView(APIView):
@@ -98,11 +669,15 @@ class UpdateAnsweredCommentsAPIView(APIView):
             return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            comment = Comment.objects.get(id=comment_id)
-            comment.status = comment_status
-            comment.save()
-
-            serializer = CommentListSerializer(comment)
+            # Conditional UPDATE: only applied when the current status may move to the requested one
+            updated = transition(comment_id, comment_status)
+            if not updated:
+                current = current_status(comment_id)
+                if current is None:
+                    raise Comment.DoesNotExist
+                raise IllegalTransition(comment_status, current)
+
+            serializer = CommentListSerializer(Comment.objects.get(id=comment_id))
             resp = {
                 'status': 'true',
                 'message': 'Comment status updated successfully',
@@ -110,6 +685,14 @@ class UpdateAnsweredCommentsAPIView(APIView):
             }
             return Response(data=resp, status=status.HTTP_200_OK)
 
+        except IllegalTransition as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
         except Comment.DoesNotExist:
             resp = {
                 'status': 'false',
@@ -135,27 +718,21 @@ class ApproveCommentAPIView(APIView):
             return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            comment = Comment.objects.get(id=comment_id)
-
-            # Check if comment is in WAITING_FOR_APPROVE status
-            if comment.status != 'WAITING_FOR_APPROVE':
+            # Only a comment in WAITING_FOR_APPROVE is approved; the check and the write are one UPDATE
+            fields = {'response': comment_response} if comment_response else {}
+            updated = transition(comment_id, 'APPROVED', expected='WAITING_FOR_APPROVE', **fields)
+            if not updated:
+                current = current_status(comment_id)
+                if current is None:
+                    raise Comment.DoesNotExist
                 resp = {
                     'status': 'false',
-                    'message': f'Comment status must be WAITING_FOR_APPROVE. Current status: {comment.status}',
+                    'message': f'Comment status must be WAITING_FOR_APPROVE. Current status: {current}',
                     'payload': {}
                 }
                 return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
 
-            # Update status to APPROVED
-            comment.status = 'APPROVED'
-
-            # Update response if provided
-            if comment_response:
-                comment.response = comment_response
-
-            comment.save()
-
-            serializer = CommentListSerializer(comment)
+            serializer = CommentListSerializer(Comment.objects.get(id=comment_id))
             resp = {
                 'status': 'true',
                 'message': 'Comment approved successfully',
@@ -172,21 +749,176 @@ class ApproveCommentAPIView(APIView):
             return Response(data=resp, status=status.HTTP_404_NOT_FOUND)
 
 
+class BulkUpdateAnsweredCommentsAPIView(APIView):
+    """Moves every listed comment to one status; comments whose status cannot move there are reported."""
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CommentBulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            resp = {
+                'status': 'false',
+                'message': 'error',
+                'payload': serializer.errors
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        ids, target = serializer.validated_data['ids'], serializer.validated_data['status']
+        try:
+            previous, updated = bulk_transition(ids, target)
+        except IllegalTransition as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        return bulk_transition_response(
+            ids, previous, updated, target,
+            'Comment statuses updated successfully',
+            lambda current: str(IllegalTransition(target, current))
+        )
+
+
+class BulkApproveCommentsAPIView(APIView):
+    """Approves every listed comment that is WAITING_FOR_APPROVE, with optional per-id responses."""
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CommentBulkApproveSerializer(data=request.data)
+        if not serializer.is_valid():
+            resp = {
+                'status': 'false',
+                'message': 'error',
+                'payload': serializer.errors
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = serializer.validated_data['ids']
+        previous, updated = bulk_transition(
+            ids, 'APPROVED',
+            expected='WAITING_FOR_APPROVE',
+            responses=serializer.validated_data['responses']
+        )
+        return bulk_transition_response(
+            ids, previous, updated, 'APPROVED',
+            'Comments approved successfully',
+            lambda current: f'Comment status must be WAITING_FOR_APPROVE. Current status: {current}'
+        )
+
+
+def bulk_transition_response(ids, previous, updated, target, message, rejected_message):
+    items = []
+    for id in ids:
+        if id in updated:
+            items.append({'id': id, 'result': 'updated', 'status': target})
+        elif id in previous:
+            items.append({'id': id, 'result': 'rejected', 'status': previous[id], 'message': rejected_message(previous[id])})
+        else:
+            items.append({'id': id, 'result': 'not_found', 'message': 'Comment not found'})
+
+    resp = {
+        'status': 'true' if updated else 'false',
+        'message': message if updated else 'error',
+        'payload': {
+            'updated': len(updated),
+            'failed': len(ids) - len(updated),
+            'items': items
+        }
+    }
+    return Response(data=resp, status=status.HTTP_200_OK if updated else status.HTTP_400_BAD_REQUEST)
+
+
+def with_latest_analysis(queryset):
+    """
+    Comments with their quality score joined and only their latest analysis prefetched to `latest_analyzers`:
+    the sliced Prefetch is one ROW_NUMBER() query over the (comment, -analyzed_at) index for any number of comments.
+    """
+    latest = CommentAnalyzer.objects.order_by('-analyzed_at', '-id')[:1]
+    return queryset.select_related('quality_score').prefetch_related(
+        Prefetch('analyzers', queryset=latest, to_attr='latest_analyzers')
+    )
+
+
+class CommentBatchAPIView(APIView):
+    """
+    Detail payloads of many comments in two queries, in the order of ?ids=; unknown ids are listed in `missing`.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        serializer = CommentBatchQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            resp = {
+                'status': 'false',
+                'message': 'error',
+                'payload': serializer.errors
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = serializer.validated_data['ids']
+        # Any write to one of the comments, or the creation of a missing one, invalidates the batch
+        return caching.cached_response(
+            request, [caching.detail_scope(comment_id) for comment_id in ids], lambda: self.build(ids)
+        )
+
+    def build(self, ids):
+        comments = {
+            comment.id: comment
+            for comment in with_latest_analysis(Comment.objects.filter(id__in=ids)).annotate(
+                analyses_count=Count('analyzers')
+            )
+        }
+        resp = {
+            'status': 'true',
+            'message': 'Comment details retrieved successfully',
+            'payload': {
+                'comments': [
+                    {**CommentDetailSerializer(comments[comment_id]).data, 'analyses_count': comments[comment_id].analyses_count}
+                    for comment_id in ids if comment_id in comments
+                ],
+                'missing': [comment_id for comment_id in ids if comment_id not in comments],
+            }
+        }
+        return Response(data=resp, status=status.HTTP_200_OK)
+
+
 class CommentDetailAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, comment_id, *args, **kwargs):
+        tracing.current_span().set_attribute('comment.id', comment_id)
+        return caching.cached_response(
+            request, [caching.detail_scope(comment_id)], lambda: self.build(request, comment_id)
+        )
+
+    def build(self, request, comment_id):
+        # One aggregate query versions the comment, its analyses and its quality score
+        versions = Comment.objects.filter(id=comment_id).aggregate(
+            updated=Max('updated'),
+            analyzed=Max('analyzers__analyzed_at'),
+            analyses=Count('analyzers'),
+            scored=Max('quality_score__updated')
+        )
+        etag = last_modified = None
+        if versions['updated'] is not None:
+            last_modified = max(value for key, value in versions.items() if key != 'analyses' and value is not None)
+            etag = make_etag(request, *versions.values())
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+
         try:
-            # Prefetch related objects for optimization
-            comment = Comment.objects.prefetch_related('analyzers', 'quality_score').get(id=comment_id)
+            comment = with_latest_analysis(Comment.objects.all()).get(id=comment_id)
 
             serializer = CommentDetailSerializer(comment)
             resp = {
                 'status': 'true',
                 'message': 'Comment details retrieved successfully',
-                'payload': serializer.data
+                'payload': {**serializer.data, 'analyses_count': versions['analyses']}
             }
-            return Response(data=resp, status=status.HTTP_200_OK)
+            return set_validators(Response(data=resp, status=status.HTTP_200_OK), etag, last_modified)
 
         except Comment.DoesNotExist:
             resp = {
@@ -195,3 +927,50 @@ class CommentDetailAPIView(APIView):
                 'payload': {}
             }
             return Response(data=resp, status=status.HTTP_404_NOT_FOUND)
+
+
+class CommentAnalysesAPIView(APIView):
+    """Analysis history of a comment, newest first, paginated by cursor on (analyzed_at, id)."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, comment_id, *args, **kwargs):
+        tracing.current_span().set_attribute('comment.id', comment_id)
+        return caching.cached_response(
+            request, [caching.detail_scope(comment_id)], lambda: self.build(request, comment_id)
+        )
+
+    def build(self, request, comment_id):
+        # Same versions as the detail: one query tells whether the comment exists and whether the history changed
+        versions = Comment.objects.filter(id=comment_id).aggregate(
+            updated=Max('updated'),
+            analyzed=Max('analyzers__analyzed_at'),
+            analyses=Count('analyzers')
+        )
+        if versions['updated'] is None:
+            resp = {
+                'status': 'false',
+                'message': 'Comment not found',
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_404_NOT_FOUND)
+
+        last_modified = max(value for key, value in versions.items() if key != 'analyses' and value is not None)
+        etag = make_etag(request, *versions.values())
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return set_validators(response, etag, last_modified)
+
+        paginator = AnalysisCursorPagination()
+        try:
+            page = paginator.paginate_queryset(CommentAnalyzer.objects.filter(comment_id=comment_id), request)
+        except InvalidPage as e:
+            resp = {
+                'status': 'false',
+                'message': str(e),
+                'payload': {}
+            }
+            return Response(data=resp, status=status.HTTP_400_BAD_REQUEST)
+
+        data = CommentAnalyzerSerializer(page, many=True).data
+        response = Response(data=paginator.get_paginated_response_data(data), status=status.HTTP_200_OK)
+        return set_validators(response, etag, last_modified)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CommentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.comments'
+
+    def ready(self):
+        import app.comments.metrics  # noqa
+        import app.comments.receivers  # noqa
@@ -0,0 +1,108 @@
+import hashlib
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.utils.http import parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from app.comments import metrics
+from app.core.api.conditional import not_modified, set_validators
+
+LISTS = 'lists'
+
+
+def get_cache():
+    return caches[settings.COMMENT_CACHE_ALIAS]
+
+
+def detail_scope(comment_id):
+    return f'comment:{comment_id}'
+
+
+def version_key(scope):
+    return f'comments:version:{scope}'
+
+
+def invalidate(comment_ids=()):
+    """
+    Gives the lists and every given comment a new version token, so their cached responses are never read again.
+    Versions are bumped right away and once more when the transaction commits, so a read that runs
+    before the commit cannot keep the old rows cached under the new version.
+    """
+    scopes = [LISTS] + [detail_scope(comment_id) for comment_id in comment_ids]
+
+    def bump():
+        get_cache().set_many({version_key(scope): uuid.uuid4().hex for scope in scopes}, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def require_shared_cache():
+    """
+    Management commands run in their own process, so the versions they bump only reach the web workers through a
+    shared cache. Raises CommandError when the response cache is enabled on a process-local LocMemCache, where the
+    workers would keep serving the responses the command made stale.
+    """
+    if settings.COMMENT_CACHE_TIMEOUT and isinstance(get_cache(), LocMemCache):
+        raise CommandError(
+            "The comment response cache is process-local (LocMemCache): set CACHE_BACKEND to a shared backend, "
+            "or COMMENT_CACHE_TIMEOUT=0, so the web workers see what this command changes"
+        )
+
+
+def current_versions(scopes):
+    cache = get_cache()
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    # An evicted or never written version starts a new one, which only costs a miss
+    missing = {key: uuid.uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def cached_response(request, scopes, build):
+    """
+    Serves the payload of a read endpoint from the cache when none of its `scopes` changed since it was stored.
+    `build` renders the response on a miss; only 200 responses are stored, with their ETag and Last-Modified,
+    so hits still answer conditional requests with 304. `X-Cache` tells whether the cache was hit.
+    """
+    if not settings.COMMENT_CACHE_TIMEOUT:
+        return build()
+
+    view = request.resolver_match.url_name if request.resolver_match else ''
+    # The stored ETag is negotiated per media type, like make_etag
+    media_type = getattr(request, 'accepted_media_type', '') or ''
+    key = 'comments:response:' + hashlib.md5(
+        '|'.join([request.build_absolute_uri(), media_type] + current_versions(scopes)).encode(), usedforsecurity=False
+    ).hexdigest()
+
+    entry = get_cache().get(key)
+    if entry is not None:
+        metrics.CACHE_REQUESTS.labels(view=view, result='hit').inc()
+        response = not_modified(request, entry['etag'], entry['last_modified'])
+        if response is None:
+            response = Response(data=entry['data'], status=status.HTTP_200_OK)
+        response = set_validators(response, entry['etag'], entry['last_modified'])
+        response['X-Cache'] = 'HIT'
+        return response
+
+    metrics.CACHE_REQUESTS.labels(view=view, result='miss').inc()
+    response = build()
+    if response.status_code == status.HTTP_200_OK and isinstance(response, Response):
+        last_modified = parse_http_date_safe(response.get('Last-Modified', ''))
+        get_cache().set(key, {
+            'data': response.data,
+            'etag': response.get('ETag'),
+            'last_modified': datetime.fromtimestamp(last_modified, tz=timezone.utc) if last_modified else None,
+        }, settings.COMMENT_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
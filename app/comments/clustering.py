@@ -0,0 +1,155 @@
+"""
+Issue clusters of negative comments with mini-batch k-means.
+
+Comments are vectorized without a vocabulary: word unigrams and bigrams of the folded text (content, main issues
+and keywords of the analyses), cut to their first STEM_LENGTH letters, are hashed into COMMENT_CLUSTER_FEATURES signed columns, dampened with log(1 + tf)
+and normalized, so cosine similarity is a dot product. Each batch of comments not clustered yet is assigned to its
+closest centroid, then every centroid moves to the running mean of the comments it absorbed (Sculley's mini-batch
+k-means, on the unit sphere). Comments are clustered once; the corpus is never clustered again from scratch.
+Until COMMENT_CLUSTER_COUNT clusters exist, new centroids are seeded from the batch with k-means++.
+"""
+import re
+import zlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from app.comments.models import Comment, CommentAnalyzer, CommentCluster, CommentClusterMember
+from app.comments.utils import tr_fold
+
+
+# Turkish is agglutinative: the first five letters of a word ("F5" stemming) merge most suffixed forms,
+# e.g. batarya, bataryası and bataryayı
+STEM_LENGTH = 5
+
+
+def ngrams(text):
+    words = [word[:STEM_LENGTH] for word in re.findall(r'\w+', tr_fold(text)) if len(word) > 1]
+    return words + [f'{first} {second}' for first, second in zip(words, words[1:])]
+
+
+def normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors
+
+
+def vectorize(texts, features):
+    """One unit row per text. The hash picks the column and the sign, so collisions cancel out on average."""
+    vectors = np.zeros((len(texts), features), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for gram in ngrams(text):
+            digest = zlib.crc32(gram.encode())
+            vectors[row, digest % features] += 1.0 if digest & 0x80000000 else -1.0
+    vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+    return normalize(vectors)
+
+
+def seed(vectors, centroids, count, rng):
+    """
+    Adds centroids picked among `vectors` until there are `count`, with greedy k-means++: a few candidates are
+    drawn, the further from the closest centroid the likelier, and the one that brings the batch closest to its
+    centroids is kept. Stops early when the rest are duplicates of the centroids.
+    """
+    centroids = list(centroids)
+    candidates = vectors[np.linalg.norm(vectors, axis=1) > 0]
+    if not len(candidates) and not centroids:
+        # Only texts without words: a zero centroid holds them until real ones are seeded
+        candidates = vectors[:1]
+    trials = 2 + int(np.log(count))
+    while len(centroids) < count and len(candidates):
+        if not centroids:
+            centroids.append(candidates[rng.integers(len(candidates))])
+            continue
+        distances = np.clip(1 - (candidates @ np.array(centroids).T).max(axis=1), 0, None)
+        if distances.sum() < 1e-6:
+            break
+        picks = rng.choice(len(candidates), size=trials, p=distances / distances.sum())
+        # Distances of the batch to its closest centroid if each pick were added
+        potentials = [np.minimum(distances, np.clip(1 - candidates @ candidates[pick], 0, None)).sum() for pick in picks]
+        centroids.append(candidates[picks[int(np.argmin(potentials))]])
+    return np.array(centroids, dtype=np.float32).reshape(len(centroids), vectors.shape[1])
+
+
+def update(centroids, absorbed, vectors, labels):
+    """Mini-batch step: a centroid becomes the mean of every comment it absorbed, projected back on the unit sphere."""
+    for cluster in np.unique(labels):
+        members = vectors[labels == cluster]
+        total = absorbed[cluster] + len(members)
+        centroids[cluster] = (centroids[cluster] * absorbed[cluster] + members.sum(axis=0)) / total
+        absorbed[cluster] = total
+    return normalize(centroids)
+
+
+def pending_comments():
+    """Comments with a clustered sentiment that have no cluster yet, oldest first."""
+    clustered_sentiment = CommentAnalyzer.objects.filter(
+        comment=OuterRef('pk'), sentiment__in=settings.COMMENT_CLUSTER_SENTIMENTS
+    )
+    return Comment.objects.filter(Exists(clustered_sentiment), cluster_membership__isnull=True).order_by('id')
+
+
+def comment_texts(comments):
+    """Content of each comment followed by the main issues and keywords of its analyses."""
+    texts = {comment['id']: [comment['content']] for comment in comments}
+    for comment_id, main_issue, keywords in CommentAnalyzer.objects.filter(comment_id__in=texts).values_list(
+        'comment_id', 'main_issue', 'keywords'
+    ):
+        texts[comment_id].extend([main_issue, keywords])
+    return [' '.join(texts[comment['id']]) for comment in comments]
+
+
+def cluster_batch(batch_size=None):
+    """
+    Clusters the next `batch_size` pending comments and moves the centroids towards them, in one transaction
+    and a fixed number of queries. Returns the number of comments clustered, 0 when none is pending.
+    """
+    features = settings.COMMENT_CLUSTER_FEATURES
+    with transaction.atomic():
+        comments = list(pending_comments().values('id', 'content')[:batch_size or settings.COMMENT_CLUSTER_BATCH_SIZE])
+        if not comments:
+            return 0
+        vectors = vectorize(comment_texts(comments), features)
+
+        clusters = list(CommentCluster.objects.order_by('id'))
+        centroids = np.zeros((len(clusters), features), dtype=np.float32)
+        for index, cluster in enumerate(clusters):
+            centroid = np.frombuffer(cluster.centroid, dtype=np.float32)
+            if len(centroid) != features:
+                raise ValueError(
+                    f"Centroids have {len(centroid)} features, COMMENT_CLUSTER_FEATURES is {features}: "
+                    f"run cluster_comments --reset"
+                )
+            centroids[index] = centroid
+        if len(clusters) < settings.COMMENT_CLUSTER_COUNT:
+            # Seeding is reproducible for a given batch
+            rng = np.random.default_rng(comments[0]['id'])
+            centroids = seed(vectors, centroids, settings.COMMENT_CLUSTER_COUNT, rng)
+            clusters += CommentCluster.objects.bulk_create([
+                CommentCluster(centroid=b'') for _ in range(len(centroids) - len(clusters))
+            ])
+
+        similarities = vectors @ centroids.T
+        labels = similarities.argmax(axis=1)
+        absorbed = [cluster.absorbed for cluster in clusters]
+        centroids = update(centroids, absorbed, vectors, labels)
+
+        now = timezone.now()
+        for cluster, centroid, count in zip(clusters, centroids, absorbed):
+            cluster.centroid = centroid.astype(np.float32).tobytes()
+            cluster.absorbed = count
+            cluster.updated = now
+        CommentCluster.objects.bulk_update(clusters, ['centroid', 'absorbed', 'updated'])
+        CommentClusterMember.objects.bulk_create([
+            CommentClusterMember(
+                comment_id=comment['id'],
+                cluster_id=clusters[label].id,
+                similarity=round(float(similarities[index, label]), 4)
+            )
+            for index, (comment, label) in enumerate(zip(comments, labels))
+        ])
+    return len(comments)
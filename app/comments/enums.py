@@ -7,3 +7,16 @@ AGENT_STATUS = [
     ('REJECTED', 'REJECTED'),
     ('ERROR', 'ERROR'),
 ]
+
+# Kinds of terms in the keyword index (app.comments.terms)
+TERM_KINDS = [
+    ('keyword', 'keyword'),
+    ('issue', 'issue'),
+]
+
+# CommentAnalyzer columns broken down per product and day by the analytics rollups (app.comments.rollups)
+ROLLUP_DIMENSIONS = [
+    ('sentiment', 'sentiment'),
+    ('category', 'category'),
+    ('urgency', 'urgency'),
+]
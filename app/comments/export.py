@@ -0,0 +1,103 @@
+import csv
+from itertools import islice
+
+import orjson
+import zstandard
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from app.comments.models import CommentAnalyzer
+
+COMMENT_COLUMNS = [
+    'id', 'source', 'customer_id', 'product_name', 'content_id', 'content', 'web_url', 'response', 'status',
+    'created', 'updated',
+]
+# Latest analysis of the comment, exported as analysis_<field>
+ANALYSIS_FIELDS = [
+    'sentiment', 'sentiment_score', 'category', 'urgency', 'keywords', 'summary', 'main_issue', 'required_action',
+    'response_tone', 'analyzed_at',
+]
+# One-to-one quality score, exported as quality_<field>
+QUALITY_FIELDS = ['professionalism', 'relevance', 'warmth', 'solution_focus', 'overall', 'approved']
+
+COLUMNS = COMMENT_COLUMNS + [f'analysis_{field}' for field in ANALYSIS_FIELDS] + [f'quality_{field}' for field in QUALITY_FIELDS]
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+COMPRESSIONS = {'zstd': ('application/zstd', 'zst')}
+
+
+def export_rows(queryset, chunk_size):
+    """
+    Yields one dict per comment of `queryset`, in id order, with its latest analysis and its quality score.
+    Comments are read with one streaming query (`.iterator()`); each chunk of `chunk_size` comments costs one
+    more query for the latest analyses, so memory holds a single chunk whatever the size of the export.
+    """
+    rows = queryset.order_by('id').values(
+        *COMMENT_COLUMNS, **{f'quality_{field}': F(f'quality_score__{field}') for field in QUALITY_FIELDS}
+    ).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        analyses = {analysis.pop('comment_id'): analysis for analysis in latest_analyses([row['id'] for row in chunk])}
+        empty = dict.fromkeys(ANALYSIS_FIELDS)
+        for row in chunk:
+            analysis = analyses.get(row['id'], empty)
+            row.update((f'analysis_{field}', analysis[field]) for field in ANALYSIS_FIELDS)
+            yield row
+
+
+def latest_analyses(comment_ids):
+    """Newest analysis of each comment, in one query ranked through the (comment, -analyzed_at) index."""
+    return CommentAnalyzer.objects.filter(comment_id__in=comment_ids).annotate(
+        rank=Window(RowNumber(), partition_by=[F('comment_id')], order_by=[F('analyzed_at').desc(), F('id').desc()])
+    ).filter(rank=1).values('comment_id', *ANALYSIS_FIELDS)
+
+
+class Buffer:
+    """File-like object that hands back what csv.writer writes instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def format_value(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def encode_csv(rows, chunk_size):
+    writer = csv.writer(Buffer())
+    yield writer.writerow(COLUMNS).encode()
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield ''.join(writer.writerow([format_value(row[column]) for column in COLUMNS]) for row in chunk).encode()
+
+
+def encode_ndjson(rows, chunk_size):
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield b''.join(orjson.dumps({column: row[column] for column in COLUMNS}) + b'\n' for row in chunk)
+
+
+def compress_zstd(chunks):
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(queryset, export_format, compression=None, chunk_size=2000):
+    """Bytes of the export, one piece per chunk of comments, ready for a StreamingHttpResponse or a file."""
+    rows = export_rows(queryset, chunk_size)
+    chunks = encode_csv(rows, chunk_size) if export_format == 'csv' else encode_ndjson(rows, chunk_size)
+    if compression == 'zstd':
+        chunks = compress_zstd(chunks)
+    return chunks
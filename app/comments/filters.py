@@ -0,0 +1,46 @@
+from django.db.models import Exists, OuterRef
+from django_filters import rest_framework as filters
+
+from app.comments.models import Comment, CommentAnalyzer
+
+# Filters answered by the analyses of a comment, applied together to the same analysis
+ANALYZER_FILTERS = ['sentiment', 'urgency', 'category']
+
+
+class CommentFilter(filters.FilterSet):
+    """
+    Filters of the comment list endpoints. Comment columns and the one-to-one quality score are
+    plain WHERE clauses; analysis filters are one EXISTS subquery, so a comment with several
+    matching analyses is returned once and no join multiplies the page.
+    """
+    status = filters.CharFilter()  # Unknown statuses match nothing, as on status/filter
+    product_name = filters.CharFilter()
+    customer_id = filters.CharFilter()
+    created = filters.IsoDateTimeFromToRangeFilter()  # ?created_after=&created_before=
+
+    sentiment = filters.CharFilter(method='filter_analyzer')
+    urgency = filters.CharFilter(method='filter_analyzer')
+    category = filters.CharFilter(method='filter_analyzer')
+
+    overall_min = filters.NumberFilter(field_name='quality_score__overall', lookup_expr='gte')
+    overall_max = filters.NumberFilter(field_name='quality_score__overall', lookup_expr='lte')
+    approved = filters.BooleanFilter(field_name='quality_score__approved')
+
+    class Meta:
+        model = Comment
+        fields = []
+
+    def filter_analyzer(self, queryset, name, value):
+        # Collected here and applied once in filter_queryset
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        conditions = {
+            name: self.form.cleaned_data[name] for name in ANALYZER_FILTERS if self.form.cleaned_data.get(name)
+        }
+        if conditions:
+            analyzers = CommentAnalyzer.objects.filter(comment=OuterRef('pk'), **conditions)
+            queryset = queryset.filter(Exists(analyzers))
+        return queryset
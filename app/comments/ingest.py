@@ -0,0 +1,89 @@
+import json
+
+from django.db import DatabaseError
+
+from app.comments import metrics
+from app.comments.api.serializers import CommentCreateSerializer
+from app.core import tracing
+from integrations.ai.agents.agent_comment.langchain import creator
+
+
+def ingest_ndjson(lines, chunk_size, parent=None):
+    """
+    Reads comments from an iterable of NDJSON lines and inserts them in chunks of `chunk_size`.
+
+    Only one chunk is held in memory at a time. Every chunk is validated, upserted in its own
+    transaction and its new comments are queued for the agent before the next one is read, so a
+    failing chunk never rolls back the chunks committed before it. Yields a progress event per
+    chunk and a final summary.
+    """
+    totals = {'lines': 0, 'created': 0, 'existing': 0, 'failed': 0, 'chunks': 0}
+    chunk, line_numbers, line_errors = [], [], []
+
+    for line_number, raw in enumerate(lines, 1):
+        totals['lines'] = line_number
+        try:
+            text = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+            if not text.strip():
+                continue
+            chunk.append(json.loads(text))
+            line_numbers.append(line_number)
+        except (UnicodeDecodeError, ValueError) as e:
+            line_errors.append({'line': line_number, 'errors': {'non_field_errors': [f'Invalid JSON: {e}']}})
+
+        if len(chunk) + len(line_errors) >= chunk_size:
+            yield _insert_chunk(chunk, line_numbers, line_errors, totals, parent)
+            chunk, line_numbers, line_errors = [], [], []
+
+    if chunk or line_errors:
+        yield _insert_chunk(chunk, line_numbers, line_errors, totals, parent)
+
+    yield {'event': 'summary', **totals}
+
+
+def _insert_chunk(chunk, line_numbers, line_errors, totals, parent):
+    totals['chunks'] += 1
+    errors = list(line_errors)
+    objs = created = []
+
+    with tracing.span('ingest.chunk', attributes={'chunk.index': totals['chunks']}, parent=parent) as span, \
+            tracing.trace_db_writes():
+        if chunk:
+            serializer = CommentCreateSerializer(data=chunk, many=True)
+            if serializer.is_valid():
+                errors.extend(
+                    {'line': line_numbers[error['index']], 'errors': error['errors']}
+                    for error in serializer.item_errors
+                )
+                try:
+                    objs = serializer.save() if serializer.validated_data else []
+                    created = serializer.created_objects if objs else []
+                except DatabaseError as e:
+                    span.record_exception(e)
+                    errors.extend(
+                        {'line': line_numbers[index], 'errors': {'non_field_errors': [f'Database error: {e}']}}
+                        for index in serializer.valid_indexes
+                    )
+            else:
+                errors.append({'line': line_numbers[0], 'errors': serializer.errors})
+
+        span.set_attribute('comment.count', len(created))
+        if created:
+            metrics.COMMENTS_INGESTED.labels(endpoint='ndjson').inc(len(created))
+            creator.enqueue_many([(obj.id, obj.content) for obj in created])
+
+    errors.sort(key=lambda error: error['line'])
+    totals['created'] += len(created)
+    totals['existing'] += len(objs) - len(created)
+    totals['failed'] += len(errors)
+    return {
+        'event': 'chunk',
+        'chunk': totals['chunks'],
+        'created': len(created),
+        'existing': len(objs) - len(created),
+        'failed': len(errors),
+        'errors': errors,
+        'total_created': totals['created'],
+        'total_existing': totals['existing'],
+        'total_failed': totals['failed'],
+    }
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.comments import caching, clustering
+from app.comments.models import CommentCluster
+
+
+# cd {PROJECT_PATH} && python manage.py cluster_comments (e.g. every few minutes from cron)
+# cd {PROJECT_PATH} && python manage.py cluster_comments --reset --batch-size 512
+class Command(BaseCommand):
+    help = "Clusters the negative comments that have no cluster yet, in mini-batches, and moves the centroids towards them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.COMMENT_CLUSTER_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches")
+        parser.add_argument('--reset', action='store_true', help="Delete every cluster and start again")
+
+    def handle(self, *args, **options):
+        caching.require_shared_cache()
+        if options['reset']:
+            CommentCluster.objects.all().delete()
+            self.stdout.write("Clusters deleted")
+
+        batches = total = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            try:
+                count = clustering.cluster_batch(options['batch_size'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            if not count:
+                break
+            batches += 1
+            total += count
+            self.stdout.write(f"{total} comments clustered")
+
+        if total or options['reset']:
+            # The clusters endpoint is cached with the lists
+            caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"{total} comments clustered in {batches} batches"))
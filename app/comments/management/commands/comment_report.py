@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from app.comments import reports
+
+
+# cd {PROJECT_PATH} && python manage.py comment_report --output reports/weekly
+# cd {PROJECT_PATH} && python manage.py comment_report --output reports/iphone --product-name "iPhone 14 Pro" --from 2026-01-01
+class Command(BaseCommand):
+    help = "Writes the weekly quality, approval turnaround and sentiment reports as static HTML with PNG charts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', required=True, help="Directory of index.html and the charts")
+        parser.add_argument('--product-name', default=None)
+        parser.add_argument('--from', dest='date_from', type=date.fromisoformat, default=None,
+                            help="First comment creation day, YYYY-MM-DD")
+        parser.add_argument('--to', dest='date_to', type=date.fromisoformat, default=None,
+                            help="Last comment creation day, YYYY-MM-DD")
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--no-charts', action='store_true', help="Only write the HTML tables")
+
+    def handle(self, *args, **options):
+        charts = not options['no_charts']
+        if charts and not reports.charts_available():
+            self.stderr.write("matplotlib is not installed, writing the report without charts")
+            charts = False
+
+        built = reports.build_reports(
+            options['product_name'], options['date_from'], options['date_to'], chunk_size=options['chunk_size']
+        )
+        title = f"Comment report - {options['product_name']}" if options['product_name'] else 'Comment report'
+        files = reports.write_report(built, options['output'], charts=charts, title=title)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(built['quality'])} weeks written to {options['output']}: {', '.join(files)}"
+        ))
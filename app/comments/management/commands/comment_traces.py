@@ -0,0 +1,94 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# cd {PROJECT_PATH} && python manage.py comment_traces --comment-id 42
+# cd {PROJECT_PATH} && python manage.py comment_traces --slowest 10
+class Command(BaseCommand):
+    help = "Shows the recorded spans of a comment, or the slowest processed comments with a per-stage breakdown"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None, help="Span file, defaults to TRACING_FILE")
+        parser.add_argument('--comment-id', type=int, default=None, help="Print the span tree of this comment")
+        parser.add_argument('--slowest', type=int, default=10, help="Number of slowest comments to list")
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.TRACING_FILE
+        try:
+            spans = self.load_spans(path)
+        except FileNotFoundError:
+            raise CommandError(f"Span file not found: {path}. Set TRACING_EXPORTER=file to record spans.")
+
+        traces = defaultdict(list)
+        for span in spans:
+            traces[span['traceId']].append(span)
+
+        if options['comment_id'] is not None:
+            self.print_comment(traces, options['comment_id'])
+        else:
+            self.print_slowest(traces, options['slowest'])
+
+    def load_spans(self, path):
+        spans = []
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    spans.append(json.loads(line))
+        return spans
+
+    def print_comment(self, traces, comment_id):
+        matching = [
+            trace_spans for trace_spans in traces.values()
+            if any(span['attributes'].get('comment.id') == comment_id for span in trace_spans)
+        ]
+        if not matching:
+            raise CommandError(f"No spans recorded for comment {comment_id}")
+
+        for trace_spans in matching:
+            self.stdout.write(f"trace {trace_spans[0]['traceId']}")
+            children = defaultdict(list)
+            span_ids = {span['spanId'] for span in trace_spans}
+            for span in trace_spans:
+                parent = span['parentSpanId'] if span['parentSpanId'] in span_ids else ''
+                children[parent].append(span)
+            self.print_tree(children, '', 1)
+
+    def print_tree(self, children, parent_id, depth):
+        for span in sorted(children[parent_id], key=lambda s: s['startTimeUnixNano']):
+            attributes = span['attributes']
+            details = [
+                f"{key}={attributes[key]}"
+                for key in ('llm.model', 'llm.usage.input_tokens', 'llm.usage.output_tokens', 'db.operation', 'http.route')
+                if key in attributes
+            ]
+            if span['status']['code'] == 'ERROR':
+                details.append(f"error={span['status']['message']}")
+            self.stdout.write(f"{'  ' * depth}{span['name']} {duration_ms(span):.1f}ms {' '.join(details)}".rstrip())
+            self.print_tree(children, span['spanId'], depth + 1)
+
+    def print_slowest(self, traces, limit):
+        processed = [
+            (span, trace_spans)
+            for trace_spans in traces.values()
+            for span in trace_spans
+            if span['name'] == 'comment.process'
+        ]
+        processed.sort(key=lambda item: duration_ms(item[0]), reverse=True)
+
+        for span, trace_spans in processed[:limit]:
+            stages = defaultdict(float)
+            for other in trace_spans:
+                if other['name'].startswith(('chain.', 'persistence.', 'queue.')):
+                    stages[other['name']] += duration_ms(other)
+            breakdown = ' '.join(f"{name}={total:.1f}ms" for name, total in sorted(stages.items()))
+            self.stdout.write(
+                f"comment {span['attributes'].get('comment.id')} {duration_ms(span):.1f}ms {breakdown}".rstrip()
+            )
+
+
+def duration_ms(span):
+    return (span['endTimeUnixNano'] - span['startTimeUnixNano']) / 1e6
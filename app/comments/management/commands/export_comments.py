@@ -0,0 +1,43 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from app.comments import export
+from app.comments.filters import CommentFilter
+from app.comments.models import Comment
+
+
+# cd {PROJECT_PATH} && python manage.py export_comments --output csv --file comments.csv
+# cd {PROJECT_PATH} && python manage.py export_comments --output ndjson --compression zstd --filter "status=APPROVED&product_name=iPhone" > approved.ndjson.zst
+class Command(BaseCommand):
+    help = "Streams comments with their latest analysis and quality score to a CSV or NDJSON file, optionally zstd compressed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=list(export.FORMATS), default='csv')
+        parser.add_argument('--compression', choices=list(export.COMPRESSIONS), default=None)
+        parser.add_argument('--file', default=None, help="Destination file, defaults to stdout")
+        parser.add_argument('--filter', default='', help="Filters of the comment list endpoints as a query string")
+        parser.add_argument('--chunk-size', type=int, default=settings.COMMENT_EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        filterset = CommentFilter(QueryDict(options['filter']), queryset=Comment.objects.all())
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filter: {dict(filterset.errors)}")
+
+        chunks = export.export_chunks(filterset.qs, options['output'], options['compression'], options['chunk_size'])
+        if options['file']:
+            with open(options['file'], 'wb') as file:
+                size = self.write(chunks, file)
+            self.stderr.write(f"{size} bytes written to {options['file']}")
+        else:
+            self.write(chunks, sys.stdout.buffer)
+
+    def write(self, chunks, file):
+        size = 0
+        for chunk in chunks:
+            file.write(chunk)
+            size += len(chunk)
+        file.flush()
+        return size
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from app.comments import caching
+from app.comments.models import Comment, CommentAnalyzer, CommentTerm
+from app.comments.terms import index_analyses
+
+
+# cd {PROJECT_PATH} && python manage.py index_comment_terms
+# cd {PROJECT_PATH} && python manage.py index_comment_terms --rebuild --batch-size 5000
+class Command(BaseCommand):
+    help = "Fills the keyword/issue index from the analyses already stored. Safe to run again: existing links are kept"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Analyses indexed per transaction")
+        parser.add_argument('--rebuild', action='store_true', help="Drop every comment-term link first")
+
+    def handle(self, *args, **options):
+        caching.require_shared_cache()
+        if options['rebuild']:
+            deleted, _ = CommentTerm.objects.all().delete()
+            self.stdout.write(f"{deleted} links deleted")
+
+        analyzers = CommentAnalyzer.objects.only('id', 'comment_id', 'keywords', 'main_issue').order_by('id')
+        last_id = 0
+        analyses = pairs = 0
+        while True:
+            # Keyset batches: each one is an index range on the primary key
+            batch = list(analyzers.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                pairs += index_analyses(batch)
+                # Links do not touch the comments: moving `updated` changes the Last-Modified and ETag of the lists
+                Comment.objects.filter(id__in={analyzer.comment_id for analyzer in batch}).update(updated=timezone.now())
+            analyses += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"{analyses} analyses indexed")
+
+        # Term lookups are served by the cached list endpoints
+        caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"{analyses} analyses, {pairs} comment-term pairs indexed"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.comments import caching, rollups
+
+
+# cd {PROJECT_PATH} && python manage.py rebuild_comment_rollups
+class Command(BaseCommand):
+    help = "Recomputes the product/day analytics rollups from the stored analyses and quality scores"
+
+    def handle(self, *args, **options):
+        caching.require_shared_cache()
+        with transaction.atomic():
+            count = rollups.rebuild()
+        # The analytics endpoint is cached with the lists
+        caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"{count} product days rebuilt"))
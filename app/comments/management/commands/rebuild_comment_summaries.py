@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.comments import caching, summaries
+from app.comments.models import Comment
+
+
+# cd {PROJECT_PATH} && python manage.py rebuild_comment_summaries
+# cd {PROJECT_PATH} && python manage.py rebuild_comment_summaries --batch-size 5000
+class Command(BaseCommand):
+    help = "Copies the latest analysis and the quality score of every comment to its summary columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help="Comments updated per transaction")
+
+    def handle(self, *args, **options):
+        caching.require_shared_cache()
+        ids = Comment.objects.order_by('id').values_list('id', flat=True)
+        last_id = 0
+        total = 0
+        while True:
+            # Keyset batches keep each UPDATE and its transaction short
+            batch = list(ids.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            with transaction.atomic():
+                total += summaries.rebuild(Comment.objects.filter(id__gte=batch[0], id__lte=batch[-1]))
+                # Detail and batch responses embed the summary columns and are cached per comment
+                caching.invalidate(batch)
+            last_id = batch[-1]
+            self.stdout.write(f"{total} comments updated")
+
+        self.stdout.write(self.style.SUCCESS(f"{total} comment summaries rebuilt"))
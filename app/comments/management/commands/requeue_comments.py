@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from app.comments import caching
+from app.comments.models import Comment
+from app.comments.transitions import bulk_transition
+from integrations.ai.agents.agent_comment.langchain import creator
+
+
+# cd {PROJECT_PATH} && python manage.py requeue_comments
+# cd {PROJECT_PATH} && python manage.py requeue_comments --older-than 30 --limit 500 --max-attempts 5 --dry-run
+class Command(BaseCommand):
+    help = (
+        "Runs the agent again on WAITING_FOR_ANSWER comments that were not touched for --older-than minutes, "
+        "e.g. batches lost from the in-memory queue of a restarted worker. Comments requeued --max-attempts times "
+        "are moved to ERROR instead. Meant to be run from cron or at startup"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=settings.COMMENT_REQUEUE_AFTER_MINUTES, help="Minutes")
+        parser.add_argument('--limit', type=int, default=None, help="Comments requeued per run, oldest first")
+        parser.add_argument('--max-attempts', type=int, default=settings.COMMENT_REQUEUE_MAX_ATTEMPTS,
+                            help="Requeues of a comment before it is moved to ERROR")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the stale comments")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than'])
+        # Served by the (status, -created, -id) index; `updated` moves on every write to the comment
+        stale = Comment.objects.filter(status='WAITING_FOR_ANSWER', updated__lt=cutoff)
+        # A comment the agent keeps failing on (malformed text, a persistent LLM error) is not sent again forever
+        exhausted = list(stale.filter(requeue_attempts__gte=options['max_attempts']).values_list('id', flat=True))
+        items = list(
+            stale.filter(requeue_attempts__lt=options['max_attempts']).order_by('created', 'id')
+            .values_list('id', 'content')[:options['limit']]
+        )
+        if options['dry_run']:
+            self.stdout.write(f"{len(items)} stale comments, {len(exhausted)} out of attempts")
+            return
+
+        # Agent results invalidate the cached responses from this process
+        caching.require_shared_cache()
+        if exhausted:
+            _, failed = bulk_transition(exhausted, 'ERROR', expected='WAITING_FOR_ANSWER')
+            self.stdout.write(f"{len(failed)} comments moved to ERROR after {options['max_attempts']} attempts")
+        # Touching the comments first keeps a second run, or another worker, from picking them up meanwhile
+        Comment.objects.filter(id__in=[id for id, _ in items]).update(
+            updated=timezone.now(), requeue_attempts=F('requeue_attempts') + 1
+        )
+        # This process is the worker: batches run here instead of on a pool that exits with the command
+        creator.enqueue_many(items, inline=True)
+        self.stdout.write(self.style.SUCCESS(f"{len(items)} comments requeued"))
@@ -0,0 +1,65 @@
+from django.db import connection, models, transaction
+
+from app.comments.signals import comments_changed
+
+# Columns refreshed when an already ingested comment is sent again. Workflow columns
+# (content, response, status) are left untouched so a re-sync never resets a comment, and so is
+# product_name: rollups, trending and the search index are keyed on the name the comment was stored with.
+UPSERT_UPDATE_FIELDS = ['customer_id', 'web_url', 'updated']
+
+
+class CommentQuerySet(models.QuerySet):
+    def insert_new(self, objs):
+        """
+        Inserts the comments whose (source, content_id) is not stored yet with INSERT ... ON CONFLICT DO NOTHING
+        RETURNING, and sets their pk. Returns the inserted objs: the database decides which rows are new, so a
+        comment inserted concurrently by another request is never reported as created twice.
+        """
+        fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        quote = connection.ops.quote_name
+        table = quote(self.model._meta.db_table)
+        columns = ', '.join(quote(field.column) for field in fields)
+        batch_size = connection.ops.bulk_batch_size(fields, objs)
+
+        by_key = {(obj.source, obj.content_id): obj for obj in objs}
+        inserted = []
+        with connection.cursor() as cursor:
+            for start in range(0, len(objs), batch_size):
+                batch = objs[start:start + batch_size]
+                params = [
+                    field.get_db_prep_save(field.pre_save(obj, add=True), connection)
+                    for obj in batch for field in fields
+                ]
+                placeholders = '(%s)' % ', '.join(['%s'] * len(fields))
+                cursor.execute(
+                    f'INSERT INTO {table} ({columns}) VALUES {", ".join([placeholders] * len(batch))} '
+                    f'ON CONFLICT ({quote("source")}, {quote("content_id")}) DO NOTHING '
+                    f'RETURNING {quote("id")}, {quote("source")}, {quote("content_id")}',
+                    params
+                )
+                for pk, source, content_id in cursor.fetchall():
+                    obj = by_key[source, content_id]
+                    obj.pk = pk
+                    obj._state.adding = False
+                    inserted.append(obj)
+        return inserted
+
+    def upsert(self, objs):
+        """
+        Inserts comments keyed on (source, content_id). New rows are inserted with one INSERT ... ON CONFLICT
+        DO NOTHING RETURNING; only the rows it skipped are refreshed with INSERT ... ON CONFLICT DO UPDATE.
+        Returns (objs, existing_ids): every obj has its pk set, existing_ids holds the pks of rows that
+        were already stored so callers can skip the agent for them.
+        """
+        with transaction.atomic():
+            inserted = {id(obj) for obj in self.insert_new(objs)}
+            existing = [obj for obj in objs if id(obj) not in inserted]
+            if existing:
+                self.bulk_create(
+                    existing,
+                    update_conflicts=True,
+                    unique_fields=['source', 'content_id'],
+                    update_fields=UPSERT_UPDATE_FIELDS,
+                )
+        comments_changed.send(sender=self.model, comment_ids=[obj.pk for obj in objs])
+        return objs, {obj.pk for obj in existing}
@@ -0,0 +1,71 @@
+from django.db.models import Count
+
+from app.comments.enums import AGENT_STATUS
+from app.comments.models import Comment
+from app.core.metrics import REGISTRY, Counter, Gauge, Histogram
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+COMMENTS_INGESTED = Counter(
+    'comment_ingested_total',
+    'Comments accepted by the ingest endpoints',
+    ['endpoint'],
+)
+QUEUE_DEPTH = Gauge(
+    'comment_pipeline_queue_depth',
+    'Comments waiting for the agent',
+)
+COMMENTS_PROCESSED = Counter(
+    'comment_pipeline_comments_processed_total',
+    'Comments run through the agent pipeline',
+    ['outcome'],
+)
+PIPELINE_DURATION = Histogram(
+    'comment_pipeline_duration_seconds',
+    'End to end agent pipeline duration per comment',
+    buckets=LLM_BUCKETS,
+)
+CHAIN_DURATION = Histogram(
+    'comment_pipeline_chain_duration_seconds',
+    'Duration of each LLM chain call',
+    ['chain'],
+    buckets=LLM_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    'comment_pipeline_llm_tokens_total',
+    'Tokens consumed by LLM calls',
+    ['model', 'type'],
+)
+PERSISTENCE_DURATION = Histogram(
+    'comment_persistence_duration_seconds',
+    'Duration of saving agent results',
+)
+PERSISTENCE_RESULTS = Counter(
+    'comment_persistence_results_total',
+    'Agent results persisted',
+    ['outcome'],
+)
+CACHE_REQUESTS = Counter(
+    'comment_cache_requests_total',
+    'Read endpoint responses served from (hit) or stored in (miss) the response cache',
+    ['view', 'result'],
+)
+TRENDING_ALERTS = Counter(
+    'comment_trending_alerts_total',
+    'Keywords and issues flagged as trending by the streaming detector',
+    ['kind'],
+)
+
+
+@REGISTRY.collector
+def collect_status_counts():
+    """Comments per AGENT_STATUS, read with a single GROUP BY at scrape time."""
+    counts = dict.fromkeys((value for value, _ in AGENT_STATUS), 0)
+    for row in Comment.objects.order_by().values('status').annotate(total=Count('id')):
+        counts[row['status']] = row['total']
+    yield (
+        'comment_status_count',
+        'gauge',
+        'Comments per agent status',
+        [({'status': comment_status}, total) for comment_status, total in counts.items()],
+    )
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:55
+
+from django.db import migrations, models
+
+
+def rename_duplicate_content_ids(apps, schema_editor):
+    """
+    Keeps the oldest comment of every duplicated content_id and suffixes the others,
+    so the unique constraint can be added without deleting comments or their analyses.
+    """
+    Comment = apps.get_model('comments', 'Comment')
+    duplicates = (
+        Comment.objects.order_by().values('source', 'content_id')
+        .annotate(first_id=models.Min('id'), total=models.Count('id')).filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        others = Comment.objects.filter(source=duplicate['source'], content_id=duplicate['content_id'])
+        for comment in others.exclude(id=duplicate['first_id']).only('id', 'content_id'):
+            suffix = f'#dup{comment.id}'
+            Comment.objects.filter(id=comment.id).update(content_id=comment.content_id[:50 - len(suffix)] + suffix)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=255, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='source',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+        migrations.RunPython(rename_duplicate_content_ids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='comment',
+            constraint=models.UniqueConstraint(fields=('source', 'content_id'), name='unique_comment_source_content_id'),
+        ),
+    ]
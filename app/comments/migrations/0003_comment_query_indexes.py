@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0002_comment_idempotent_ingest'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['-created'], 'verbose_name': 'Comment', 'verbose_name_plural': 'Comments'},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-created', '-id'], name='comment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['status', '-created', '-id'], name='comment_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content_id'], name='comment_content_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['customer_id', '-created'], name='comment_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['product_name', '-created'], name='comment_product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('status', 'WAITING_FOR_APPROVE')), fields=['-created'], name='comment_waiting_approve_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentanalyzer',
+            index=models.Index(fields=['comment', '-analyzed_at'], name='analyzer_comment_analyzed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentanalyzer',
+            index=models.Index(fields=['sentiment', 'comment'], name='analyzer_sentiment_comment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentanalyzer',
+            index=models.Index(condition=models.Q(('required_action', True)), fields=['comment'], name='analyzer_action_required_idx'),
+        ),
+    ]
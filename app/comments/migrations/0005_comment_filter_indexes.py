@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_comment_updated_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_customer_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_product_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['customer_id', '-created', '-id'], name='comment_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['product_name', '-created', '-id'], name='comment_product_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentanalyzer',
+            index=models.Index(fields=['urgency', 'comment'], name='analyzer_urgency_comment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentanalyzer',
+            index=models.Index(fields=['category', 'comment'], name='analyzer_category_comment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentqualityscore',
+            index=models.Index(fields=['overall', 'comment'], name='quality_overall_comment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='commentqualityscore',
+            index=models.Index(fields=['approved', 'overall', 'comment'], name='quality_approved_overall_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# The unicode61 tokenizer lower-cases and strips diacritics (İ/I -> i, ç -> c, ğ -> g, ö -> o, ş -> s, ü -> u);
+# the dotless ı has no decomposition, so the triggers fold it in SQL and need no application function.
+# Kept in sync with app.comments.utils.tr_fold, which folds the queries.
+TR_FOLD = {'ı': 'i'}
+
+
+def fold(column):
+    for char, replacement in TR_FOLD.items():
+        column = f"replace({column}, '{char}', '{replacement}')"
+    return column
+
+
+CREATE_SQL = [
+    """CREATE VIRTUAL TABLE comments_comment_fts USING fts5(
+        content, response, product_name, tokenize = 'unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER comments_comment_fts_insert AFTER INSERT ON comments_comment BEGIN
+        INSERT INTO comments_comment_fts (rowid, content, response, product_name)
+        VALUES (new.id, {fold('new.content')}, {fold('new.response')}, {fold('new.product_name')});
+    END""",
+    f"""CREATE TRIGGER comments_comment_fts_update AFTER UPDATE OF content, response, product_name ON comments_comment
+    BEGIN
+        UPDATE comments_comment_fts
+        SET content = {fold('new.content')}, response = {fold('new.response')}, product_name = {fold('new.product_name')}
+        WHERE rowid = new.id;
+    END""",
+    """CREATE TRIGGER comments_comment_fts_delete AFTER DELETE ON comments_comment BEGIN
+        DELETE FROM comments_comment_fts WHERE rowid = old.id;
+    END""",
+    f"""INSERT INTO comments_comment_fts (rowid, content, response, product_name)
+        SELECT id, {fold('content')}, {fold('response')}, {fold('product_name')} FROM comments_comment""",
+]
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS comments_comment_fts_insert',
+    'DROP TRIGGER IF EXISTS comments_comment_fts_update',
+    'DROP TRIGGER IF EXISTS comments_comment_fts_delete',
+    'DROP TABLE IF EXISTS comments_comment_fts',
+]
+
+
+def create_search_table(apps, schema_editor):
+    """SQLite only: other databases search with the icontains fallback of app.comments.search."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0005_comment_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0006_comment_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Term',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('kind', models.CharField(choices=[('keyword', 'keyword'), ('issue', 'issue')], max_length=20)),
+                ('key', models.CharField(max_length=255)),
+                ('name', models.CharField(max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Term',
+                'verbose_name_plural': 'Terms',
+                'indexes': [models.Index(fields=['key'], name='term_key_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='unique_term_kind_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CommentTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='comments.comment')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='comments.term')),
+            ],
+            options={
+                'verbose_name': 'Comment Term',
+                'verbose_name_plural': 'Comment Terms',
+                'indexes': [models.Index(fields=['term', 'comment'], name='comment_term_term_idx')],
+                'constraints': [models.UniqueConstraint(fields=('comment', 'term'), name='unique_comment_term')],
+            },
+        ),
+    ]
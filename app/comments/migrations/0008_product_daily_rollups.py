@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0007_comment_terms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductDailyBreakdown',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('product_name', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('sentiment', 'sentiment'), ('category', 'category'), ('urgency', 'urgency')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('analyses', models.IntegerField(default=0)),
+                ('sentiment_score_sum', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Product Daily Breakdown',
+                'verbose_name_plural': 'Product Daily Breakdowns',
+                'indexes': [models.Index(fields=['day'], name='breakdown_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product_name', 'day', 'dimension', 'value'), name='unique_breakdown_product_day_value')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('product_name', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('analyses', models.IntegerField(default=0)),
+                ('sentiment_score_sum', models.FloatField(default=0)),
+                ('quality_count', models.IntegerField(default=0)),
+                ('quality_overall_sum', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Product Daily Rollup',
+                'verbose_name_plural': 'Product Daily Rollups',
+                'indexes': [models.Index(fields=['day'], name='rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product_name', 'day'), name='unique_rollup_product_day')],
+            },
+        ),
+    ]
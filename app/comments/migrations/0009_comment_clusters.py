@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0008_product_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('centroid', models.BinaryField()),
+                ('absorbed', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Comment Cluster',
+                'verbose_name_plural': 'Comment Clusters',
+            },
+        ),
+        migrations.CreateModel(
+            name='CommentClusterMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('similarity', models.FloatField()),
+                ('cluster', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='comments.commentcluster')),
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cluster_membership', to='comments.comment')),
+            ],
+            options={
+                'verbose_name': 'Comment Cluster Member',
+                'verbose_name_plural': 'Comment Cluster Members',
+                'indexes': [models.Index(fields=['cluster', '-similarity'], name='cluster_member_similarity_idx')],
+            },
+        ),
+    ]
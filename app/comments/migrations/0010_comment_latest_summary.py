@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0009_comment_clusters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='latest_analyzed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='latest_category',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='latest_quality_approved',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='latest_quality_overall',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='latest_sentiment',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='latest_sentiment_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='latest_urgency',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+    ]
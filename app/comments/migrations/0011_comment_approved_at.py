@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0010_comment_latest_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
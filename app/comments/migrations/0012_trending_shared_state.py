@@ -0,0 +1,68 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0011_comment_approved_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('product_name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('keyword', 'keyword'), ('issue', 'issue')], max_length=20)),
+                ('term', models.CharField(max_length=255)),
+                ('count', models.BigIntegerField()),
+                ('expected', models.FloatField()),
+                ('detected_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Trending Alert',
+                'verbose_name_plural': 'Trending Alerts',
+                'indexes': [models.Index(fields=['product_name', 'kind', 'term', 'detected_at'], name='trending_alert_key_idx'), models.Index(fields=['-detected_at'], name='trending_alert_detected_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('bucket', models.BigIntegerField()),
+                ('product_name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('keyword', 'keyword'), ('issue', 'issue')], max_length=20)),
+                ('term', models.CharField(max_length=255)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Trending Candidate',
+                'verbose_name_plural': 'Trending Candidates',
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'product_name', 'kind', 'term'), name='unique_trending_candidate')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingSketchCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='updated')),
+                ('bucket', models.BigIntegerField()),
+                ('row', models.SmallIntegerField()),
+                ('col', models.IntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Trending Sketch Cell',
+                'verbose_name_plural': 'Trending Sketch Cells',
+                'indexes': [models.Index(fields=['row', 'col', 'bucket'], name='trending_cell_key_idx')],
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'row', 'col'), name='unique_trending_cell')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:14
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+search = import_module('app.comments.migrations.0006_comment_search')
+
+
+def restore_search_triggers(apps, schema_editor):
+    """SQLite adds a NOT NULL column by rebuilding comments_comment, which drops the triggers of 0006."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in search.DROP_SQL:
+        if sql.startswith('DROP TRIGGER'):
+            schema_editor.execute(sql)
+    for sql in search.CREATE_SQL:
+        if sql.startswith('CREATE TRIGGER'):
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0012_trending_shared_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='requeue_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
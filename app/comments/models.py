@@ -1,10 +1,12 @@
 from django.db import models
 
-from app.comments.enums import AGENT_STATUS
+from app.comments.enums import AGENT_STATUS, ROLLUP_DIMENSIONS, TERM_KINDS
+from app.comments.managers import CommentQuerySet
 from app.core.models.base_model import BaseModel
 
 
 class Comment(BaseModel):
+    source = models.CharField(max_length=50, blank=True, default='')  # Marketplace the comment was synced from
     customer_id = models.CharField(max_length=50)
     product_name = models.CharField(max_length=100)
     content_id = models.CharField(max_length=50)
@@ -13,13 +15,50 @@ class Comment(BaseModel):
     response = models.TextField(default="temp", max_length=5000)
     status = models.CharField(max_length=50, choices=AGENT_STATUS)
     is_active = models.BooleanField(default=True)
+    idempotency_key = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    # Set by app.comments.transitions when the response is approved; `updated` keeps moving afterwards
+    approved_at = models.DateTimeField(null=True, blank=True)
+    # Times requeue_comments sent the comment to the agent again; reset when it waits for an answer anew
+    requeue_attempts = models.PositiveSmallIntegerField(default=0)
+
+    # Read model of the list endpoints: the latest analysis and the quality score, copied by
+    # app.comments.summaries when results are saved so a list page needs no join. Null until analyzed.
+    latest_sentiment = models.CharField(max_length=50, null=True, blank=True)
+    latest_sentiment_score = models.FloatField(null=True, blank=True)
+    latest_category = models.CharField(max_length=100, null=True, blank=True)
+    latest_urgency = models.CharField(max_length=50, null=True, blank=True)
+    latest_analyzed_at = models.DateTimeField(null=True, blank=True)
+    latest_quality_overall = models.IntegerField(null=True, blank=True)
+    latest_quality_approved = models.BooleanField(null=True, blank=True)
+
+    objects = CommentQuerySet.as_manager()
 
     def __str__(self):
         return f"Comment {self.id} at {self.created}"
 
-    class Meta:
+    class Meta(BaseModel.Meta):
         verbose_name = "Comment"
         verbose_name_plural = "Comments"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'content_id'], name='unique_comment_source_content_id'),
+        ]
+        indexes = [
+            # List endpoint, newest first (BaseModel ordering plus id as tie-breaker)
+            models.Index(fields=['-created', '-id'], name='comment_created_idx'),
+            # status/filter: the filter and the ordering are served by one index
+            models.Index(fields=['status', '-created', '-id'], name='comment_status_created_idx'),
+            models.Index(fields=['content_id'], name='comment_content_id_idx'),
+            # MAX(updated) versions the list responses (ETag / Last-Modified)
+            models.Index(fields=['updated'], name='comment_updated_idx'),
+            models.Index(fields=['customer_id', '-created', '-id'], name='comment_customer_created_idx'),
+            models.Index(fields=['product_name', '-created', '-id'], name='comment_product_created_idx'),
+            # Moderation queue: small partial index over the comments waiting for approval only
+            models.Index(
+                fields=['-created'],
+                condition=models.Q(status='WAITING_FOR_APPROVE'),
+                name='comment_waiting_approve_idx'
+            ),
+        ]
 
 
 class CommentAnalyzer(BaseModel):
@@ -49,6 +88,14 @@ class CommentAnalyzer(BaseModel):
     class Meta:
         verbose_name = "Comment Analyzer"
         verbose_name_plural = "Comment Analyzers"
+        indexes = [
+            models.Index(fields=['comment', '-analyzed_at'], name='analyzer_comment_analyzed_idx'),
+            models.Index(fields=['sentiment', 'comment'], name='analyzer_sentiment_comment_idx'),
+            models.Index(fields=['urgency', 'comment'], name='analyzer_urgency_comment_idx'),
+            models.Index(fields=['category', 'comment'], name='analyzer_category_comment_idx'),
+            # Analyses that ask for an action are a small share of the table
+            models.Index(fields=['comment'], condition=models.Q(required_action=True), name='analyzer_action_required_idx'),
+        ]
 
 
 class CommentQualityScore(BaseModel):
@@ -67,3 +114,200 @@ class CommentQualityScore(BaseModel):
     class Meta:
         verbose_name = "Comment Quality Score"
         verbose_name_plural = "Comment Quality Scores"
+        indexes = [
+            # ?overall_min=&overall_max= and ?approved= on the comment list
+            models.Index(fields=['overall', 'comment'], name='quality_overall_comment_idx'),
+            models.Index(fields=['approved', 'overall', 'comment'], name='quality_approved_overall_idx'),
+        ]
+
+
+class Term(BaseModel):
+    """A keyword or issue named by the agent. Every spelling of it ("Isınma", "ısınma ") is one row."""
+    kind = models.CharField(max_length=20, choices=TERM_KINDS)
+    key = models.CharField(max_length=255)   # app.comments.terms.term_key(name), what lookups match
+    name = models.CharField(max_length=255)  # First spelling seen
+
+    def __str__(self):
+        return f"{self.kind} {self.name}"
+
+    class Meta:
+        verbose_name = "Term"
+        verbose_name_plural = "Terms"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='unique_term_kind_key'),
+        ]
+        indexes = [
+            # Lookups by key across kinds
+            models.Index(fields=['key'], name='term_key_idx'),
+        ]
+
+
+class CommentTerm(BaseModel):
+    """Inverted index of the comma-joined CommentAnalyzer.keywords and main_issue: one row per comment and term."""
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="terms")
+    term = models.ForeignKey(Term, on_delete=models.CASCADE, related_name="comments")
+
+    def __str__(self):
+        return f"Term {self.term_id} of Comment {self.comment_id}"
+
+    class Meta:
+        verbose_name = "Comment Term"
+        verbose_name_plural = "Comment Terms"
+        constraints = [
+            # Also serves the terms of a comment
+            models.UniqueConstraint(fields=['comment', 'term'], name='unique_comment_term'),
+        ]
+        indexes = [
+            # Term -> comments
+            models.Index(fields=['term', 'comment'], name='comment_term_term_idx'),
+        ]
+
+
+class ProductDailyRollup(BaseModel):
+    """
+    Totals of the analyses of one product's comments created on one day, incremented by every save of agent results
+    (app.comments.rollups). Averages are sum / count.
+    """
+    product_name = models.CharField(max_length=100)
+    day = models.DateField()
+    analyses = models.IntegerField(default=0)
+    sentiment_score_sum = models.FloatField(default=0)
+    quality_count = models.IntegerField(default=0)        # Comments with a quality score
+    quality_overall_sum = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Rollup of {self.product_name} on {self.day}"
+
+    class Meta:
+        verbose_name = "Product Daily Rollup"
+        verbose_name_plural = "Product Daily Rollups"
+        constraints = [
+            # Also serves the day range of one product
+            models.UniqueConstraint(fields=['product_name', 'day'], name='unique_rollup_product_day'),
+        ]
+        indexes = [
+            # Day range over every product
+            models.Index(fields=['day'], name='rollup_day_idx'),
+        ]
+
+
+class ProductDailyBreakdown(BaseModel):
+    """Number of analyses per sentiment, category and urgency value of one product and day."""
+    product_name = models.CharField(max_length=100)
+    day = models.DateField()
+    dimension = models.CharField(max_length=20, choices=ROLLUP_DIMENSIONS)
+    value = models.CharField(max_length=100)
+    analyses = models.IntegerField(default=0)
+    sentiment_score_sum = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.dimension}={self.value} of {self.product_name} on {self.day}"
+
+    class Meta:
+        verbose_name = "Product Daily Breakdown"
+        verbose_name_plural = "Product Daily Breakdowns"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product_name', 'day', 'dimension', 'value'], name='unique_breakdown_product_day_value'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='breakdown_day_idx'),
+        ]
+
+
+class CommentCluster(BaseModel):
+    """An issue cluster of the mini-batch k-means over negative comments (app.comments.clustering)."""
+    centroid = models.BinaryField()                # float32 unit vector of COMMENT_CLUSTER_FEATURES hashed n-grams
+    absorbed = models.IntegerField(default=0)      # Comments the centroid has been moved towards
+
+    def __str__(self):
+        return f"Cluster {self.id}"
+
+    class Meta:
+        verbose_name = "Comment Cluster"
+        verbose_name_plural = "Comment Clusters"
+
+
+class CommentClusterMember(BaseModel):
+    """The cluster a comment was assigned to, once, and its cosine similarity to the centroid at that time."""
+    comment = models.OneToOneField(Comment, on_delete=models.CASCADE, related_name="cluster_membership")
+    cluster = models.ForeignKey(CommentCluster, on_delete=models.CASCADE, related_name="members")
+    similarity = models.FloatField()
+
+    def __str__(self):
+        return f"Comment {self.comment_id} in Cluster {self.cluster_id}"
+
+    class Meta:
+        verbose_name = "Comment Cluster Member"
+        verbose_name_plural = "Comment Cluster Members"
+        indexes = [
+            # Representative comments: the closest members of a cluster first
+            models.Index(fields=['cluster', '-similarity'], name='cluster_member_similarity_idx'),
+        ]
+
+
+class TrendingSketchCell(BaseModel):
+    """
+    One Count-Min counter of a time bucket of the trending detector (app.comments.trending), incremented by every
+    process that saves agent results.
+    """
+    bucket = models.BigIntegerField()  # Unix time // COMMENT_TRENDING_BUCKET_SECONDS
+    row = models.SmallIntegerField()
+    col = models.IntegerField()
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Cell {self.row}:{self.col} of bucket {self.bucket}"
+
+    class Meta:
+        verbose_name = "Trending Sketch Cell"
+        verbose_name_plural = "Trending Sketch Cells"
+        constraints = [
+            # Also serves the bucket ranges pruned as the window slides
+            models.UniqueConstraint(fields=['bucket', 'row', 'col'], name='unique_trending_cell'),
+        ]
+        indexes = [
+            # The counters of given keys over the window and the baseline
+            models.Index(fields=['row', 'col', 'bucket'], name='trending_cell_key_idx'),
+        ]
+
+
+class TrendingCandidate(BaseModel):
+    """How often a product's keyword or issue was seen in a bucket of the window: the keys heavy hitters come from."""
+    bucket = models.BigIntegerField()
+    product_name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=TERM_KINDS)
+    term = models.CharField(max_length=255)
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.kind} {self.term} of {self.product_name} in bucket {self.bucket}"
+
+    class Meta:
+        verbose_name = "Trending Candidate"
+        verbose_name_plural = "Trending Candidates"
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'product_name', 'kind', 'term'], name='unique_trending_candidate'),
+        ]
+
+
+class TrendingAlert(BaseModel):
+    """A keyword or issue flagged as trending, at most once per key and window."""
+    product_name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=20, choices=TERM_KINDS)
+    term = models.CharField(max_length=255)
+    count = models.BigIntegerField()
+    expected = models.FloatField()
+    detected_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.kind} {self.term} of {self.product_name} trending at {self.detected_at}"
+
+    class Meta:
+        verbose_name = "Trending Alert"
+        verbose_name_plural = "Trending Alerts"
+        indexes = [
+            models.Index(fields=['product_name', 'kind', 'term', 'detected_at'], name='trending_alert_key_idx'),
+            models.Index(fields=['-detected_at'], name='trending_alert_detected_idx'),
+        ]
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app.comments import caching
+from app.comments.models import Comment, CommentAnalyzer, CommentQualityScore
+from app.comments.signals import comments_changed
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_saved(sender, instance, **kwargs):
+    caching.invalidate([instance.id])
+
+
+@receiver(post_save, sender=CommentAnalyzer)
+@receiver(post_delete, sender=CommentAnalyzer)
+@receiver(post_save, sender=CommentQualityScore)
+@receiver(post_delete, sender=CommentQualityScore)
+def comment_result_saved(sender, instance, **kwargs):
+    caching.invalidate([instance.comment_id])
+
+
+@receiver(comments_changed)
+def comments_bulk_changed(sender, comment_ids, **kwargs):
+    caching.invalidate(comment_ids)
@@ -0,0 +1,256 @@
+"""
+Weekly KPI reports of the comments, computed with pandas.
+
+Rows are read with keyset-paginated `values_list` batches of COMMENT_REPORT_CHUNK_SIZE, so neither ORM instances
+nor the whole result set of the database cursor are held in memory, and each batch becomes a typed DataFrame:
+sentiment, category, urgency, status and product are categoricals, scores are numeric and dates are UTC datetimes.
+Comments are bucketed by the week (Monday, in TIME_ZONE) they were created in, like the daily rollups.
+
+Reports:
+- quality: comments scored, average overall score and approval rate of the generated responses
+- turnaround: hours from the comment to its scored draft, and from the draft to the approval of APPROVED and
+  ANSWERED comments (`approved_at`, stamped by the APPROVED transition; comments approved before it existed have
+  none and are left out)
+- sentiment: analyses, average sentiment score and share of each sentiment
+
+`write_report` renders them to a static index.html, with one PNG chart per report when matplotlib is installed.
+"""
+import html
+import os
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from app.comments.models import Comment, CommentAnalyzer
+
+# Statuses a comment reaches once its response has been approved
+APPROVED_STATUSES = ['APPROVED', 'ANSWERED']
+CATEGORICAL_COLUMNS = ['product_name', 'status', 'sentiment', 'category', 'urgency']
+DATETIME_COLUMNS = ['created', 'approved_at', 'scored_at', 'analyzed_at']
+
+COMMENT_FIELDS = {
+    'id': F('id'),
+    'product_name': F('product_name'),
+    'status': F('status'),
+    'created': F('created'),
+    'approved_at': F('approved_at'),
+    'overall': F('quality_score__overall'),
+    'approved': F('quality_score__approved'),
+    'scored_at': F('quality_score__created'),
+}
+ANALYSIS_FIELDS = {
+    'id': F('id'),
+    'comment_id': F('comment_id'),
+    'created': F('comment__created'),
+    'analyzed_at': F('analyzed_at'),
+    'sentiment': F('sentiment'),
+    'sentiment_score': F('sentiment_score'),
+    'category': F('category'),
+    'urgency': F('urgency'),
+}
+DTYPES = {
+    'id': 'int64',
+    'comment_id': 'int64',
+    'overall': 'float64',  # Missing quality scores are NaN
+    'approved': 'boolean',
+    'sentiment_score': 'float64',
+}
+
+
+def to_frame(rows, columns):
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    for column in columns:
+        if column in DATETIME_COLUMNS:
+            frame[column] = pd.to_datetime(frame[column], utc=True)
+        elif column in CATEGORICAL_COLUMNS:
+            frame[column] = frame[column].astype('category')
+        elif column in DTYPES:
+            frame[column] = frame[column].astype(DTYPES[column])
+    return frame
+
+
+def read_frame(queryset, fields, chunk_size=None):
+    """
+    DataFrame of `fields` ({column: expression}) over `queryset`, read in batches of `chunk_size` rows ordered
+    by id. Each batch is one `WHERE id > last ORDER BY id LIMIT chunk_size` query turned into a typed frame;
+    categorical columns are merged with union_categoricals so they stay categorical across batches.
+    """
+    chunk_size = chunk_size or settings.COMMENT_REPORT_CHUNK_SIZE
+    columns = list(fields)
+    rows = queryset.order_by('id').annotate(**{
+        f'report_{column}': expression for column, expression in fields.items()
+    }).values_list(*[f'report_{column}' for column in columns])
+
+    frames = []
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        frames.append(to_frame(chunk, columns))
+        last_id = chunk[-1][0]
+    if not frames:
+        return to_frame([], columns)
+
+    categoricals = [column for column in columns if column in CATEGORICAL_COLUMNS]
+    frame = pd.concat([chunk.drop(columns=categoricals) for chunk in frames], ignore_index=True)
+    for column in categoricals:
+        frame[column] = pd.api.types.union_categoricals([chunk[column] for chunk in frames])
+    return frame[columns]
+
+
+def comment_frame(product_name=None, date_from=None, date_to=None, chunk_size=None):
+    return read_frame(filter_comments(Comment.objects.all(), product_name, date_from, date_to), COMMENT_FIELDS, chunk_size)
+
+
+def analysis_frame(product_name=None, date_from=None, date_to=None, chunk_size=None):
+    queryset = filter_comments(CommentAnalyzer.objects.all(), product_name, date_from, date_to, prefix='comment__')
+    return read_frame(queryset, ANALYSIS_FIELDS, chunk_size)
+
+
+def filter_comments(queryset, product_name, date_from, date_to, prefix=''):
+    """`date_from` and `date_to` are inclusive local dates of the comment creation."""
+    if product_name:
+        queryset = queryset.filter(**{f'{prefix}product_name': product_name})
+    if date_from:
+        queryset = queryset.filter(**{f'{prefix}created__date__gte': date_from})
+    if date_to:
+        queryset = queryset.filter(**{f'{prefix}created__date__lte': date_to})
+    return queryset
+
+
+def weeks(created):
+    """Monday of the local week of each UTC timestamp."""
+    local = created.dt.tz_convert(timezone.get_current_timezone_name()).dt.tz_localize(None)
+    return local.dt.to_period('W-SUN').dt.start_time.dt.date.rename('week')
+
+
+def weekly_index(*frames):
+    """Every week between the first and the last comment, so quiet weeks show up as gaps instead of vanishing."""
+    starts = pd.concat([weeks(frame['created']) for frame in frames if len(frame)])
+    if starts.empty:
+        return pd.Index([], name='week')
+    return pd.Index(pd.date_range(starts.min(), starts.max(), freq='W-MON').date, name='week')
+
+
+def quality_report(comments, index):
+    scored = comments[comments['overall'].notna()]
+    grouped = scored.groupby(weeks(scored['created']))
+    report = pd.DataFrame({
+        'scored': grouped.size(),
+        'average_overall': grouped['overall'].mean(),
+        'approval_rate': grouped['approved'].mean().astype('float64'),
+    })
+    return report.reindex(index).fillna({'scored': 0}).astype({'scored': 'int64'}).round(2)
+
+
+def turnaround_report(comments, index):
+    hour = np.timedelta64(1, 'h')
+    scored = comments[comments['scored_at'].notna()]
+    to_draft = (scored['scored_at'] - scored['created']) / hour
+    approved = scored[scored['status'].isin(APPROVED_STATUSES) & scored['approved_at'].notna()]
+    to_approval = ((approved['approved_at'] - approved['scored_at']) / hour).clip(lower=0)
+
+    draft = to_draft.groupby(weeks(scored['created']))
+    approval = to_approval.groupby(weeks(approved['created']))
+    report = pd.DataFrame({
+        'drafts': draft.size(),
+        'median_hours_to_draft': draft.median(),
+        'approvals': approval.size(),
+        'median_hours_to_approval': approval.median(),
+        'p90_hours_to_approval': approval.quantile(0.9),
+    })
+    report = report.reindex(index).fillna({'drafts': 0, 'approvals': 0})
+    return report.astype({'drafts': 'int64', 'approvals': 'int64'}).round(2)
+
+
+def sentiment_report(analyses, index):
+    week = weeks(analyses['created'])
+    grouped = analyses.groupby(week)
+    shares = pd.crosstab(week, analyses['sentiment'], normalize='index', dropna=False)
+    shares.columns = [f'share_{sentiment}' for sentiment in shares.columns]
+    report = pd.DataFrame({
+        'analyses': grouped.size(),
+        'average_sentiment_score': grouped['sentiment_score'].mean(),
+    }).join(shares)
+    return report.reindex(index).fillna({'analyses': 0}).astype({'analyses': 'int64'}).round(2)
+
+
+def build_reports(product_name=None, date_from=None, date_to=None, chunk_size=None):
+    """The weekly reports as {name: DataFrame indexed by week}, from two chunked reads."""
+    comments = comment_frame(product_name, date_from, date_to, chunk_size)
+    analyses = analysis_frame(product_name, date_from, date_to, chunk_size)
+    index = weekly_index(comments, analyses)
+    return {
+        'quality': quality_report(comments, index),
+        'turnaround': turnaround_report(comments, index),
+        'sentiment': sentiment_report(analyses, index),
+    }
+
+
+# Columns drawn on the chart of each report
+CHART_COLUMNS = {
+    'quality': ['average_overall', 'approval_rate'],
+    'turnaround': ['median_hours_to_draft', 'median_hours_to_approval', 'p90_hours_to_approval'],
+    'sentiment': None,  # Every share_<sentiment> column
+}
+TITLES = {
+    'quality': 'Response quality',
+    'turnaround': 'Approval turnaround (hours)',
+    'sentiment': 'Sentiment trend',
+}
+
+
+def charts_available():
+    """matplotlib is optional: without it reports are written without charts."""
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def write_charts(reports, directory):
+    """One PNG line chart per non-empty report, as {report name: file name}."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot
+
+    charts = {}
+    for name, report in reports.items():
+        columns = CHART_COLUMNS[name] or [column for column in report.columns if column.startswith('share_')]
+        if report.empty or not columns:
+            continue
+        figure, axes = pyplot.subplots(figsize=(10, 4))
+        report[columns].plot(ax=axes, marker='o', title=TITLES[name])
+        axes.set_xlabel('week')
+        figure.tight_layout()
+        charts[name] = f'{name}.png'
+        figure.savefig(os.path.join(directory, charts[name]))
+        pyplot.close(figure)
+    return charts
+
+
+def write_report(reports, directory, charts=True, title='Comment report'):
+    """Writes index.html, and the charts unless `charts` is False, to `directory`. Returns the written file names."""
+    os.makedirs(directory, exist_ok=True)
+    images = write_charts(reports, directory) if charts and charts_available() else {}
+    sections = []
+    for name, report in reports.items():
+        image = f'<img src="{images[name]}" alt="{TITLES[name]}">' if name in images else ''
+        table = report.to_html(na_rep='-', border=0, classes='report') if len(report) else '<p>No comments</p>'
+        sections.append(f'<h2>{TITLES[name]}</h2>{image}{table}')
+
+    with open(os.path.join(directory, 'index.html'), 'w', encoding='utf-8') as file:
+        file.write(
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>{html.escape(title)}</title>'
+            '<style>body{font-family:sans-serif}table.report{border-collapse:collapse}'
+            'table.report td,table.report th{padding:4px 8px;text-align:right;border-bottom:1px solid #ddd}</style>'
+            f'</head><body><h1>{html.escape(title)}</h1>'
+            f'<p>Generated {timezone.localtime():%Y-%m-%d %H:%M}</p>{"".join(sections)}</body></html>'
+        )
+    return ['index.html', *images.values()]
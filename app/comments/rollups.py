@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from app.comments.enums import ROLLUP_DIMENSIONS
+from app.comments.models import CommentAnalyzer, CommentQualityScore, ProductDailyBreakdown, ProductDailyRollup
+
+# Rollups are bucketed by the product and creation day of the comment, so reprocessing a comment updates
+# the buckets it was first counted in and a rebuild gives the same numbers.
+ROLLUP_KEYS = ['product_name', 'day']
+ROLLUP_COUNTERS = ['analyses', 'sentiment_score_sum', 'quality_count', 'quality_overall_sum']
+BREAKDOWN_KEYS = ['product_name', 'day', 'dimension', 'value']
+BREAKDOWN_COUNTERS = ['analyses', 'sentiment_score_sum']
+
+
+def increment(model, keys, counters, rows):
+    """
+    Adds `rows` ({column: value}) to the counters of `model` with one INSERT ... ON CONFLICT DO UPDATE:
+    missing rows are inserted, existing ones get `counter = counter + excluded.counter`. Concurrent writers
+    cannot lose an increment because the database does the addition.
+    """
+    if not rows:
+        return
+    now = timezone.now()
+    columns = keys + counters + ['created', 'updated']
+    fields = [model._meta.get_field(column) for column in columns]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+
+    params = []
+    for row in rows:
+        values = {**row, 'created': now, 'updated': now}
+        params.extend(field.get_db_prep_save(values[field.name], connection) for field in fields)
+    placeholders = '(%s)' % ', '.join(['%s'] * len(columns))
+    updates = [f'{quote(column)} = {table}.{quote(column)} + excluded.{quote(column)}' for column in counters]
+    updates.append(f'{quote("updated")} = excluded.{quote("updated")}')
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(map(quote, columns))}) VALUES {", ".join([placeholders] * len(rows))} '
+            f'ON CONFLICT ({", ".join(map(quote, keys))}) DO UPDATE SET {", ".join(updates)}',
+            params
+        )
+
+
+def record_results(product_name, created, analyzers, quality_overall=None, previous_overall=None):
+    """
+    Adds the analyses of one comment to its product and day, with two queries. `quality_overall` is the new quality
+    score of the comment and `previous_overall` the one it replaces, which is taken out of the sums.
+    """
+    day = timezone.localdate(created)
+    quality_count = quality_overall_sum = 0
+    if quality_overall is not None:
+        quality_count = int(previous_overall is None)
+        quality_overall_sum = quality_overall - (previous_overall or 0)
+
+    increment(ProductDailyRollup, ROLLUP_KEYS, ROLLUP_COUNTERS, [{
+        'product_name': product_name,
+        'day': day,
+        'analyses': len(analyzers),
+        'sentiment_score_sum': sum(analyzer.sentiment_score for analyzer in analyzers),
+        'quality_count': quality_count,
+        'quality_overall_sum': quality_overall_sum,
+    }])
+
+    breakdown = defaultdict(lambda: [0, 0.0])
+    for analyzer in analyzers:
+        for dimension, _ in ROLLUP_DIMENSIONS:
+            counters = breakdown[dimension, getattr(analyzer, dimension)]
+            counters[0] += 1
+            counters[1] += analyzer.sentiment_score
+    increment(ProductDailyBreakdown, BREAKDOWN_KEYS, BREAKDOWN_COUNTERS, [
+        {
+            'product_name': product_name, 'day': day, 'dimension': dimension, 'value': value,
+            'analyses': analyses, 'sentiment_score_sum': score_sum,
+        }
+        for (dimension, value), (analyses, score_sum) in breakdown.items()
+    ])
+
+
+def rebuild():
+    """
+    Recomputes every rollup from the analyses and quality scores, one GROUP BY per table and dimension.
+    Run inside a transaction so readers never see the tables empty.
+    """
+    ProductDailyRollup.objects.all().delete()
+    ProductDailyBreakdown.objects.all().delete()
+
+    day = TruncDate('comment__created', tzinfo=timezone.get_current_timezone())
+    rollups = {}
+    for row in CommentAnalyzer.objects.values(product_name=F('comment__product_name'), day=day).annotate(
+        count=Count('id'), score_sum=Sum('sentiment_score')
+    ).order_by():
+        rollups[row['product_name'], row['day']] = ProductDailyRollup(
+            product_name=row['product_name'], day=row['day'], analyses=row['count'], sentiment_score_sum=row['score_sum']
+        )
+    for row in CommentQualityScore.objects.values(product_name=F('comment__product_name'), day=day).annotate(
+        count=Count('id'), overall_sum=Sum('overall')
+    ).order_by():
+        rollup = rollups.setdefault(
+            (row['product_name'], row['day']), ProductDailyRollup(product_name=row['product_name'], day=row['day'])
+        )
+        rollup.quality_count = row['count']
+        rollup.quality_overall_sum = row['overall_sum']
+    ProductDailyRollup.objects.bulk_create(rollups.values(), batch_size=1000)
+
+    for dimension, _ in ROLLUP_DIMENSIONS:
+        ProductDailyBreakdown.objects.bulk_create(
+            [
+                ProductDailyBreakdown(
+                    product_name=row['product_name'], day=row['day'], dimension=dimension, value=row['value'],
+                    analyses=row['count'], sentiment_score_sum=row['score_sum']
+                )
+                for row in CommentAnalyzer.objects.values(
+                    product_name=F('comment__product_name'), day=day, value=F(dimension)
+                ).annotate(count=Count('id'), score_sum=Sum('sentiment_score')).order_by()
+            ],
+            batch_size=1000
+        )
+    return len(rollups)
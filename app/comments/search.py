@@ -0,0 +1,53 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from app.comments.models import Comment
+from app.comments.utils import tr_fold
+
+# The FTS5 table (migration 0006) holds copies of FTS_COLUMNS keyed by comment id. Triggers keep it in sync for
+# every write path (save, QuerySet.update, bulk_create, and writes from outside Django): they fold the dotless ı
+# in SQL and the unicode61 tokenizer does the rest, so stored tokens match queries folded with tr_fold.
+FTS_TABLE = 'comments_comment_fts'
+FTS_COLUMNS = ['content', 'response', 'product_name']
+# bm25 weight of each FTS_COLUMNS column: a hit in the customer's text or the product name outranks the response
+FTS_WEIGHTS = (2.0, 1.0, 3.0)
+
+
+def search_terms(query):
+    """Folded words of a user query."""
+    return re.findall(r'\w+', tr_fold(query or ''))
+
+
+def match_expression(terms):
+    """
+    FTS5 MATCH expression requiring every term. Terms are quoted (no FTS syntax injection) and matched
+    as prefixes, so "batarya" also finds Turkish suffixed forms like "bataryası" or "bataryayı".
+    """
+    return ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+
+
+def search_comments(query, limit):
+    """
+    Returns [(comment_id, score)] for the best `limit` matches, best first. Lower bm25 scores rank higher.
+    Databases without FTS5 fall back to an unranked icontains scan.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor != 'sqlite':
+        condition = Q()
+        for term in query.split():
+            condition &= Q(content__icontains=term) | Q(response__icontains=term) | Q(product_name__icontains=term)
+        ids = Comment.objects.filter(condition).order_by('-created', '-id').values_list('id', flat=True)[:limit]
+        return [(id, None) for id in ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({FTS_TABLE}, %s, %s, %s) AS score FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s ORDER BY score LIMIT %s',
+            [*FTS_WEIGHTS, match_expression(terms), limit]
+        )
+        return cursor.fetchall()
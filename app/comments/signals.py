@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent with `comment_ids` after writes that bypass Model.save and its post_save signal
+# (QuerySet.update, bulk_create upserts)
+comments_changed = Signal()
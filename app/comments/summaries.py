@@ -0,0 +1,50 @@
+from django.db.models import Exists, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from app.comments.models import Comment, CommentAnalyzer, CommentQualityScore
+
+# Denormalized Comment column: source column of the latest analysis / of the quality score
+ANALYSIS_SUMMARY = {
+    'latest_sentiment': 'sentiment',
+    'latest_sentiment_score': 'sentiment_score',
+    'latest_category': 'category',
+    'latest_urgency': 'urgency',
+    'latest_analyzed_at': 'analyzed_at',
+}
+QUALITY_SUMMARY = {
+    'latest_quality_overall': 'overall',
+    'latest_quality_approved': 'approved',
+}
+SUMMARY_FIELDS = [*ANALYSIS_SUMMARY, *QUALITY_SUMMARY]
+
+
+def summary_values(analyzer=None, quality_score=None):
+    """Summary columns taken from `analyzer`, the latest analysis, and `quality_score`; omitted when None."""
+    values = {}
+    if analyzer is not None:
+        values.update((field, getattr(analyzer, source)) for field, source in ANALYSIS_SUMMARY.items())
+    if quality_score is not None:
+        values.update((field, getattr(quality_score, source)) for field, source in QUALITY_SUMMARY.items())
+    return values
+
+
+def update_summary(comment_id, analyzer=None, quality_score=None):
+    """Copies the latest results to the comment with one UPDATE; `updated` moves so list ETags change."""
+    values = summary_values(analyzer, quality_score)
+    if values:
+        Comment.objects.filter(id=comment_id).update(updated=timezone.now(), **values)
+
+
+def rebuild(comments):
+    """
+    Recomputes the summary of the analyzed `comments` from their analyses and quality score with one UPDATE and
+    correlated subqueries: the latest analysis is read through the (comment, -analyzed_at) index. `updated` moves
+    on the rows written so cached list responses are revalidated. Returns the number of comments updated.
+    """
+    latest = CommentAnalyzer.objects.filter(comment=OuterRef('pk')).order_by('-analyzed_at', '-id')
+    quality = CommentQualityScore.objects.filter(comment=OuterRef('pk'))
+    return comments.filter(Q(Exists(latest)) | Q(Exists(quality))).update(
+        updated=timezone.now(),
+        **{field: Subquery(latest.values(source)[:1]) for field, source in ANALYSIS_SUMMARY.items()},
+        **{field: Subquery(quality.values(source)[:1]) for field, source in QUALITY_SUMMARY.items()},
+    )
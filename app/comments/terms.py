@@ -0,0 +1,53 @@
+from app.comments.models import CommentTerm, Term
+from app.comments.utils import tr_fold
+
+# CommentAnalyzer column holding the comma-joined terms of each kind
+TERM_COLUMNS = {'keyword': 'keywords', 'issue': 'main_issue'}
+TERM_MAX_LENGTH = Term._meta.get_field('key').max_length
+
+
+def term_key(name):
+    """Lookup key of a term: Turkish folded with whitespace collapsed, so "Isınma " and "ısınma" are one term."""
+    return ' '.join(tr_fold(name or '').split())[:TERM_MAX_LENGTH]
+
+
+def split_terms(value):
+    """{key: name} of a comma-joined CommentAnalyzer column; the first spelling of a term names it."""
+    terms = {}
+    for name in (value or '').split(','):
+        name = ' '.join(name.split())[:TERM_MAX_LENGTH]
+        key = term_key(name)
+        if key:
+            terms.setdefault(key, name)
+    return terms
+
+
+def index_analyses(analyzers):
+    """
+    Adds the keywords and main issues of `analyzers` to the term index with three queries, whatever
+    their number: one INSERT of the new terms, one SELECT of their ids and one INSERT of the links.
+    A comment keeps the terms of all its analyses. Returns the number of (comment, term) pairs given.
+    """
+    names = {}
+    pairs = set()
+    for analyzer in analyzers:
+        for kind, column in TERM_COLUMNS.items():
+            for key, name in split_terms(getattr(analyzer, column)).items():
+                names.setdefault((kind, key), name)
+                pairs.add((analyzer.comment_id, kind, key))
+    if not pairs:
+        return 0
+
+    Term.objects.bulk_create(
+        [Term(kind=kind, key=key, name=name) for (kind, key), name in names.items()],
+        ignore_conflicts=True
+    )
+    ids = {
+        (kind, key): id
+        for id, kind, key in Term.objects.filter(key__in={key for _, key in names}).values_list('id', 'kind', 'key')
+    }
+    CommentTerm.objects.bulk_create(
+        [CommentTerm(comment_id=comment_id, term_id=ids[kind, key]) for comment_id, kind, key in pairs],
+        ignore_conflicts=True
+    )
+    return len(pairs)
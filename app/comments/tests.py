@@ -1,8 +1,52 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from app.comments.models import Comment
+from app.comments.models import Comment, TrendingCandidate, TrendingSketchCell
+
+
+def make_result(review="Ürün çok güzel", sentiment="pozitif", overall=8):
+    """Builds one agent result in the shape returned by ECommerceReviewAgent.process_all_reviews"""
+    return {
+        'original': {'id': 1, 'product': 'Test Product', 'customer': 'Test Customer', 'review': review},
+        'analysis': {
+            'sentiment': sentiment,
+            'sentiment_score': 8,
+            'category': 'övgü',
+            'urgency': 'düşük',
+            'keywords': ['kalite', 'hızlı'],
+            'summary': review,
+            'main_issues': [],
+            'requires_action': False,
+            'response_tone': 'samimi',
+        },
+        'generated_response': f"Değerli müşterimiz, {review} için teşekkür ederiz.",
+        'quality_check': {
+            'scores': {'professionalism': 8, 'relevance': 8, 'warmth': 8, 'solution_focus': 8, 'overall': overall},
+            'feedback': '',
+            'approved': True,
+        },
+        'processed_at': '2026-01-01T00:00:00',
+    }
+
+
+def fake_agent(results):
+    """Replaces the Claude agent so the pipeline runs without LLM calls"""
+    from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+    agent = mock.MagicMock()
+    agent.process_all_reviews.return_value = results
+    agent.save_results.side_effect = save_results
+    return mock.patch('integrations.ai.agents.agent_comment.llm.claude.ECommerceReviewAgent', return_value=agent)
 
 
 # cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentsByStatusAPIViewTestCase
@@ -21,7 +65,7 @@ class CommentsByStatusAPIViewTestCase(APITestCase):
 
     def setUp(self):
         """Set up test data before each test"""
-        self.url = reverse('comments_by_status')
+        self.url = reverse('comments:comments_by_status')
 
         # Create test comments with different statuses
         self.comment_approved_1 = Comment.objects.create(
@@ -247,3 +291,2393 @@ class CommentsByStatusAPIViewTestCase(APITestCase):
     def tearDown(self):
         """Clean up after each test"""
         Comment.objects.all().delete()
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.TracingTestCase
+class TracingTestCase(APITestCase):
+    """
+    Test cases for request and pipeline tracing
+
+    Test Scenarios:
+    1. Success: POST produces HTTP, queue wait, pipeline and DB write spans in one trace linked by comment id
+    2. Success: Tracing disabled writes no spans
+    """
+
+    def setUp(self):
+        self.url = reverse('comments:tasks')
+        self.data = {
+            'customer_id': 'CUST001',
+            'product_name': 'Test Product',
+            'content_id': 'CONT001',
+            'content': 'Ürün çok güzel',
+            'web_url': 'https://example.com/1',
+            'status': 'WAITING_FOR_ANSWER'
+        }
+        handle, self.trace_file = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.trace_file)
+
+    def read_spans(self):
+        with open(self.trace_file, encoding='utf-8') as file:
+            return [json.loads(line) for line in file if line.strip()]
+
+    def test_post_comment_spans_are_linked(self):
+        """Test Case 1: Every stage of a POST is recorded in a single trace"""
+        with override_settings(TRACING_EXPORTER='file', TRACING_FILE=self.trace_file), fake_agent([make_result()]):
+            response = self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        comment = Comment.objects.get(content_id='CONT001')
+        spans = self.read_spans()
+        names = {span['name'] for span in spans}
+        self.assertTrue({'HTTP POST', 'queue.wait', 'comment.process', 'persistence.save_results', 'db.write'} <= names)
+        self.assertEqual(len({span['traceId'] for span in spans}), 1)
+
+        by_name = {span['name']: span for span in spans}
+        self.assertEqual(by_name['HTTP POST']['attributes']['comment.id'], comment.id)
+        self.assertEqual(by_name['comment.process']['attributes']['comment.id'], comment.id)
+        self.assertEqual(by_name['comment.process']['parentSpanId'], by_name['HTTP POST']['spanId'])
+
+    def test_tracing_disabled_writes_nothing(self):
+        """Test Case 2: The default 'none' exporter records no spans"""
+        with override_settings(TRACING_EXPORTER='none', TRACING_FILE=self.trace_file), fake_agent([make_result()]):
+            self.client.post(self.url, self.data, format='json')
+
+        self.assertEqual(self.read_spans(), [])
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.MetricsTestCase
+class MetricsTestCase(APITestCase):
+    """
+    Test cases for the /metrics endpoint
+
+    Test Scenarios:
+    1. Success: Comment counts per AGENT_STATUS are exposed
+    2. Success: Processing a comment updates pipeline, persistence and HTTP metrics
+    3. Success: Snapshots of other worker processes are merged in multi-process mode
+    4. Success: A worker writes its snapshot without a later change or exit
+    """
+
+    def setUp(self):
+        self.url = reverse('metrics')
+
+    def sample(self, name):
+        """Returns the value of an exposed sample line, 0 if it is not exposed yet"""
+        text = self.client.get(self.url).content.decode()
+        for line in text.splitlines():
+            if line.startswith(name + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        return 0.0
+
+    def test_status_counts(self):
+        """Test Case 1: comment_status_count reports every AGENT_STATUS"""
+        for i in range(2):
+            Comment.objects.create(customer_id=f"C{i}", product_name="P", content_id=f"M{i}", content="x",
+                                   web_url="https://example.com", status="APPROVED")
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertEqual(self.sample('comment_status_count{status="APPROVED"}'), 2.0)
+        self.assertEqual(self.sample('comment_status_count{status="ERROR"}'), 0.0)
+
+    def test_pipeline_metrics(self):
+        """Test Case 2: A POST increments processed comments, persisted results and HTTP request counters"""
+        processed = 'comment_pipeline_comments_processed_total{outcome="success"}'
+        persisted = 'comment_persistence_results_total{outcome="success"}'
+        requests = 'http_requests_total{view="comments:tasks",method="POST",status="201"}'
+        before = {name: self.sample(name) for name in (processed, persisted, requests)}
+
+        with fake_agent([make_result()]):
+            self.client.post(reverse('comments:tasks'), {
+                'customer_id': 'CUST001', 'product_name': 'Test Product', 'content_id': 'CONT001',
+                'content': 'Ürün çok güzel', 'web_url': 'https://example.com/1', 'status': 'WAITING_FOR_ANSWER'
+            }, format='json')
+
+        for name in (processed, persisted, requests):
+            self.assertEqual(self.sample(name), before[name] + 1, name)
+
+    def test_multiprocess_merge(self):
+        """Test Case 3: Counters written by an exited worker are still summed into the scrape"""
+        from app.comments.metrics import COMMENTS_PROCESSED
+
+        name = 'comment_pipeline_comments_processed_total{outcome="error"}'
+        local = self.sample(name)
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_MULTIPROC_DIR=directory):
+            snapshot = {
+                'pid': 2 ** 22 + 7,  # above the default pid_max, never alive
+                'metrics': {COMMENTS_PROCESSED.name: [[[['outcome', 'error']], 5]]},
+            }
+            with open(os.path.join(directory, 'metrics_exited.json'), 'w') as file:
+                json.dump(snapshot, file)
+
+            self.assertEqual(self.sample(name), local + 5)
+
+    def test_idle_worker_flush(self):
+        """Test Case 4: The flush thread writes the last increment of a worker that goes idle"""
+        import time
+        from app.comments.metrics import COMMENTS_PROCESSED
+        from app.core.metrics import REGISTRY
+
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(METRICS_MULTIPROC_DIR=directory, METRICS_FLUSH_INTERVAL=0.01):
+            REGISTRY.flush()
+            path = os.path.join(directory, f'metrics_{REGISTRY.process_token()}.json')
+            COMMENTS_PROCESSED.labels(outcome='skipped').inc()
+            expected = dict((tuple(map(tuple, key)), value) for key, value in COMMENTS_PROCESSED.snapshot())
+
+            for _ in range(200):
+                with open(path) as file:
+                    samples = json.load(file)['metrics'][COMMENTS_PROCESSED.name]
+                if dict((tuple(map(tuple, key)), value) for key, value in samples) == expected:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(dict((tuple(map(tuple, key)), value) for key, value in samples), expected)
+
+
+def comment_data(index, **overrides):
+    data = {
+        'customer_id': f'CUST{index:03d}',
+        'product_name': 'Test Product',
+        'content_id': f'CONT{index:03d}',
+        'content': f'Yorum {index}',
+        'web_url': f'https://example.com/{index}',
+        'status': 'WAITING_FOR_ANSWER'
+    }
+    data.update(overrides)
+    return data
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentBulkCreateAPIViewTestCase
+@override_settings(COMMENT_AGENT_DISPATCH='inline')
+class CommentBulkCreateAPIViewTestCase(APITestCase):
+    """
+    Test cases for CommentBulkCreateAPIView endpoint
+
+    Test Scenarios:
+    1. Success: All comments are inserted with a single INSERT and dispatched
+    2. Success: Invalid items are reported by index while valid ones are created
+    3. Success: Dispatch runs in batches sharing one agent per batch
+    4. Error: Body is not a list
+    5. Error: Every item is invalid
+    6. Error: Too many items
+    """
+
+    def setUp(self):
+        self.url = reverse('comments:comments_bulk_create')
+
+    def test_bulk_create_single_insert(self):
+        """Test Case 1: N new comments cost one INSERT statement"""
+        data = [comment_data(i) for i in range(10)]
+
+        with mock.patch('integrations.ai.agents.agent_comment.langchain.creator.enqueue_many') as enqueue:
+            with self.assertNumQueries(3):  # savepoint, INSERT ... RETURNING, release savepoint
+                response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['payload']['created'], 10)
+        self.assertEqual(Comment.objects.count(), 10)
+        ids = [item['id'] for item in response.data['payload']['items']]
+        self.assertEqual(enqueue.call_args.args[0], [(id, f'Yorum {i}') for i, id in enumerate(ids)])
+
+    def test_bulk_create_partial_errors(self):
+        """Test Case 2: Per-item errors keep their index"""
+        data = [comment_data(0), comment_data(1, web_url='not-a-url'), comment_data(2, status='UNKNOWN')]
+
+        with mock.patch('integrations.ai.agents.agent_comment.langchain.creator.enqueue_many'):
+            response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        payload = response.data['payload']
+        self.assertEqual((payload['created'], payload['failed']), (1, 2))
+        self.assertEqual(payload['items'][0]['index'], 0)
+        self.assertEqual([error['index'] for error in payload['errors']], [1, 2])
+        self.assertIn('web_url', payload['errors'][0]['errors'])
+
+    @override_settings(COMMENT_AGENT_BATCH_SIZE=2)
+    def test_bulk_create_batched_dispatch(self):
+        """Test Case 3: 5 comments with batch size 2 build 3 agents and are all processed"""
+        data = [comment_data(i) for i in range(5)]
+
+        with fake_agent([make_result()]) as agent_class:
+            response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(agent_class.call_count, 3)
+        self.assertEqual(Comment.objects.filter(status='WAITING_FOR_APPROVE').count(), 5)
+
+    def test_bulk_create_not_a_list(self):
+        """Test Case 4: A single object is rejected"""
+        response = self.client.post(self.url, comment_data(0), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['status'], 'false')
+
+    def test_bulk_create_all_invalid(self):
+        """Test Case 5: Nothing valid returns 400 and creates nothing"""
+        response = self.client.post(self.url, [{'content': 'x'}], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['payload']['failed'], 1)
+        self.assertEqual(Comment.objects.count(), 0)
+
+    @override_settings(COMMENT_BULK_MAX_ITEMS=2)
+    def test_bulk_create_too_many_items(self):
+        """Test Case 6: Lists above COMMENT_BULK_MAX_ITEMS are rejected"""
+        response = self.client.post(self.url, [comment_data(i) for i in range(3)], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Comment.objects.count(), 0)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentIngestAPIViewTestCase
+class CommentIngestAPIViewTestCase(APITestCase):
+    """
+    Test cases for CommentIngestAPIView endpoint
+
+    Test Scenarios:
+    1. Success: Lines are inserted chunk by chunk with a progress line per chunk and a summary
+    2. Success: Invalid JSON and invalid comments are reported by line number
+    3. Success: A failing chunk does not roll back the chunks committed before or after it
+    4. Success: The upload is consumed lazily, one chunk at a time
+    5. Error: Invalid chunk_size
+    """
+
+    def setUp(self):
+        self.url = reverse('comments:comments_ingest')
+        patcher = mock.patch('integrations.ai.agents.agent_comment.langchain.creator.enqueue_many')
+        self.enqueue = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def ingest(self, lines, chunk_size=2):
+        body = '\n'.join(lines).encode('utf-8')
+        response = self.client.post(f'{self.url}?chunk_size={chunk_size}', data=body,
+                                    content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_ingest_in_chunks(self):
+        """Test Case 1: 5 comments with chunk_size=2 produce 3 chunks"""
+        events = self.ingest([json.dumps(comment_data(i)) for i in range(5)])
+
+        self.assertEqual([event['event'] for event in events], ['chunk', 'chunk', 'chunk', 'summary'])
+        self.assertEqual([event['created'] for event in events[:3]], [2, 2, 1])
+        self.assertEqual(events[-1]['created'], 5)
+        self.assertEqual(Comment.objects.count(), 5)
+        self.assertEqual(self.enqueue.call_count, 3)
+
+    def test_ingest_reports_line_errors(self):
+        """Test Case 2: Errors carry the 1-based line number of the upload"""
+        lines = [json.dumps(comment_data(0)), '{not json', '', json.dumps(comment_data(1, web_url='bad'))]
+
+        events = self.ingest(lines, chunk_size=10)
+
+        summary = events[-1]
+        self.assertEqual((summary['created'], summary['failed']), (1, 2))
+        self.assertEqual([error['line'] for error in events[0]['errors']], [2, 4])
+        self.assertIn('web_url', events[0]['errors'][1]['errors'])
+
+    def test_ingest_partial_failure_keeps_committed_chunks(self):
+        """Test Case 3: Only the comments of the failing chunk are lost"""
+        from django.db import DatabaseError
+        from app.comments.api.serializers import CommentBulkCreateSerializer
+
+        original = CommentBulkCreateSerializer.create
+        calls = []
+
+        def create(serializer, validated_data):
+            calls.append(1)
+            if len(calls) == 2:
+                raise DatabaseError('disk I/O error')
+            return original(serializer, validated_data)
+
+        with mock.patch.object(CommentBulkCreateSerializer, 'create', create):
+            events = self.ingest([json.dumps(comment_data(i)) for i in range(6)])
+
+        self.assertEqual([event['created'] for event in events[:3]], [2, 0, 2])
+        self.assertEqual(events[1]['failed'], 2)
+        self.assertEqual(events[-1]['created'], 4)
+        self.assertEqual(Comment.objects.count(), 4)
+
+    def test_ingest_reads_lazily(self):
+        """Test Case 4: Only one chunk of the input is read before its progress event is produced"""
+        from app.comments.ingest import ingest_ndjson
+
+        consumed = []
+
+        def lines():
+            for i in range(10):
+                consumed.append(i)
+                yield json.dumps(comment_data(i)).encode('utf-8')
+
+        events = ingest_ndjson(lines(), chunk_size=3)
+        first = next(events)
+
+        self.assertEqual(first['created'], 3)
+        self.assertEqual(len(consumed), 3)
+
+    def test_ingest_invalid_chunk_size(self):
+        """Test Case 5: chunk_size must be a positive integer within COMMENT_BULK_MAX_ITEMS"""
+        for chunk_size in ('0', 'abc', '999999'):
+            response = self.client.post(f'{self.url}?chunk_size={chunk_size}', data=b'{}',
+                                        content_type='application/x-ndjson')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.IdempotentIngestTestCase
+class IdempotentIngestTestCase(APITestCase):
+    """
+    Test cases for idempotent ingestion keyed on (source, content_id)
+
+    Test Scenarios:
+    1. Success: Re-posting a comment returns the stored one without running the agent
+    2. Success: Idempotency-Key replays the first response
+    3. Success: Same content_id from another source is a different comment
+    4. Success: Bulk upsert refreshes existing rows, keeps their workflow state and product and skips the agent
+    5. Success: A key repeated inside one bulk payload is inserted once
+    6. Success: Re-uploading an NDJSON file creates nothing
+    7. Success: A lost insert race without a key replays the comment with the same (source, content_id)
+    8. Success: Replays return the stored id and idempotency_key is not listed
+    9. Error: An Idempotency-Key reused with a different comment returns 422
+    """
+
+    def setUp(self):
+        patcher = mock.patch('integrations.ai.agents.agent_comment.langchain.creator.create')
+        self.create = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('integrations.ai.agents.agent_comment.langchain.creator.enqueue_many')
+        self.enqueue = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repost_returns_existing(self):
+        """Test Case 1: Duplicate POST short-circuits before any LLM work"""
+        url = reverse('comments:tasks')
+        first = self.client.post(url, comment_data(1, source='trendyol'), format='json')
+        second = self.client.post(url, comment_data(1, source='trendyol'), format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data['message'], 'Comment already exists')
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_idempotency_key_replay(self):
+        """Test Case 2: A retried request with the same key returns the first comment"""
+        url = reverse('comments:tasks')
+        self.client.post(url, comment_data(1), format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        replay = self.client.post(url, comment_data(1), format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        self.assertEqual(replay.status_code, status.HTTP_200_OK)
+        self.assertEqual(replay.data['payload']['content_id'], 'CONT001')
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Comment.objects.get().idempotency_key, 'retry-1')
+
+    def test_same_content_id_other_source(self):
+        """Test Case 3: Uniqueness is scoped by source"""
+        url = reverse('comments:tasks')
+        self.client.post(url, comment_data(1, source='trendyol'), format='json')
+        response = self.client.post(url, comment_data(1, source='hepsiburada'), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_bulk_upsert(self):
+        """Test Case 4: Existing rows are updated in place and not queued"""
+        stored = Comment.objects.create(**comment_data(1, status='WAITING_FOR_APPROVE'))
+
+        response = self.client.post(reverse('comments:comments_bulk_create'), [
+            comment_data(1, customer_id='CUST999', product_name='Renamed Product', status='WAITING_FOR_ANSWER'),
+            comment_data(2),
+        ], format='json')
+
+        payload = response.data['payload']
+        self.assertEqual((payload['created'], payload['existing']), (1, 1))
+        self.assertEqual(payload['items'][0], {'index': 0, 'id': stored.id, 'status': 'existing'})
+        stored.refresh_from_db()
+        self.assertEqual(stored.customer_id, 'CUST999')
+        self.assertEqual(stored.product_name, comment_data(1)['product_name'])
+        self.assertEqual(stored.status, 'WAITING_FOR_APPROVE')
+        self.assertEqual([id for id, _ in self.enqueue.call_args.args[0]], [payload['items'][1]['id']])
+
+    def test_bulk_duplicate_in_payload(self):
+        """Test Case 5: The second occurrence reports the id of the first"""
+        response = self.client.post(reverse('comments:comments_bulk_create'), [
+            comment_data(1), comment_data(1, content='Again'),
+        ], format='json')
+
+        items = response.data['payload']['items']
+        self.assertEqual(items[0]['id'], items[1]['id'])
+        self.assertEqual([item['status'] for item in items], ['created', 'existing'])
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_ndjson_reupload(self):
+        """Test Case 6: The second upload of the same file only reports existing comments"""
+        url = reverse('comments:comments_ingest')
+        body = '\n'.join(json.dumps(comment_data(i)) for i in range(3)).encode('utf-8')
+
+        for _ in range(2):
+            response = self.client.post(url, data=body, content_type='application/x-ndjson')
+            summary = json.loads(b''.join(response.streaming_content).splitlines()[-1])
+
+        self.assertEqual((summary['created'], summary['existing']), (0, 3))
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertEqual(self.enqueue.call_count, 1)
+
+    def test_lost_race_without_key(self):
+        """Test Case 7: The fallback lookup ignores other keyless comments"""
+        Comment.objects.create(**comment_data(2))
+
+        def concurrent_insert(*args, **kwargs):
+            Comment.objects.create(**comment_data(1))
+            raise IntegrityError('UNIQUE constraint failed')
+
+        # The competing insert has to outlive the savepoint the view rolls back
+        with mock.patch('app.comments.api.views.transaction.atomic', contextlib.nullcontext), \
+                mock.patch('app.comments.api.serializers.CommentCreateSerializer.save', side_effect=concurrent_insert):
+            response = self.client.post(reverse('comments:tasks'), comment_data(1), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['payload']['content_id'], 'CONT001')
+
+    def test_replay_payload_and_hidden_key(self):
+        """Test Case 8: The replay carries the id, the list does not carry the key"""
+        url = reverse('comments:tasks')
+        first = self.client.post(url, comment_data(1), format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        replay = self.client.post(url, comment_data(1), format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+        stored = Comment.objects.get()
+
+        self.assertEqual(first.data['payload']['id'], stored.id)
+        self.assertEqual(replay.data['payload']['id'], stored.id)
+        listed = self.client.get(url).data['payload']
+        self.assertNotIn('idempotency_key', json.dumps(listed, default=str))
+
+    def test_idempotency_key_reused(self):
+        """Test Case 9: A key sent again with another comment is rejected, nothing is stored"""
+        url = reverse('comments:tasks')
+        first = self.client.post(url, comment_data(1), format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+
+        for body in [comment_data(2), comment_data(1, content='Başka bir yorum'), comment_data(1, source='trendyol')]:
+            response = self.client.post(url, body, format='json', HTTP_IDEMPOTENCY_KEY='retry-1')
+            self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY, body)
+            self.assertEqual(response.data['status'], 'false')
+            self.assertEqual(response.data['payload'], {'id': first.data['payload']['id']})
+
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(self.create.call_count, 1)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.SaveResultsTestCase
+class SaveResultsTestCase(APITestCase):
+    """
+    Test cases for persisting agent results
+
+    Test Scenarios:
+    1. Success: Every result is stored as an analysis with the same number of queries for 1 or 5 results
+    2. Success: The quality score averages the results and is replaced on reprocessing
+    3. Error: A missing comment stores nothing
+    """
+
+    def setUp(self):
+        self.comment = Comment.objects.create(**comment_data(1))
+
+    def save(self, results):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        save_results(self.comment.id, results)
+
+    def test_all_results_with_fixed_queries(self):
+        """Test Case 1: Query count does not depend on the number of results"""
+        from django.test.utils import CaptureQueriesContext
+        from django.db import connection
+
+        with CaptureQueriesContext(connection) as single:
+            self.save([make_result()])
+        with CaptureQueriesContext(connection) as many:
+            self.save([make_result(review=f'Yorum {i}') for i in range(5)])
+
+        self.assertEqual(len(single), len(many))
+        self.assertEqual(self.comment.analyzers.count(), 6)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.status, 'WAITING_FOR_APPROVE')
+        self.assertEqual(self.comment.response, make_result(review='Yorum 0')['generated_response'])
+
+    def test_quality_score_upsert(self):
+        """Test Case 2: Scores are averaged and a second run replaces them"""
+        self.save([make_result(overall=6), make_result(overall=9)])
+        self.assertEqual(self.comment.quality_score.overall, 8)
+
+        self.save([make_result(overall=4)])
+        self.comment.quality_score.refresh_from_db()
+        self.assertEqual(self.comment.quality_score.overall, 4)
+
+    def test_missing_comment(self):
+        """Test Case 3: Nothing is written for an unknown comment"""
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        from app.comments.models import CommentAnalyzer
+
+        save_results(self.comment.id + 100, [make_result()])
+
+        self.assertEqual(CommentAnalyzer.objects.count(), 0)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.StatusTransitionTestCase
+class StatusTransitionTestCase(APITestCase):
+    """
+    Test cases for conditional status transitions
+
+    Test Scenarios:
+    1. Success: Approve is one conditional UPDATE and keeps the optional response
+    2. Error: Approving twice fails the second time without writing
+    3. Error: Illegal and unknown target statuses are rejected
+    4. Error: Unknown comment returns 404
+    5. Success: Agent results never overwrite the status of a moderated comment
+    """
+
+    def setUp(self):
+        self.comment = Comment.objects.create(**comment_data(1, status='WAITING_FOR_APPROVE'))
+        self.approve_url = reverse('comments:approve_comment')
+        self.update_url = reverse('comments:update_answered_comments')
+
+    def test_approve_single_update(self):
+        """Test Case 1: Check and write happen in one UPDATE, then the comment is read back"""
+        with self.assertNumQueries(2):
+            response = self.client.post(self.approve_url, {'id': self.comment.id, 'response': 'Teşekkürler'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['payload']['status'], 'APPROVED')
+        self.assertEqual(response.data['payload']['response'], 'Teşekkürler')
+
+    def test_approve_twice(self):
+        """Test Case 2: A stale second approve does not change the comment"""
+        self.client.post(self.approve_url, {'id': self.comment.id}, format='json')
+        self.client.post(self.update_url, {'id': self.comment.id, 'status': 'ANSWERED'}, format='json')
+
+        response = self.client.post(self.approve_url, {'id': self.comment.id, 'response': 'Eski'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Comment status must be WAITING_FOR_APPROVE. Current status: ANSWERED')
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.status, 'ANSWERED')
+        self.assertNotEqual(self.comment.response, 'Eski')
+
+    def test_illegal_transition(self):
+        """Test Case 3: WAITING_FOR_APPROVE cannot jump to ANSWERED, unknown statuses are refused"""
+        response = self.client.post(self.update_url, {'id': self.comment.id, 'status': 'ANSWERED'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Comment status cannot change from WAITING_FOR_APPROVE to ANSWERED')
+
+        response = self.client.post(self.update_url, {'id': self.comment.id, 'status': 'DONE'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Invalid status: DONE')
+
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.status, 'WAITING_FOR_APPROVE')
+
+    def test_not_found(self):
+        """Test Case 4: Both endpoints return 404 for an unknown id"""
+        response = self.client.post(self.approve_url, {'id': 9999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.post(self.update_url, {'id': 9999, 'status': 'REJECTED'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_results_keep_moderated_status(self):
+        """Test Case 5: A comment rejected while the agent ran stays rejected, its analyses are still stored"""
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        self.client.post(self.update_url, {'id': self.comment.id, 'status': 'REJECTED'}, format='json')
+        save_results(self.comment.id, [make_result()])
+
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.status, 'REJECTED')
+        self.assertNotEqual(self.comment.response, make_result()['generated_response'])
+        self.assertEqual(self.comment.analyzers.count(), 1)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.BulkTransitionAPIViewTestCase
+class BulkTransitionAPIViewTestCase(APITestCase):
+    """
+    Test cases for bulk approve and bulk status update
+
+    Test Scenarios:
+    1. Success: Approve many comments in a fixed number of queries with per-id responses
+    2. Success: Per-id results report rejected and missing comments
+    3. Success: Bulk status update applies only legal transitions
+    4. Error: Invalid body, unknown status or response ids return 400
+    """
+
+    def setUp(self):
+        self.comments = [
+            Comment.objects.create(**comment_data(i, status='WAITING_FOR_APPROVE', response='taslak'))
+            for i in range(5)
+        ]
+        self.ids = [comment.id for comment in self.comments]
+        self.approve_url = reverse('comments:approve_comments_bulk')
+        self.status_url = reverse('comments:update_answered_comments_bulk')
+
+    def test_bulk_approve(self):
+        """Test Case 1: One SELECT and one UPDATE whatever the number of comments"""
+        data = {'ids': self.ids, 'responses': {str(self.ids[1]): 'Teşekkürler', str(self.ids[3]): 'Özür dileriz'}}
+        with self.assertNumQueries(4):  # SAVEPOINT, SELECT, UPDATE, RELEASE SAVEPOINT
+            response = self.client.post(self.approve_url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['payload']['updated'], 5)
+        responses = dict(Comment.objects.filter(status='APPROVED').values_list('id', 'response'))
+        self.assertEqual(responses[self.ids[0]], 'taslak')
+        self.assertEqual(responses[self.ids[1]], 'Teşekkürler')
+        self.assertEqual(responses[self.ids[3]], 'Özür dileriz')
+
+    def test_bulk_approve_partial(self):
+        """Test Case 2: Already answered and unknown ids are reported, the rest is approved"""
+        Comment.objects.filter(id=self.ids[0]).update(status='ANSWERED')
+
+        response = self.client.post(self.approve_url, {'ids': [self.ids[0], 9999, self.ids[1], self.ids[1]]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = response.data['payload']
+        self.assertEqual((payload['updated'], payload['failed']), (1, 2))
+        self.assertEqual([item['result'] for item in payload['items']], ['rejected', 'not_found', 'updated'])
+        self.assertEqual(payload['items'][0]['message'], 'Comment status must be WAITING_FOR_APPROVE. Current status: ANSWERED')
+        self.assertEqual(Comment.objects.get(id=self.ids[0]).status, 'ANSWERED')
+
+    def test_bulk_status(self):
+        """Test Case 3: Only APPROVED comments move to ANSWERED"""
+        Comment.objects.filter(id__in=self.ids[:3]).update(status='APPROVED')
+
+        response = self.client.post(self.status_url, {'ids': self.ids, 'status': 'ANSWERED'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['payload']['updated'], 3)
+        self.assertEqual(
+            response.data['payload']['items'][4]['message'],
+            'Comment status cannot change from WAITING_FOR_APPROVE to ANSWERED'
+        )
+        self.assertEqual(Comment.objects.filter(status='ANSWERED').count(), 3)
+
+    def test_invalid_body(self):
+        """Test Case 4: Validation errors update nothing"""
+        for url, data in [
+            (self.approve_url, {'ids': []}),
+            (self.approve_url, {'ids': self.ids[:1], 'responses': {str(self.ids[2]): 'x'}}),
+            (self.status_url, {'ids': self.ids, 'status': 'DONE'}),
+        ]:
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.approve_url, {'ids': [9999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Comment.objects.filter(status='WAITING_FOR_APPROVE').count(), 5)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.QueryPlanTestCase
+class QueryPlanTestCase(APITestCase):
+    """
+    Query-plan regression tests. SQLite statistics are faked so the planner
+    sees 1M comments and 3M analyses instead of the empty test tables.
+
+    Test Scenarios:
+    1. Success: List and status filter read an index in order, without a full scan or a sort
+    2. Success: Lookups by content_id, customer_id and product_name use an index
+    3. Success: Analyses are read by comment and by sentiment through an index
+    4. Success: Every CommentFilter combination is answered through indexes
+    5. Success: Keyword lookups and top keywords go through the term index
+    """
+
+    ROWS = {
+        'comments_comment': 1_000_000,
+        'comments_commentanalyzer': 3_000_000,
+        'comments_commentqualityscore': 1_000_000,
+        'comments_term': 100_000,
+        'comments_commentterm': 10_000_000,
+    }
+    # Average number of rows per distinct value of a leading index column
+    ROWS_PER_VALUE = {
+        'status': 125_000, 'sentiment': 1_000_000, 'urgency': 1_000_000, 'category': 300_000,
+        'product_name': 1_000, 'customer_id': 10, 'comment_id': 3, 'overall': 100_000, 'approved': 500_000,
+        'kind': 50_000, 'term_id': 100,
+    }
+
+    def setUp(self):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute('DELETE FROM sqlite_stat1')
+            for table, rows in self.ROWS.items():
+                cursor.execute('INSERT INTO sqlite_stat1 VALUES (%s, NULL, %s)', [table, str(rows)])
+                for index in cursor.execute(f'PRAGMA index_list({table})').fetchall():
+                    columns = [info[2] for info in cursor.execute(f'PRAGMA index_info({index[1]})').fetchall()]
+                    # Partial indexes cover a small share of the table
+                    stat = [rows // 20 if index[4] else rows] + [self.ROWS_PER_VALUE.get(column, 1) if i == 0 else 1 for i, column in enumerate(columns)]
+                    cursor.execute('INSERT INTO sqlite_stat1 VALUES (%s, %s, %s)', [table, index[1], ' '.join(map(str, stat))])
+            # Makes the planner reload the statistics
+            cursor.execute('ANALYZE sqlite_schema')
+
+    def assertIndexed(self, queryset, sorted_by_index=True):
+        plan = queryset.explain()
+        self.assertNotRegex(plan, r'SCAN \w+(?! USING)( |$)', plan)
+        if sorted_by_index:
+            self.assertNotIn('TEMP B-TREE', plan, plan)
+
+    def test_list_and_status_filter(self):
+        """Test Case 1: Newest-first pages are read from an index"""
+        self.assertIndexed(Comment.objects.all()[:50])
+        self.assertIndexed(Comment.objects.filter(status='WAITING_FOR_ANSWER')[:50])
+        self.assertIndexed(Comment.objects.filter(status='WAITING_FOR_APPROVE'))
+
+    def test_lookups(self):
+        """Test Case 2: Point and range lookups on the synced identifiers"""
+        # A handful of rows per value, sorting them is cheap
+        self.assertIndexed(Comment.objects.filter(content_id='CONT001'), sorted_by_index=False)
+        self.assertIndexed(Comment.objects.filter(customer_id='CUST001'))
+        self.assertIndexed(Comment.objects.filter(product_name='iPhone 14 Pro')[:50])
+
+    def test_analyzers(self):
+        """Test Case 3: Analyses of a comment and of a sentiment"""
+        from app.comments.models import CommentAnalyzer
+
+        self.assertIndexed(CommentAnalyzer.objects.filter(comment_id=1).order_by('-analyzed_at'))
+        self.assertIndexed(CommentAnalyzer.objects.filter(sentiment='negatif').values('comment_id'))
+        self.assertIndexed(CommentAnalyzer.objects.filter(required_action=True).values('comment_id'))
+
+    def test_filters(self):
+        """Test Case 4: Filter pages never scan a table"""
+        from django.http import QueryDict
+        from app.comments.filters import CommentFilter
+
+        for query in [
+            'product_name=iPhone&created_after=2026-01-01T00:00:00Z&created_before=2026-02-01T00:00:00Z',
+            'customer_id=CUST001',
+            'created_after=2026-01-01T00:00:00Z',
+            'status=WAITING_FOR_APPROVE&sentiment=negatif&urgency=y%C3%BCksek',
+            'category=kargo',
+            'overall_min=8&overall_max=10',
+            'approved=true&overall_min=9',
+            'product_name=iPhone&approved=false&sentiment=negatif',
+        ]:
+            queryset = CommentFilter(QueryDict(query), queryset=Comment.objects.all()).qs
+            # Selective filters may be driven from the quality score index and sort their matches
+            self.assertIndexed(queryset.order_by('-created', '-id')[:50], sorted_by_index=False)
+
+    def test_terms(self):
+        """Test Case 5: Term -> comments and the terms of a product's comments"""
+        from django.db.models import Count
+        from app.comments.models import CommentTerm, Term
+
+        links = CommentTerm.objects.filter(term__in=Term.objects.filter(key='isinma')).values('comment_id')
+        # The matches of a term are sorted, not the whole table
+        self.assertIndexed(Comment.objects.filter(id__in=links).order_by('-created', '-id')[:50], sorted_by_index=False)
+        self.assertIndexed(
+            CommentTerm.objects.filter(comment__product_name='iPhone', term__kind='keyword')
+            .values('term_id', 'term__kind', 'term__name').annotate(comments=Count('comment_id'))
+            .order_by('-comments')[:20],
+            sorted_by_index=False
+        )
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentPaginationTestCase
+class CommentPaginationTestCase(APITestCase):
+    """
+    Test cases for keyset pagination of the comment list endpoints
+
+    Test Scenarios:
+    1. Success: Next links walk every comment once, newest first, also across equal timestamps
+    2. Success: Previous links walk back to the first page
+    3. Success: A deep page is one indexed query besides the ETag check, filters are kept in the links
+    4. Error: Invalid cursor or page_size returns 400
+    """
+
+    def setUp(self):
+        from django.utils import timezone
+
+        self.comments = [Comment.objects.create(**comment_data(i)) for i in range(7)]
+        # Three comments share a timestamp, so the order falls back to id
+        Comment.objects.filter(id__in=[c.id for c in self.comments[2:5]]).update(created=timezone.now())
+        self.expected = list(Comment.objects.order_by('-created', '-id').values_list('id', flat=True))
+        self.url = reverse('comments:tasks')
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in response.data['payload']])
+            url = response.data[link]
+        return pages
+
+    def test_next_pages(self):
+        """Test Case 1: Pages of 3 cover the 7 comments in order"""
+        pages = self.walk(f'{self.url}?page_size=3', 'next')
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+
+    def test_previous_pages(self):
+        """Test Case 2: Walking back from the last page returns the same pages"""
+        response = self.client.get(f'{self.url}?page_size=3')
+        self.assertIsNone(response.data['previous'])
+        response = self.client.get(response.data['next'])
+        last = self.client.get(response.data['next'])
+
+        pages = self.walk(last.data['previous'], 'previous')
+
+        self.assertEqual(pages, [self.expected[3:6], self.expected[:3]])
+
+    def test_deep_page_single_query(self):
+        """Test Case 3: A cursor page is read with one query using the status index"""
+        from app.comments.api.paginations import CommentCursorPagination
+
+        url = f"{reverse('comments:comments_by_status')}?status=WAITING_FOR_ANSWER&page_size=2"
+        response = self.client.get(url)
+        self.assertIn('status=WAITING_FOR_ANSWER', response.data['next'])
+
+        with self.assertNumQueries(2):  # ETag version, page
+            response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['payload']], self.expected[2:4])
+
+        cursor = CommentCursorPagination.decode_cursor(response.data['next'].split('cursor=')[1].split('&')[0])
+        plan = Comment.objects.filter(status='WAITING_FOR_ANSWER', created__lte=cursor['created']) \
+            .order_by('-created', '-id')[:3].explain()
+        self.assertIn('USING INDEX comment_status_created_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_invalid_parameters(self):
+        """Test Case 4: Broken cursors and page sizes are rejected"""
+        for query in ['cursor=not-a-cursor', 'page_size=0', 'page_size=abc', 'page_size=100000']:
+            response = self.client.get(f'{self.url}?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+            self.assertEqual(response.data['status'], 'false')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.SparseFieldsetTestCase
+class SparseFieldsetTestCase(APITestCase):
+    """
+    Test cases for ?fields= and the lean list serializer
+
+    Test Scenarios:
+    1. Success: Lean rows are identical to CommentListSerializer output
+    2. Success: ?fields= limits the payload and the selected columns
+    3. Success: Pagination works when created and id are not requested
+    4. Error: Unknown fields return 400
+    """
+
+    def setUp(self):
+        for i in range(3):
+            Comment.objects.create(**comment_data(i, response=f'Yanıt {i}'))
+        self.url = reverse('comments:tasks')
+
+    def test_same_output_as_model_serializer(self):
+        """Test Case 1: Every field, including datetimes, matches the ModelSerializer"""
+        from app.comments.api.serializers import CommentListSerializer
+
+        response = self.client.get(self.url)
+
+        expected = CommentListSerializer(Comment.objects.order_by('-created', '-id'), many=True).data
+        self.assertEqual(response.data['payload'], [dict(row) for row in expected])
+
+    def test_sparse_fields(self):
+        """Test Case 2: Only the requested columns are read and returned"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{self.url}?fields=id,status,product_name')
+
+        self.assertEqual(list(response.data['payload'][0]), ['id', 'status', 'product_name'])
+        self.assertNotIn('"content"', queries[0]['sql'])
+        self.assertNotIn('"response"', queries[0]['sql'])
+
+    def test_sparse_fields_pagination(self):
+        """Test Case 3: The cursor does not depend on the requested fields"""
+        response = self.client.get(f'{self.url}?fields=status&page_size=2')
+        self.assertEqual(response.data['payload'], [{'status': 'WAITING_FOR_ANSWER'}] * 2)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['payload']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_unknown_fields(self):
+        """Test Case 4: Fields outside the list serializer are rejected"""
+        response = self.client.get(f"{reverse('comments:comments_by_status')}?status=ERROR&fields=id,secret")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Unknown fields: secret')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.ORJSONRendererTestCase
+class ORJSONRendererTestCase(APITestCase):
+    """
+    Test cases for the orjson renderer and parser
+
+    Test Scenarios:
+    1. Success: Output is byte-identical to DRF JSONRenderer for datetimes, Decimals, UUIDs and lazy strings
+    2. Success: Endpoints render and parse with orjson
+    3. Error: Malformed JSON bodies return 400
+    """
+
+    def test_same_output_as_json_renderer(self):
+        """Test Case 1: Every type the API returns renders like the default renderer"""
+        import datetime
+        import decimal
+        import uuid
+        from zoneinfo import ZoneInfo
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+        from app.core.api.renderers import ORJSONRenderer
+
+        data = {
+            'utc': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            'istanbul': datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=ZoneInfo('Europe/Istanbul')),
+            'naive': datetime.datetime(2026, 1, 2, 3, 4, 5),
+            'date': datetime.date(2026, 1, 2),
+            'time': datetime.time(3, 4, 5),
+            'duration': datetime.timedelta(minutes=1, seconds=30),
+            'decimal': decimal.Decimal('4.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('Yorum'),
+            'text': 'Ürün çok güzel\u2028satır\u2029',
+            'nested': [{1: 'bir', 'none': None, 'float': 0.1, 'bool': True}],
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_endpoints_use_orjson(self):
+        """Test Case 2: A JSON request is parsed and its response rendered by orjson"""
+        from app.core.api.renderers import ORJSONRenderer
+
+        response = self.client.post(
+            reverse('comments:approve_comments_bulk'), data=json.dumps({'ids': [9999]}), content_type='application/json'
+        )
+
+        self.assertIsInstance(response.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(response.json()['payload']['items'], [{'id': 9999, 'result': 'not_found', 'message': 'Comment not found'}])
+
+    def test_malformed_json(self):
+        """Test Case 3: Parse errors keep the DRF message"""
+        response = self.client.post(reverse('comments:approve_comment'), data='{"id": ', content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.json()['detail'].startswith('JSON parse error - '))
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.ConditionalGetTestCase
+@override_settings(COMMENT_CACHE_TIMEOUT=0)
+class ConditionalGetTestCase(APITestCase):
+    """
+    Test cases for ETag / Last-Modified on comment detail and lists
+
+    Test Scenarios:
+    1. Success: An unchanged detail returns 304 after one query, without a body
+    2. Success: A new analysis changes the detail ETag
+    3. Success: Lists return 304 until any comment changes
+    4. Success: If-Modified-Since is honoured and ETags depend on the query parameters
+    5. Success: Deleting a comment that is not the newest changes the list ETag
+    """
+
+    def setUp(self):
+        self.comment = Comment.objects.create(**comment_data(1, status='WAITING_FOR_APPROVE'))
+        self.other = Comment.objects.create(**comment_data(2, status='WAITING_FOR_APPROVE'))
+        self.detail_url = reverse('comments:comment_detail', kwargs={'comment_id': self.comment.id})
+        self.list_url = f"{reverse('comments:comments_by_status')}?status=WAITING_FOR_APPROVE"
+
+    def test_detail_not_modified(self):
+        """Test Case 1: Only the version query runs for a matching If-None-Match"""
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_detail_new_analysis(self):
+        """Test Case 2: Analyses stored without touching the comment still invalidate it"""
+        from integrations.ai.agents.agent_comment.llm.persistence import build_analyzer
+
+        etag = self.client.get(self.detail_url)['ETag']
+        build_analyzer(self.comment.id, make_result()).save()
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['payload']['analyzers']), 1)
+
+    def test_list_not_modified(self):
+        """Test Case 3: Moving another comment out of the list changes its ETag"""
+        etag = self.client.get(self.list_url)['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.post(reverse('comments:approve_comment'), {'id': self.other.id}, format='json')
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['payload']], [self.comment.id])
+
+    def test_if_modified_since_and_parameters(self):
+        """Test Case 4: Last-Modified revalidation and per-URL ETags"""
+        response = self.client.get(self.detail_url)
+
+        cached = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        etag = self.client.get(self.list_url)['ETag']
+        response = self.client.get(f'{self.list_url}&fields=id', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_delete(self):
+        """Test Case 5: A delete does not move MAX(updated) but still invalidates the list"""
+        etag = self.client.get(self.list_url)['ETag']
+        self.comment.delete()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['payload']], [self.other.id])
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.ResponseCacheTestCase
+class ResponseCacheTestCase(APITestCase):
+    """
+    Test cases for the read endpoint response cache
+
+    Test Scenarios:
+    1. Success: A repeated detail or list read is a hit without any query
+    2. Success: Hits still answer If-None-Match with 304
+    3. Success: Saves, transitions, bulk upserts and agent results invalidate the affected responses
+    4. Success: Hits and misses are counted in /metrics
+    5. Success: Responses are cached per negotiated media type
+    6. Error: Commands refuse to run on a process-local cache
+    """
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.comment = Comment.objects.create(**comment_data(1, status='WAITING_FOR_APPROVE'))
+        self.detail_url = reverse('comments:comment_detail', kwargs={'comment_id': self.comment.id})
+        self.list_url = f"{reverse('comments:comments_by_status')}?status=WAITING_FOR_APPROVE"
+
+    def assertCache(self, url, result):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], result, url)
+        return response
+
+    def test_hit_without_queries(self):
+        """Test Case 1: The second read is served from the cache"""
+        for url in [self.detail_url, self.list_url, reverse('comments:tasks')]:
+            first = self.assertCache(url, 'MISS')
+            with self.assertNumQueries(0):
+                second = self.assertCache(url, 'HIT')
+            self.assertEqual(second.json(), first.json())
+            self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_hit_not_modified(self):
+        """Test Case 2: Conditional requests are answered from the cached validators"""
+        etag = self.assertCache(self.detail_url, 'MISS')['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_writes_invalidate(self):
+        """Test Case 3: Every write path bumps the versions of the lists and of the comment"""
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        from app.comments.models import CommentQualityScore
+
+        writes = [
+            lambda: Comment.objects.get(id=self.comment.id).save(),
+            lambda: self.client.post(reverse('comments:approve_comment'), {'id': self.comment.id}, format='json'),
+            lambda: Comment.objects.upsert([Comment(**comment_data(1, customer_id='CUST999'))]),
+            lambda: save_results(self.comment.id, [make_result()]),
+            lambda: CommentQualityScore.objects.filter(comment=self.comment).first().save(),
+        ]
+        for write in writes:
+            self.client.get(self.detail_url)
+            self.assertCache(self.list_url, 'HIT' if write is not writes[0] else 'MISS')
+            write()
+            self.assertCache(self.detail_url, 'MISS')
+            self.assertCache(self.list_url, 'MISS')
+
+        other = Comment.objects.create(**comment_data(2))
+        self.assertCache(self.detail_url, 'HIT')
+        self.assertCache(reverse('comments:comment_detail', kwargs={'comment_id': other.id}), 'MISS')
+
+    def test_metrics(self):
+        """Test Case 4: comment_cache_requests_total counts per view and result"""
+        self.assertCache(self.detail_url, 'MISS')
+        self.assertCache(self.detail_url, 'HIT')
+
+        body = self.client.get(reverse('metrics')).content.decode()
+
+        self.assertIn('comment_cache_requests_total{view="comment_detail",result="hit"}', body)
+        self.assertIn('comment_cache_requests_total{view="comment_detail",result="miss"}', body)
+
+    def test_media_types(self):
+        """Test Case 5: A browsable API read does not hit the JSON entry"""
+        etag = self.assertCache(self.detail_url, 'MISS')['ETag']
+
+        response = self.client.get(self.detail_url, HTTP_ACCEPT='text/html')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertCache(self.detail_url, 'HIT')
+
+    def test_command_on_local_cache(self):
+        """Test Case 6: Versions bumped by a command would never reach the web workers"""
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        with self.assertRaisesMessage(CommandError, 'LocMemCache'):
+            call_command('rebuild_comment_rollups', stdout=io.StringIO())
+        with override_settings(COMMENT_CACHE_TIMEOUT=0):
+            call_command('rebuild_comment_rollups', stdout=io.StringIO())
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentFilterTestCase
+@override_settings(COMMENT_CACHE_TIMEOUT=0)
+class CommentFilterTestCase(APITestCase):
+    """
+    Test cases for the comment list filters
+
+    Test Scenarios:
+    1. Success: Every filter selects the expected comments with the same number of queries
+    2. Success: Analysis filters match the same analysis and return a comment once
+    3. Success: Filters also apply to status/filter
+    4. Error: Invalid filter values return 400
+    """
+
+    def setUp(self):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        self.phone = Comment.objects.create(**comment_data(1, product_name='iPhone', customer_id='CUST001'))
+        self.case = Comment.objects.create(**comment_data(2, product_name='Kılıf', customer_id='CUST002'))
+        self.empty = Comment.objects.create(**comment_data(3, product_name='iPhone', customer_id='CUST003'))
+        save_results(self.phone.id, [make_result(sentiment='negatif', overall=4), make_result(sentiment='negatif', overall=6)])
+        negative = make_result(sentiment='negatif', overall=9)
+        negative['analysis']['urgency'] = 'yüksek'
+        save_results(self.case.id, [negative, make_result(sentiment='pozitif', overall=9)])
+        self.url = reverse('comments:tasks')
+
+    def ids(self, query, url=None):
+        with self.assertNumQueries(2):  # ETag version, page
+            response = self.client.get(f'{url or self.url}?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return sorted(item['id'] for item in response.data['payload'])
+
+    def test_filters(self):
+        """Test Case 1: Comment columns, date range and quality score"""
+        phone, case, empty = self.phone.id, self.case.id, self.empty.id
+
+        self.assertEqual(self.ids('product_name=iPhone'), [phone, empty])
+        self.assertEqual(self.ids('customer_id=CUST002'), [case])
+        self.assertEqual(self.ids('created_after=2000-01-01T00:00:00Z&created_before=2100-01-01T00:00:00Z'), [phone, case, empty])
+        self.assertEqual(self.ids('created_before=2000-01-01T00:00:00Z'), [])
+        self.assertEqual(self.ids('overall_min=5&overall_max=8'), [phone])
+        self.assertEqual(self.ids('approved=true&overall_min=9'), [case])
+        self.assertEqual(self.ids('category=övgü&product_name=Kılıf'), [case])
+
+    def test_analyzer_filters(self):
+        """Test Case 2: sentiment and urgency must hold for one analysis"""
+        self.assertEqual(self.ids('sentiment=negatif'), [self.phone.id, self.case.id])
+        self.assertEqual(self.ids('sentiment=negatif&urgency=yüksek'), [self.case.id])
+        self.assertEqual(self.ids('sentiment=pozitif&urgency=yüksek'), [])
+
+    def test_status_filter_endpoint(self):
+        """Test Case 3: status/filter accepts the same filters"""
+        url = reverse('comments:comments_by_status')
+
+        self.assertEqual(self.ids('status=WAITING_FOR_APPROVE&product_name=iPhone', url), [self.phone.id])
+
+    def test_invalid_values(self):
+        """Test Case 4: Malformed numbers, booleans and dates are rejected"""
+        for query in ['overall_min=abc', 'created_after=yesterday', 'created_before=2026-13-01']:
+            response = self.client.get(f'{self.url}?{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+            self.assertEqual(response.data['status'], 'false')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentSearchAPIViewTestCase
+class CommentSearchAPIViewTestCase(APITestCase):
+    """
+    Test cases for full-text comment search
+
+    Test Scenarios:
+    1. Success: Turkish case, dotless i and diacritics are folded, words match by prefix
+    2. Success: Results are ranked, product name and content outrank the response
+    3. Success: The index follows saves, QuerySet.update, bulk upserts and deletes
+    4. Success: FTS syntax in the query is searched literally
+    5. Error: Missing query or invalid limit returns 400
+    6. Success: The triggers run on a plain SQLite connection without application functions
+    """
+
+    def setUp(self):
+        self.battery = Comment.objects.create(**comment_data(
+            1, product_name='iPhone 14 Pro', content='Bataryası çok çabuk bitiyor, IŞIK da zayıf', response='Üzgünüz'
+        ))
+        self.refund = Comment.objects.create(**comment_data(
+            2, product_name='Kılıf', content='İade etmek istiyorum', response='Batarya ile ilgili değil, iade süreci başladı'
+        ))
+        self.url = reverse('comments:comments_search')
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'q': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['id'] for item in response.data['payload']]
+
+    def test_turkish_folding(self):
+        """Test Case 1: Folded, case-insensitive prefix matching"""
+        for query in ['BATARYASI', 'bataryasi', 'ışık', 'isik', 'ÇABUK']:
+            self.assertEqual(self.search(query), [self.battery.id], query)
+        self.assertEqual(self.search('İADE'), [self.refund.id])
+        self.assertEqual(self.search('iphone batarya'), [self.battery.id])
+
+    def test_ranking(self):
+        """Test Case 2: A content hit ranks above a response-only hit, scores decrease"""
+        for i in range(3, 6):
+            Comment.objects.create(**comment_data(i, content='Kargo hızlıydı'))
+
+        response = self.client.get(self.url, {'q': 'batarya', 'fields': 'id,product_name'})
+
+        payload = response.data['payload']
+        self.assertEqual([item['id'] for item in payload], [self.battery.id, self.refund.id])
+        self.assertEqual(list(payload[0]), ['id', 'product_name', 'score'])
+        self.assertGreater(payload[0]['score'], payload[1]['score'])
+
+    def test_index_sync(self):
+        """Test Case 3: Every write path updates the search table"""
+        Comment.objects.filter(id=self.battery.id).update(content='Ekran kırık geldi')
+        self.assertEqual(self.search('ekran'), [self.battery.id])
+        self.assertEqual(self.search('bitiyor'), [])
+
+        objs, _ = Comment.objects.upsert([Comment(**comment_data(3, content='Kargo çok gecikti'))])
+        self.assertEqual(self.search('kargo'), [objs[0].id])
+
+        self.refund.delete()
+        self.assertEqual(self.search('iade'), [])
+
+    def test_query_syntax_is_literal(self):
+        """Test Case 4: Quotes, operators and stars do not break the MATCH expression"""
+        self.assertEqual(self.search('"batarya" OR * NEAR('), [])
+        self.assertEqual(self.search('batarya*'), [self.battery.id, self.refund.id])
+
+    def test_invalid_parameters(self):
+        """Test Case 5: q is required and limit is bounded"""
+        for params in [{}, {'q': '  !! '}, {'q': 'batarya', 'limit': 0}, {'q': 'batarya', 'limit': 'x'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_triggers_outside_django(self):
+        """Test Case 6: A write from the sqlite3 shell or another service is indexed"""
+        import sqlite3
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE name IN ('comments_comment', 'comments_comment_fts') "
+                "OR (type = 'trigger' AND tbl_name = 'comments_comment') ORDER BY type = 'trigger'"
+            )
+            schema = [sql for sql, in cursor.fetchall()]
+
+        # No tr_fold or other application function is registered on this connection
+        plain = sqlite3.connect(':memory:')
+        self.addCleanup(plain.close)
+        for sql in schema:
+            plain.execute(sql)
+        values = {
+            **comment_data(1, content='Işığı çok zayıf'), 'source': '', 'response': 'temp', 'is_active': True,
+            'requeue_attempts': 0, 'created': '2026-01-01', 'updated': '2026-01-01',
+        }
+        plain.execute(
+            f'INSERT INTO comments_comment ({", ".join(values)}) VALUES ({", ".join("?" * len(values))})',
+            list(values.values())
+        )
+
+        rows = plain.execute("SELECT rowid FROM comments_comment_fts WHERE comments_comment_fts MATCH 'isigi'")
+        self.assertEqual(len(rows.fetchall()), 1)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.KeywordIndexTestCase
+@override_settings(COMMENT_CACHE_TIMEOUT=0)
+class KeywordIndexTestCase(APITestCase):
+    """
+    Test cases for the keyword/issue inverted index
+
+    Test Scenarios:
+    1. Success: Saving results indexes keywords and issues, every spelling of a term is one row
+    2. Success: Keyword lookups return the comments of the term, optionally of one kind
+    3. Success: Top keywords are counted per product
+    4. Success: The backfill command indexes stored analyses, can run again and revalidates the lists
+    5. Error: Missing keyword, unknown kind or invalid limit returns 400
+    """
+
+    def setUp(self):
+        self.phone = Comment.objects.create(**comment_data(1, product_name='iPhone'))
+        self.case = Comment.objects.create(**comment_data(2, product_name='Kılıf'))
+        self.other_phone = Comment.objects.create(**comment_data(3, product_name='iPhone'))
+        self.keywords_url = reverse('comments:keyword_comments')
+        self.top_url = reverse('comments:top_keywords')
+
+    def save(self, comment, *analyses):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        results = []
+        for keywords, issues in analyses:
+            result = make_result()
+            result['analysis'].update(keywords=keywords, main_issues=issues)
+            results.append(result)
+        save_results(comment.id, results)
+
+    def keyword_ids(self, **params):
+        response = self.client.get(self.keywords_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [item['id'] for item in response.data['payload']]
+
+    def test_index_on_save(self):
+        """Test Case 1: Folded terms, one link per comment and term"""
+        from app.comments.models import CommentTerm, Term
+
+        self.save(self.phone, (['Isınma', 'batarya'], ['Aşırı ısınma']), ([' ısınma ', 'BATARYA'], []))
+
+        self.assertEqual(
+            sorted(Term.objects.values_list('kind', 'key', 'name')),
+            [('issue', 'asiri isinma', 'Aşırı ısınma'), ('keyword', 'batarya', 'batarya'), ('keyword', 'isinma', 'Isınma')]
+        )
+        self.assertEqual(CommentTerm.objects.filter(comment=self.phone).count(), 3)
+
+    def test_keyword_comments(self):
+        """Test Case 2: Term -> comments, newest first"""
+        self.save(self.phone, (['ısınma'], []))
+        self.save(self.case, (['renk'], ['ısınma']))
+        self.save(self.other_phone, (['Isınma'], []))
+
+        self.assertEqual(self.keyword_ids(keyword='ISINMA'), [self.other_phone.id, self.case.id, self.phone.id])
+        self.assertEqual(self.keyword_ids(keyword='isinma', kind='keyword'), [self.other_phone.id, self.phone.id])
+        self.assertEqual(self.keyword_ids(keyword='ısınma', kind='issue', fields='id'), [self.case.id])
+        self.assertEqual(self.keyword_ids(keyword='ısınma', product_name='Kılıf'), [self.case.id])
+        self.assertEqual(self.keyword_ids(keyword='kargo'), [])
+
+    def test_top_keywords(self):
+        """Test Case 3: Counts are per comment and filtered by product and kind"""
+        self.save(self.phone, (['ısınma', 'batarya'], ['ısınma']), (['Isınma'], []))
+        self.save(self.other_phone, (['ısınma'], []))
+        self.save(self.case, (['renk'], []))
+
+        response = self.client.get(self.top_url, {'product_name': 'iPhone'})
+        self.assertEqual(response.data['payload'], [
+            {'kind': 'keyword', 'name': 'ısınma', 'comments': 2},
+            {'kind': 'keyword', 'name': 'batarya', 'comments': 1},
+            {'kind': 'issue', 'name': 'ısınma', 'comments': 1},
+        ])
+
+        response = self.client.get(self.top_url, {'kind': 'keyword', 'limit': 1})
+        self.assertEqual(response.data['payload'], [{'kind': 'keyword', 'name': 'ısınma', 'comments': 2}])
+
+    def test_backfill_command(self):
+        """Test Case 4: Existing analyses are indexed once, a rebuild gives the same index"""
+        from django.core.management import call_command
+        from app.comments.models import CommentAnalyzer, CommentTerm
+
+        self.save(self.phone, (['ısınma'], ['kırık ekran']))
+        self.save(self.case, (['renk'], []))
+        CommentAnalyzer.objects.create(
+            comment=self.other_phone, sentiment='negatif', sentiment_score=2, category='şikayet', urgency='yüksek',
+            keywords='Kırık Ekran, ısınma', summary='', main_issue='', required_action=True, response_tone='', response='',
+            quality_control=''
+        )
+        CommentTerm.objects.all().delete()
+        before = dict(Comment.objects.values_list('id', 'updated'))
+
+        for options in [{}, {}, {'rebuild': True}]:
+            call_command('index_comment_terms', batch_size=1, stdout=io.StringIO(), **options)
+            self.assertEqual(CommentTerm.objects.count(), 5)
+        self.assertEqual(self.keyword_ids(keyword='kirik ekran'), [self.other_phone.id, self.phone.id])
+        # The linked comments move, so keyword list validators change
+        after = dict(Comment.objects.values_list('id', 'updated'))
+        self.assertTrue(all(after[id] > before[id] for id in [self.phone.id, self.case.id, self.other_phone.id]))
+
+    def test_invalid_parameters(self):
+        """Test Case 5: keyword is required, kind and limit are validated"""
+        for url, params in [
+            (self.keywords_url, {}),
+            (self.keywords_url, {'keyword': '   '}),
+            (self.keywords_url, {'keyword': 'ısınma', 'kind': 'topic'}),
+            (self.top_url, {'kind': 'topic'}),
+            (self.top_url, {'limit': 0}),
+            (self.top_url, {'limit': 'x'}),
+        ]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertEqual(response.data['status'], 'false')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.AnalyticsRollupTestCase
+@override_settings(COMMENT_CACHE_TIMEOUT=0)
+class AnalyticsRollupTestCase(APITestCase):
+    """
+    Test cases for the product/day analytics rollups
+
+    Test Scenarios:
+    1. Success: Saving results increments the rollups, a reprocessed quality score replaces the previous one
+    2. Success: The rebuild command gives the same rollups as the incremental updates
+    3. Success: The analytics endpoint reads only the rollups, per product and day range
+    4. Error: Invalid dates return 400
+    """
+
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+
+        self.phone = Comment.objects.create(**comment_data(1, product_name='iPhone'))
+        self.other_phone = Comment.objects.create(**comment_data(2, product_name='iPhone'))
+        self.case = Comment.objects.create(**comment_data(3, product_name='Kılıf'))
+        Comment.objects.filter(id=self.other_phone.id).update(created=datetime(2026, 1, 2, 10, tzinfo=dt_timezone.utc))
+        Comment.objects.filter(id__in=[self.phone.id, self.case.id]).update(
+            created=datetime(2026, 1, 1, 10, tzinfo=dt_timezone.utc)
+        )
+        self.url = reverse('comments:comments_analytics')
+
+    def save(self, comment, *results):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        save_results(comment.id, list(results))
+
+    def rollups(self):
+        from app.comments.models import ProductDailyBreakdown, ProductDailyRollup
+
+        return (
+            sorted(ProductDailyRollup.objects.values_list(
+                'product_name', 'day', 'analyses', 'sentiment_score_sum', 'quality_count', 'quality_overall_sum'
+            )),
+            sorted(ProductDailyBreakdown.objects.values_list(
+                'product_name', 'day', 'dimension', 'value', 'analyses', 'sentiment_score_sum'
+            )),
+        )
+
+    def populate(self):
+        self.save(self.phone, make_result(sentiment='pozitif', overall=8), make_result(sentiment='negatif', overall=6))
+        self.save(self.other_phone, make_result(sentiment='negatif', overall=4))
+        self.save(self.case, make_result(sentiment='pozitif', overall=9))
+        # Reprocessing replaces the quality score of the comment
+        self.save(self.phone, make_result(sentiment='negatif', overall=2))
+
+    def test_incremental_updates(self):
+        """Test Case 1: Counters are added, the replaced quality score is taken out"""
+        from datetime import date
+
+        self.populate()
+
+        rollups, breakdowns = self.rollups()
+        self.assertEqual(rollups, [
+            ('Kılıf', date(2026, 1, 1), 1, 8.0, 1, 9),
+            ('iPhone', date(2026, 1, 1), 3, 24.0, 1, 2),
+            ('iPhone', date(2026, 1, 2), 1, 8.0, 1, 4),
+        ])
+        self.assertIn(('iPhone', date(2026, 1, 1), 'sentiment', 'negatif', 2, 16.0), breakdowns)
+        self.assertIn(('iPhone', date(2026, 1, 1), 'category', 'övgü', 3, 24.0), breakdowns)
+
+    def test_rebuild_command(self):
+        """Test Case 2: A rebuild from the raw tables matches the incremental rollups"""
+        from django.core.management import call_command
+        from app.comments.models import ProductDailyRollup
+
+        self.populate()
+        incremental = self.rollups()
+        ProductDailyRollup.objects.update(analyses=0)
+
+        call_command('rebuild_comment_rollups', stdout=io.StringIO())
+
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_analytics_endpoint(self):
+        """Test Case 3: Totals, distributions and days of a product in a date range"""
+        self.populate()
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'product_name': 'iPhone', 'date_from': '2026-01-01'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = response.data['payload']
+        self.assertEqual(payload['analyses'], 4)
+        self.assertEqual(payload['average_sentiment_score'], 8.0)
+        self.assertEqual(payload['quality_count'], 2)
+        self.assertEqual(payload['average_quality_overall'], 3.0)
+        self.assertEqual(payload['sentiment'], [
+            {'value': 'negatif', 'analyses': 3, 'average_sentiment_score': 8.0},
+            {'value': 'pozitif', 'analyses': 1, 'average_sentiment_score': 8.0},
+        ])
+        self.assertEqual([item['value'] for item in payload['urgency']], ['düşük'])
+        self.assertEqual(
+            [(day['day'], day['analyses'], day['average_quality_overall']) for day in payload['days']],
+            [('2026-01-01', 3, 2.0), ('2026-01-02', 1, 4.0)]
+        )
+
+        payload = self.client.get(self.url, {'date_to': '2026-01-01'}).data['payload']
+        self.assertEqual(payload['analyses'], 4)
+        self.assertEqual(payload['average_quality_overall'], 5.5)
+
+        payload = self.client.get(self.url, {'product_name': 'Yok'}).data['payload']
+        self.assertEqual((payload['analyses'], payload['average_sentiment_score'], payload['days']), (0, None, []))
+
+    def test_invalid_parameters(self):
+        """Test Case 4: Dates are validated"""
+        for params in [{'date_from': 'dün'}, {'date_from': '2026-02-01', 'date_to': '2026-01-01'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertEqual(response.data['status'], 'false')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.TrendingDetectorTestCase
+class TrendingDetectorTestCase(APITestCase):
+    """
+    Test cases for streaming trending keyword/issue detection
+
+    Test Scenarios:
+    1. Success: Count-Min never underestimates
+    2. Success: A surge over the baseline raises one alert, steady traffic raises none
+    3. Success: Counts leave the window as it slides and the stored state stays bounded
+    4. Success: Saved results feed the detector, heavy hitters and alerts are served by the API
+    5. Success: Detectors of different processes share the window
+    6. Error: Invalid kind or limit returns 400
+    7. Error: A failing detector leaves the saved results counted as persisted
+    """
+
+    def setUp(self):
+        from app.comments import trending
+
+        self.now = 1_800_000_000.0
+        trending.reset_detector()
+        self.addCleanup(trending.reset_detector)
+
+    def detector(self, **options):
+        from app.comments.trending import TrendingDetector
+
+        options = {'bucket_seconds': 60, 'window_buckets': 5, 'baseline_alpha': 0.2, 'min_count': 5, 'ratio': 3.0, **options}
+        return TrendingDetector(clock=lambda: self.now, **options)
+
+    def analyses(self, keywords='', issues='', count=1):
+        from types import SimpleNamespace
+        return [SimpleNamespace(keywords=keywords, main_issue=issues)] * count
+
+    def test_sketches(self):
+        """Test Case 1: Estimates are upper bounds"""
+        from app.comments.trending import CountMinSketch
+
+        sketch = CountMinSketch(width=16, depth=3)
+        for i in range(200):
+            sketch.add('kargo' if i % 4 == 0 else f'nadir {i}')
+
+        self.assertGreaterEqual(sketch.estimate('kargo'), 50)
+        self.assertGreaterEqual(sketch.estimate('nadir 1'), 1)
+
+    def test_surge_alert(self):
+        """Test Case 2: Steady issues build the baseline, a surge is flagged once"""
+        detector = self.detector()
+        for minute in range(30):
+            self.now += 60
+            self.assertEqual(detector.record('iPhone', self.analyses(issues='Kargo gecikmesi', count=2)), [])
+
+        self.now += 60
+        alerts = detector.record('iPhone', self.analyses(keywords='batarya', issues='kargo gecikmesi', count=30))
+        # batarya had no baseline at all: a new term is trending as well
+        self.assertEqual(
+            [(alert['product_name'], alert['kind'], alert['term']) for alert in alerts],
+            [('iPhone', 'keyword', 'batarya'), ('iPhone', 'issue', 'kargo gecikmesi')]
+        )
+        self.assertGreater(alerts[1]['count'], 3 * alerts[1]['expected'])
+        self.assertEqual([alert['term'] for alert in detector.recent_alerts()], ['kargo gecikmesi', 'batarya'])
+
+        # Still in the same window: no second alert
+        self.assertEqual(detector.record('iPhone', self.analyses(issues='kargo gecikmesi', count=30)), [])
+
+    def test_sliding_window(self):
+        """Test Case 3: Old buckets leave the window, a long pause empties it"""
+        detector = self.detector(min_count=1000)
+        detector.record('Kılıf', self.analyses(keywords='renk', count=4))
+        for minute in range(3):
+            self.now += 60
+            detector.record('Kılıf', self.analyses(keywords='renk', count=1))
+        self.assertEqual(detector.heavy_hitters()[0]['count'], 7)
+
+        self.now += 120
+        self.assertEqual(detector.heavy_hitters()[0]['count'], 3)
+
+        self.now += 3600
+        self.assertEqual(detector.heavy_hitters(), [])
+        detector.record('Kılıf', self.analyses(keywords='beden'))
+        self.assertEqual(list(TrendingCandidate.objects.values_list('term', flat=True)), ['beden'])
+        # Counters that no longer weigh in the baseline are deleted, which keeps its age
+        first_kept = detector.index() - 5 - detector.horizon + 1
+        self.assertFalse(TrendingSketchCell.objects.filter(bucket__lt=first_kept).exists())
+        self.assertEqual(detector.load(detector.index(), [])[2], detector.horizon)
+
+    def test_fed_by_save_results(self):
+        """Test Case 4: Committed results are counted per product and exposed by the API"""
+        from app.comments import trending
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        # A detector whose baseline has seen an hour without any comment
+        trending._detector = self.detector(min_count=3)
+        trending._detector.record('Kulaklık', self.analyses(keywords='ses'))
+        self.now += 3600
+
+        phone = Comment.objects.create(**comment_data(1, product_name='iPhone'))
+        case = Comment.objects.create(**comment_data(2, product_name='Kılıf'))
+        result = make_result()
+        result['analysis']['main_issues'] = ['Kargo gecikmesi']
+        with self.captureOnCommitCallbacks(execute=True):
+            save_results(phone.id, [result, result, result])
+            save_results(case.id, [make_result()])
+
+        response = self.client.get(reverse('comments:comments_trending'), {'product_name': 'iPhone', 'kind': 'issue'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(item['term'], item['count']) for item in response.data['payload']['heavy_hitters']],
+            [('kargo gecikmesi', 3)]
+        )
+        self.assertLess(response.data['payload']['window_start'], response.data['payload']['window_end'])
+
+        response = self.client.get(reverse('comments:comments_trending'), {'limit': 2})
+        self.assertEqual(
+            [(item['product_name'], item['term']) for item in response.data['payload']['heavy_hitters']],
+            [('iPhone', 'kargo gecikmesi'), ('iPhone', 'hizli')]
+        )
+
+        response = self.client.get(reverse('comments:comments_trending_alerts'), {'product_name': 'iPhone'})
+        self.assertEqual(
+            sorted((alert['kind'], alert['term']) for alert in response.data['payload']),
+            [('issue', 'kargo gecikmesi'), ('keyword', 'hizli'), ('keyword', 'kalite')]
+        )
+        self.assertEqual(self.client.get(reverse('comments:comments_trending_alerts'), {'product_name': 'Kılıf'}).data['payload'], [])
+
+    def test_shared_between_processes(self):
+        """Test Case 5: Counts and alerts are stored, not kept by the detector that recorded them"""
+        worker, command = self.detector(min_count=3), self.detector(min_count=3)
+        worker.record('iPhone', self.analyses(keywords='ses'))
+        self.now += 3600
+
+        worker.record('iPhone', self.analyses(keywords='batarya', count=2))
+        alerts = command.record('iPhone', self.analyses(keywords='batarya', count=3))
+
+        self.assertEqual([(item['term'], item['count']) for item in self.detector().heavy_hitters()], [('batarya', 5)])
+        self.assertEqual([alert['count'] for alert in alerts], [5])
+        self.assertEqual(worker.record('iPhone', self.analyses(keywords='batarya')), [])
+        self.assertEqual([alert['term'] for alert in self.detector().recent_alerts()], ['batarya'])
+
+    def test_invalid_parameters(self):
+        """Test Case 6: kind and limit are validated"""
+        for url, params in [
+            (reverse('comments:comments_trending'), {'kind': 'topic'}),
+            (reverse('comments:comments_trending'), {'limit': 0}),
+            (reverse('comments:comments_trending_alerts'), {'limit': 'x'}),
+        ]:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_detector_error(self):
+        """Test Case 7: Trending errors are logged apart from the persistence outcome"""
+        from app.comments.models import CommentAnalyzer
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        def sample(outcome):
+            name = f'comment_persistence_results_total{{outcome="{outcome}"}}'
+            for line in self.client.get(reverse('metrics')).content.decode().splitlines():
+                if line.startswith(name + ' '):
+                    return float(line.rsplit(' ', 1)[1])
+            return 0.0
+
+        comment = Comment.objects.create(**comment_data(1))
+        before = {outcome: sample(outcome) for outcome in ('success', 'error')}
+        stdout = io.StringIO()
+        with mock.patch('app.comments.trending.record', side_effect=RuntimeError('database is locked')), \
+                mock.patch('sys.stdout', stdout), self.captureOnCommitCallbacks(execute=True):
+            save_results(comment.id, [make_result()])
+
+        self.assertIn('Error while recording trending terms: database is locked', stdout.getvalue())
+        self.assertNotIn('Error while saving results', stdout.getvalue())
+        self.assertEqual(sample('success'), before['success'] + 1)
+        self.assertEqual(sample('error'), before['error'])
+        self.assertEqual(CommentAnalyzer.objects.filter(comment=comment).count(), 1)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentClusteringTestCase
+@override_settings(COMMENT_CLUSTER_COUNT=2, COMMENT_CLUSTER_BATCH_SIZE=4, COMMENT_CACHE_TIMEOUT=0)
+class CommentClusteringTestCase(APITestCase):
+    """
+    Test cases for mini-batch k-means issue clusters
+
+    Test Scenarios:
+    1. Success: Hashed n-gram vectors are unit length and close for texts about the same issue
+    2. Success: Only negative comments are clustered, similar complaints end up together
+    3. Success: A later run clusters only the new comments and keeps the centroids learnt so far
+    4. Success: The clusters endpoint lists clusters with keywords and representative comments
+    5. Error: Invalid representatives returns 400
+    """
+
+    SHIPPING = ['Kargo çok geç geldi', 'Kargo gecikmesi yaşadım, kargo geç', 'KARGO GEÇ GELDİ paket ezik', 'Kargo hâlâ gelmedi geç']
+    BATTERY = ['Batarya çabuk bitiyor', 'Bataryası hemen bitiyor şarj tutmuyor', 'Batarya bitiyor ısınıyor', 'Şarj batarya bitiyor']
+
+    def create(self, index, content, sentiment='negatif', keywords=(), product_name='iPhone'):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        comment = Comment.objects.create(**comment_data(index, content=content, product_name=product_name))
+        result = make_result(review=content, sentiment=sentiment)
+        result['analysis']['keywords'] = list(keywords)
+        save_results(comment.id, [result])
+        return comment
+
+    def populate(self):
+        comments = {}
+        for i, (shipping, battery) in enumerate(zip(self.SHIPPING, self.BATTERY)):
+            comments[self.create(i * 2, shipping, keywords=['kargo']).id] = 'shipping'
+            comments[self.create(i * 2 + 1, battery, keywords=['batarya'], product_name='Galaxy').id] = 'battery'
+        self.create(100, 'Kargo geç geldi ama ürün harika', sentiment='pozitif')
+        return comments
+
+    def cluster(self, **options):
+        from django.core.management import call_command
+        call_command('cluster_comments', stdout=io.StringIO(), **options)
+
+    def test_vectors(self):
+        """Test Case 1: Unit rows, folded words and shared bigrams bring texts together"""
+        import numpy as np
+        from app.comments.clustering import vectorize
+
+        vectors = vectorize(['Kargo geç geldi', 'KARGO GEC GELDI!', 'Batarya çabuk bitiyor', ''], 4096)
+
+        np.testing.assert_allclose(np.linalg.norm(vectors[:3], axis=1), 1, rtol=1e-5)
+        self.assertAlmostEqual(float(vectors[0] @ vectors[1]), 1, places=5)
+        self.assertLess(abs(float(vectors[0] @ vectors[2])), 0.2)
+        self.assertEqual(float(np.abs(vectors[3]).sum()), 0)
+
+    def test_clusters_negative_comments(self):
+        """Test Case 2: Two issues give two clusters, the positive comment is left out"""
+        from app.comments.models import CommentClusterMember
+
+        comments = self.populate()
+        self.cluster()
+
+        members = dict(CommentClusterMember.objects.values_list('comment_id', 'cluster_id'))
+        self.assertEqual(set(members), set(comments))
+        groups = {}
+        for comment_id, issue in comments.items():
+            groups.setdefault(issue, set()).add(members[comment_id])
+        self.assertEqual([len(clusters) for clusters in groups.values()], [1, 1])
+        self.assertNotEqual(groups['shipping'], groups['battery'])
+
+    def test_incremental_run(self):
+        """Test Case 3: Memberships are kept, new comments join the learnt clusters"""
+        from app.comments.models import CommentCluster, CommentClusterMember
+
+        self.populate()
+        self.cluster(max_batches=1)
+        self.assertEqual(CommentClusterMember.objects.count(), 4)
+        self.cluster()
+        first = dict(CommentClusterMember.objects.values_list('comment_id', 'cluster_id'))
+        shipping_cluster = first[Comment.objects.get(content=self.SHIPPING[0]).id]
+
+        late = self.create(50, 'Kargo yine geç geldi')
+        self.cluster()
+
+        members = dict(CommentClusterMember.objects.values_list('comment_id', 'cluster_id'))
+        self.assertEqual({key: members[key] for key in first}, first)
+        self.assertEqual(members[late.id], shipping_cluster)
+        self.assertEqual(CommentCluster.objects.count(), 2)
+        self.assertEqual(sum(CommentCluster.objects.values_list('absorbed', flat=True)), 9)
+
+        self.cluster(reset=True)
+        self.assertEqual(CommentClusterMember.objects.count(), 9)
+
+    def test_clusters_endpoint(self):
+        """Test Case 4: Largest first, keywords and closest comments, per product"""
+        self.populate()
+        self.create(60, 'Kargo geç geldi', keywords=['kargo', 'gecikme'])
+        self.cluster()
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('comments:comments_clusters'), {'representatives': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = response.data['payload']
+        self.assertEqual([cluster['size'] for cluster in payload], [5, 4])
+        self.assertEqual(payload[0]['keywords'], ['kargo', 'gecikme'])
+        self.assertEqual(payload[1]['keywords'], ['batarya'])
+        self.assertEqual(len(payload[0]['representatives']), 2)
+        similarities = [item['similarity'] for item in payload[0]['representatives']]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+        payload = self.client.get(reverse('comments:comments_clusters'), {'product_name': 'Galaxy'}).data['payload']
+        self.assertEqual([(cluster['size'], cluster['keywords']) for cluster in payload], [(4, ['batarya'])])
+        self.assertEqual({item['product_name'] for item in payload[0]['representatives']}, {'Galaxy'})
+
+    def test_invalid_parameters(self):
+        """Test Case 5: representatives is bounded"""
+        for value in [0, 21, 'x']:
+            response = self.client.get(reverse('comments:comments_clusters'), {'representatives': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, value)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentExportTestCase
+@override_settings(COMMENT_EXPORT_CHUNK_SIZE=2)
+class CommentExportTestCase(APITestCase):
+    """
+    Test cases for the streaming CSV/NDJSON export
+
+    Test Scenarios:
+    1. Success: CSV has one row per comment with its latest analysis and quality score, filters apply
+    2. Success: NDJSON is zstd compressed on request and keeps the value types
+    3. Success: Rows are streamed in chunks with one query per chunk
+    4. Success: The command writes the same export to a file
+    5. Error: Unknown output, compression or filter returns 400
+    """
+
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        from app.comments.models import CommentAnalyzer
+
+        self.comments = [Comment.objects.create(**comment_data(i, content=f'Yorum, "tırnaklı"\n{i}')) for i in range(5)]
+        save_results(self.comments[0].id, [make_result(sentiment='negatif', overall=4)])
+        CommentAnalyzer.objects.update(analyzed_at=datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        save_results(self.comments[0].id, [make_result(sentiment='pozitif', overall=9)])
+        save_results(self.comments[3].id, [make_result(sentiment='nötr', overall=7)])
+        self.url = reverse('comments:comments_export')
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_csv(self):
+        """Test Case 1: Latest analysis, empty cells without analysis, CommentFilter parameters"""
+        import csv
+        from app.comments.export import COLUMNS
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertRegex(response['Content-Disposition'], r'^attachment; filename="comments-\d{14}\.csv"$')
+        rows = list(csv.DictReader(io.StringIO(self.content(response).decode())))
+        self.assertEqual(list(rows[0]), COLUMNS)
+        self.assertEqual([int(row['id']) for row in rows], [comment.id for comment in self.comments])
+        self.assertEqual(rows[0]['content'], 'Yorum, "tırnaklı"\n0')
+        self.assertEqual((rows[0]['analysis_sentiment'], rows[0]['quality_overall']), ('pozitif', '9'))
+        self.assertEqual((rows[1]['analysis_sentiment'], rows[1]['quality_overall']), ('', ''))
+
+        response = self.client.get(self.url, {'sentiment': 'nötr', 'status': 'WAITING_FOR_APPROVE'})
+        self.assertEqual([row['id'] for row in csv.DictReader(io.StringIO(self.content(response).decode()))], [str(self.comments[3].id)])
+
+    def test_ndjson_zstd(self):
+        """Test Case 2: Compressed NDJSON decodes to typed rows"""
+        import orjson
+        import zstandard
+
+        response = self.client.get(self.url, {'output': 'ndjson', 'compression': 'zstd'})
+
+        self.assertEqual(response['Content-Type'], 'application/zstd')
+        self.assertIn('.ndjson.zst"', response['Content-Disposition'])
+        data = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(self.content(response))).read()
+        rows = [orjson.loads(line) for line in data.splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[3]['analysis_sentiment'], 'nötr')
+        self.assertIs(rows[3]['analysis_required_action'], False)
+        self.assertEqual(rows[3]['quality_overall'], 7)
+        self.assertIsNone(rows[4]['analysis_summary'])
+
+    def test_chunked_queries(self):
+        """Test Case 3: One streaming query for the comments and one per chunk of 2 for their analyses"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        response = self.client.get(self.url, {'output': 'ndjson'})
+        with CaptureQueriesContext(connection) as queries:
+            pieces = list(response.streaming_content)
+
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(len(pieces), 3)
+        self.assertEqual(sum(piece.count(b'\n') for piece in pieces), 5)
+
+    def test_command(self):
+        """Test Case 4: The file matches the API export"""
+        from django.core.management import call_command
+
+        path = os.path.join(tempfile.mkdtemp(), 'comments.ndjson')
+        call_command('export_comments', output='ndjson', file=path, filter='product_name=Test Product', stderr=io.StringIO())
+
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), self.content(self.client.get(self.url, {'output': 'ndjson'})))
+
+    def test_invalid_parameters(self):
+        """Test Case 5: output, compression and filters are validated"""
+        for params in [{'output': 'xlsx'}, {'compression': 'gzip'}, {'created_after': 'dün'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertEqual(response.data['status'], 'false')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentReportTestCase
+class CommentReportTestCase(APITestCase):
+    """
+    Test cases for the pandas weekly reports
+
+    Test Scenarios:
+    1. Success: Rows are read in chunked values_list queries into typed frames
+    2. Success: Weekly quality, turnaround and sentiment KPIs, quiet weeks included
+    3. Success: The command writes the HTML report, filtered by product
+    4. Success: PNG charts are written when matplotlib is installed
+    5. Success: Approving a comment stamps approved_at, later writes leave it alone
+    """
+
+    def setUp(self):
+        from datetime import datetime, timezone as dt_timezone
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        from app.comments.models import CommentQualityScore
+
+        def at(day, hour):
+            return datetime(2026, 1, day, hour, tzinfo=dt_timezone.utc)
+
+        # (created, scored, status, approved_at, sentiment, overall, approved); week of 5 January, empty week, week of 19 January
+        rows = [
+            (at(5, 10), at(5, 12), 'APPROVED', at(5, 16), 'pozitif', 8, True),
+            (at(6, 10), at(6, 11), 'WAITING_FOR_APPROVE', None, 'negatif', 4, False),
+            (at(20, 10), at(20, 13), 'ANSWERED', at(21, 13), 'negatif', 6, True),
+        ]
+        self.comments = []
+        for index, (created, scored, comment_status, approved_at, sentiment, overall, approved) in enumerate(rows):
+            comment = Comment.objects.create(**comment_data(index))
+            save_results(comment.id, [make_result(sentiment=sentiment, overall=overall)])
+            CommentQualityScore.objects.filter(comment=comment).update(created=scored, approved=approved)
+            # `updated` moves with every later write, approval turnaround must not depend on it
+            Comment.objects.filter(id=comment.id).update(
+                created=created, updated=at(28, 9), approved_at=approved_at, status=comment_status
+            )
+            self.comments.append(comment)
+        Comment.objects.create(**comment_data(9, product_name='Kılıf'))
+        Comment.objects.filter(product_name='Kılıf').update(created=at(7, 10))
+
+    def test_chunked_typed_frames(self):
+        """Test Case 1: Four comments in chunks of 2 take three queries, columns are typed"""
+        from app.comments import reports
+
+        with self.assertNumQueries(3):
+            comments = reports.comment_frame(chunk_size=2)
+
+        self.assertEqual(len(comments), 4)
+        self.assertEqual(str(comments['status'].dtype), 'category')
+        self.assertEqual(str(comments['created'].dtype), 'datetime64[ns, UTC]')
+        self.assertEqual(str(comments['overall'].dtype), 'float64')
+        self.assertEqual(comments['overall'].isna().sum(), 1)
+
+        analyses = reports.analysis_frame(chunk_size=2)
+        self.assertEqual(str(analyses['sentiment'].dtype), 'category')
+        self.assertEqual(sorted(analyses['sentiment'].cat.categories), ['negatif', 'pozitif'])
+
+    def test_weekly_kpis(self):
+        """Test Case 2: Medians, rates and shares per week of comment creation"""
+        import math
+        from datetime import date
+        from app.comments import reports
+
+        built = reports.build_reports(product_name='Test Product', chunk_size=2)
+
+        quality, turnaround, sentiment = built['quality'], built['turnaround'], built['sentiment']
+        self.assertEqual(list(quality.index), [date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19)])
+        self.assertEqual(quality.loc[date(2026, 1, 5)].to_dict(), {'scored': 2, 'average_overall': 6.0, 'approval_rate': 0.5})
+        self.assertEqual(quality.loc[date(2026, 1, 12), 'scored'], 0)
+        self.assertTrue(math.isnan(quality.loc[date(2026, 1, 12), 'average_overall']))
+
+        self.assertEqual(turnaround.loc[date(2026, 1, 5)].to_dict(), {
+            'drafts': 2, 'median_hours_to_draft': 1.5, 'approvals': 1, 'median_hours_to_approval': 4.0,
+            'p90_hours_to_approval': 4.0,
+        })
+        self.assertEqual(turnaround.loc[date(2026, 1, 19), 'median_hours_to_approval'], 24.0)
+
+        self.assertEqual(sentiment.loc[date(2026, 1, 5)].to_dict(), {
+            'analyses': 2, 'average_sentiment_score': 8.0, 'share_negatif': 0.5, 'share_pozitif': 0.5,
+        })
+        self.assertEqual(sentiment.loc[date(2026, 1, 19), 'share_negatif'], 1.0)
+
+    def test_command_html(self):
+        """Test Case 3: index.html holds one table per report"""
+        from django.core.management import call_command
+
+        directory = tempfile.mkdtemp()
+        stdout = io.StringIO()
+        call_command('comment_report', output=directory, product_name='Kılıf', no_charts=True, stdout=stdout)
+
+        self.assertIn('1 weeks written', stdout.getvalue())
+        self.assertEqual(os.listdir(directory), ['index.html'])
+        with open(os.path.join(directory, 'index.html'), encoding='utf-8') as file:
+            content = file.read()
+        for title in ['Comment report - Kılıf', 'Response quality', 'Approval turnaround (hours)', 'Sentiment trend']:
+            self.assertIn(title, content)
+        self.assertIn('2026-01-05', content)
+
+    def test_charts(self):
+        """Test Case 4: One PNG per report next to index.html"""
+        from app.comments import reports
+
+        if not reports.charts_available():
+            self.skipTest("matplotlib is not installed")
+        directory = tempfile.mkdtemp()
+        files = reports.write_report(reports.build_reports(), directory)
+
+        self.assertEqual(sorted(files), ['index.html', 'quality.png', 'sentiment.png', 'turnaround.png'])
+        with open(os.path.join(directory, 'quality.png'), 'rb') as file:
+            self.assertEqual(file.read(8), b'\x89PNG\r\n\x1a\n')
+
+    def test_approved_at(self):
+        """Test Case 5: The approval time is kept when the comment is written again"""
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        comment = self.comments[1]
+        self.assertIsNone(Comment.objects.get(id=comment.id).approved_at)
+        response = self.client.post(reverse('comments:approve_comment'), {'id': comment.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        approved_at = Comment.objects.get(id=comment.id).approved_at
+        self.assertIsNotNone(approved_at)
+
+        save_results(comment.id, [make_result()])
+        Comment.objects.get(id=comment.id).save()
+
+        self.assertEqual(Comment.objects.get(id=comment.id).approved_at, approved_at)
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentSummaryTestCase
+class CommentSummaryTestCase(APITestCase):
+    """
+    Test cases for the denormalized latest analysis and quality columns of the comments
+
+    Test Scenarios:
+    1. Success: Saving results copies the latest analysis and the quality score, reprocessing replaces them
+    2. Success: List rows carry the summary from one query on the comment table
+    3. Success: The rebuild command fills the summaries from the stored results
+    4. Success: The rebuild command invalidates the cached detail of the rebuilt comments
+    """
+
+    def setUp(self):
+        self.comment = Comment.objects.create(**comment_data(1))
+        self.other = Comment.objects.create(**comment_data(2))
+        self.url = reverse('comments:tasks')
+
+    def save(self, comment, *results):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        save_results(comment.id, list(results))
+
+    def summary(self, comment):
+        from app.comments.summaries import SUMMARY_FIELDS
+        return Comment.objects.filter(id=comment.id).values(*SUMMARY_FIELDS).get()
+
+    def test_saved_with_results(self):
+        """Test Case 1: The last result of the latest run is the summary, also for a moderated comment"""
+        self.save(self.comment, make_result(sentiment='pozitif', overall=6), make_result(sentiment='negatif', overall=9))
+
+        summary = self.summary(self.comment)
+        self.assertEqual(summary['latest_sentiment'], 'negatif')
+        self.assertEqual((summary['latest_category'], summary['latest_urgency']), ('övgü', 'düşük'))
+        self.assertEqual(summary['latest_sentiment_score'], 8.0)
+        self.assertEqual(summary['latest_analyzed_at'], self.comment.analyzers.order_by('-id').first().analyzed_at)
+        self.assertEqual((summary['latest_quality_overall'], summary['latest_quality_approved']), (8, True))
+        self.assertIsNone(self.summary(self.other)['latest_sentiment'])
+
+        Comment.objects.filter(id=self.comment.id).update(status='APPROVED')
+        self.save(self.comment, make_result(sentiment='nötr', overall=3))
+        summary = self.summary(self.comment)
+        self.assertEqual((summary['latest_sentiment'], summary['latest_quality_overall']), ('nötr', 3))
+        self.assertEqual(Comment.objects.get(id=self.comment.id).status, 'APPROVED')
+
+    def test_list_rows(self):
+        """Test Case 2: No join to the analyses or the quality score"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.save(self.comment, make_result(sentiment='negatif', overall=4))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'fields': 'id,latest_sentiment,latest_quality_overall'})
+
+        self.assertEqual(response.data['payload'], [
+            {'id': self.other.id, 'latest_sentiment': None, 'latest_quality_overall': None},
+            {'id': self.comment.id, 'latest_sentiment': 'negatif', 'latest_quality_overall': 4},
+        ])
+        page_queries = [query['sql'] for query in queries if 'latest_sentiment' in query['sql']]
+        self.assertEqual(len(page_queries), 1)
+        self.assertNotIn('JOIN', page_queries[0])
+
+    @override_settings(COMMENT_CACHE_TIMEOUT=0)
+    def test_rebuild_command(self):
+        """Test Case 3: Summaries cleared by hand are restored, comments without results stay empty"""
+        from django.core.management import call_command
+        from app.comments.summaries import SUMMARY_FIELDS
+
+        self.save(self.comment, make_result(sentiment='pozitif', overall=6), make_result(sentiment='negatif', overall=9))
+        expected = self.summary(self.comment)
+        Comment.objects.update(**dict.fromkeys(SUMMARY_FIELDS))
+
+        stdout = io.StringIO()
+        call_command('rebuild_comment_summaries', batch_size=1, stdout=stdout)
+
+        self.assertIn('1 comment summaries rebuilt', stdout.getvalue())
+        self.assertEqual(self.summary(self.comment), expected)
+        self.assertIsNone(self.summary(self.other)['latest_quality_overall'])
+
+    def test_rebuild_invalidates_detail(self):
+        """Test Case 4: A detail cached before the rebuild is not served afterwards"""
+        from django.core.management import call_command
+        from app.comments.summaries import SUMMARY_FIELDS
+
+        self.save(self.comment, make_result(sentiment='negatif'))
+        # QuerySet.update sends no signal, so the cached detail keeps the cleared summary
+        Comment.objects.update(**dict.fromkeys(SUMMARY_FIELDS))
+        detail_url = reverse('comments:comment_detail', kwargs={'comment_id': self.comment.id})
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.mkdtemp(),
+        }}
+
+        with override_settings(CACHES=shared):
+            self.assertIsNone(self.client.get(detail_url).data['payload']['latest_sentiment'])
+            self.assertEqual(self.client.get(detail_url)['X-Cache'], 'HIT')
+            call_command('rebuild_comment_summaries', stdout=io.StringIO())
+            response = self.client.get(detail_url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['payload']['latest_sentiment'], 'negatif')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentAnalysesAPIViewTestCase
+class CommentAnalysesAPIViewTestCase(APITestCase):
+    """
+    Test cases for the latest analysis on comment detail and the paginated analysis history
+
+    Test Scenarios:
+    1. Success: Detail returns the latest analysis only, with the same queries whatever the history
+    2. Success: History pages are newest first by analyzed_at and follow the cursor links
+    3. Error: Unknown comment returns 404, invalid page size returns 400
+    """
+
+    def setUp(self):
+        from datetime import datetime, timedelta, timezone as dt_timezone
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+        from app.comments.models import CommentAnalyzer
+
+        self.comment = Comment.objects.create(**comment_data(1))
+        save_results(self.comment.id, [make_result(review=f'Yorum {i}') for i in range(5)])
+        # The first analysis is the newest, so the order is not the id order
+        start = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        analyzers = list(CommentAnalyzer.objects.filter(comment=self.comment).order_by('id'))
+        for offset, analyzer in zip([10, 1, 2, 3, 4], analyzers):
+            CommentAnalyzer.objects.filter(id=analyzer.id).update(analyzed_at=start + timedelta(hours=offset))
+        self.expected = [analyzers[0].id, analyzers[4].id, analyzers[3].id, analyzers[2].id, analyzers[1].id]
+        self.detail_url = reverse('comments:comment_detail', kwargs={'comment_id': self.comment.id})
+        self.url = reverse('comments:comment_analyses', kwargs={'comment_id': self.comment.id})
+
+    def test_detail_latest_analysis(self):
+        """Test Case 1: One analysis in the payload, the count tells how many exist"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.detail_url)
+
+        payload = response.data['payload']
+        self.assertEqual([analyzer['id'] for analyzer in payload['analyzers']], self.expected[:1])
+        self.assertEqual(payload['analyses_count'], 5)
+        self.assertEqual(payload['quality_score']['overall'], 8)
+        # Versions, comment joined with its quality score, latest analysis
+        self.assertEqual(len(queries), 3)
+        self.assertIn('ROW_NUMBER', queries[2]['sql'])
+
+    def test_history_pages(self):
+        """Test Case 2: Cursor links walk the history forward and back"""
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual([analyzer['id'] for analyzer in response.data['payload']], self.expected[:2])
+        self.assertIsNone(response.data['previous'])
+
+        pages = [self.expected[:2]]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append([analyzer['id'] for analyzer in response.data['payload']])
+        self.assertEqual(pages, [self.expected[:2], self.expected[2:4], self.expected[4:]])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([analyzer['id'] for analyzer in response.data['payload']], self.expected[2:4])
+
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['payload']), 5)
+        self.assertIn('response', response.data['payload'][0])
+
+    def test_invalid_requests(self):
+        """Test Case 3: Missing comment and bad page size"""
+        response = self.client.get(reverse('comments:comment_analyses', kwargs={'comment_id': self.comment.id + 100}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Comment not found')
+
+        response = self.client.get(self.url, {'page_size': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['status'], 'false')
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.CommentBatchAPIViewTestCase
+class CommentBatchAPIViewTestCase(APITestCase):
+    """
+    Test cases for the batch detail endpoint
+
+    Test Scenarios:
+    1. Success: Payloads match the detail endpoint, in request order, missing ids reported
+    2. Success: The query count does not depend on the number of comments or analyses
+    3. Success: A batch is invalidated when one of its comments changes
+    4. Error: Missing, malformed or too many ids return 400
+    """
+
+    def setUp(self):
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        self.comments = [Comment.objects.create(**comment_data(i)) for i in range(4)]
+        save_results(self.comments[0].id, [make_result(sentiment='negatif'), make_result(sentiment='pozitif')])
+        save_results(self.comments[2].id, [make_result(sentiment='nötr', overall=5)])
+        self.url = reverse('comments:comments_batch')
+
+    def ids(self, *comment_ids):
+        return {'ids': ','.join(str(comment_id) for comment_id in comment_ids)}
+
+    def test_order_and_missing(self):
+        """Test Case 1: Same payload as comment detail, duplicates returned once"""
+        order = [self.comments[2].id, 999, self.comments[0].id, self.comments[1].id, self.comments[2].id]
+        response = self.client.get(self.url, self.ids(*order))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        payload = response.data['payload']
+        self.assertEqual([comment['id'] for comment in payload['comments']], [order[0], order[2], order[3]])
+        self.assertEqual(payload['missing'], [999])
+        for comment in payload['comments']:
+            detail = self.client.get(reverse('comments:comment_detail', kwargs={'comment_id': comment['id']}))
+            self.assertEqual(comment, detail.data['payload'])
+        self.assertEqual(payload['comments'][1]['analyses_count'], 2)
+        self.assertEqual(payload['comments'][1]['analyzers'][0]['sentiment'], 'pozitif')
+        self.assertEqual(payload['comments'][2]['analyzers'], [])
+
+    def test_constant_queries(self):
+        """Test Case 2: Comments with their quality score and counts, then the latest analyses"""
+        from integrations.ai.agents.agent_comment.llm.persistence import save_results
+
+        with self.assertNumQueries(2):
+            self.client.get(self.url, self.ids(self.comments[0].id))
+
+        more = [Comment.objects.create(**comment_data(10 + i)) for i in range(10)]
+        for comment in more:
+            save_results(comment.id, [make_result(review=f'Yorum {i}') for i in range(3)])
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, self.ids(*[comment.id for comment in self.comments + more]))
+        self.assertEqual(len(response.data['payload']['comments']), 14)
+
+    def test_cache_invalidation(self):
+        """Test Case 3: Approving one of the comments changes the cached batch"""
+        ids = self.ids(self.comments[2].id, self.comments[3].id)
+        self.client.get(self.url, ids)
+        self.assertEqual(self.client.get(self.url, ids)['X-Cache'], 'HIT')
+
+        self.client.post(reverse('comments:approve_comment'), {'id': self.comments[2].id}, format='json')
+
+        response = self.client.get(self.url, ids)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['payload']['comments'][0]['status'], 'APPROVED')
+
+    @override_settings(COMMENT_BATCH_MAX_IDS=3)
+    def test_invalid_ids(self):
+        """Test Case 4: ids is required, numeric and bounded"""
+        for params in [{}, {'ids': ''}, {'ids': '1,abc'}, {'ids': '1,2,3,4'}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn('ids', response.data['payload'])
+
+
+# cd {PROJECT_PATH}/aia/comm && python manage.py test app.comments.tests.RequeueCommentsTestCase
+@override_settings(COMMENT_CACHE_TIMEOUT=0)
+class RequeueCommentsTestCase(APITestCase):
+    """
+    Test cases for requeueing comments lost from the in-memory agent queue
+
+    Test Scenarios:
+    1. Success: Stale WAITING_FOR_ANSWER comments are processed again, fresh and moderated ones are left alone
+    2. Success: --dry-run only counts, --limit takes the oldest first
+    3. Success: A comment the agent keeps failing on is moved to ERROR after --max-attempts requeues
+    """
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        self.stale = [Comment.objects.create(**comment_data(i)) for i in range(2)]
+        self.fresh = Comment.objects.create(**comment_data(2))
+        self.approved = Comment.objects.create(**comment_data(3, status='APPROVED'))
+        Comment.objects.exclude(id=self.fresh.id).update(updated=timezone.now() - timedelta(hours=1))
+
+    def test_requeue(self):
+        """Test Case 1: Only stale comments waiting for an answer reach the agent"""
+        from django.core.management import call_command
+
+        stdout = io.StringIO()
+        with fake_agent([make_result()]) as agent_class:
+            call_command('requeue_comments', stdout=stdout)
+
+        self.assertIn('2 comments requeued', stdout.getvalue())
+        processed = [call.args[0] for call in agent_class.return_value.save_results.call_args_list]
+        self.assertEqual(processed, [comment.id for comment in self.stale])
+        statuses = dict(Comment.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[comment.id] for comment in self.stale], ['WAITING_FOR_APPROVE'] * 2)
+        self.assertEqual(statuses[self.fresh.id], 'WAITING_FOR_ANSWER')
+        self.assertEqual(statuses[self.approved.id], 'APPROVED')
+
+    def test_dry_run_and_limit(self):
+        """Test Case 2: Nothing is dispatched on a dry run"""
+        from django.core.management import call_command
+
+        stdout = io.StringIO()
+        with mock.patch('integrations.ai.agents.agent_comment.langchain.creator.enqueue_many') as enqueue:
+            call_command('requeue_comments', dry_run=True, stdout=stdout)
+            self.assertFalse(enqueue.called)
+            call_command('requeue_comments', limit=1, stdout=stdout)
+
+        self.assertIn('2 stale comments', stdout.getvalue())
+        self.assertEqual(enqueue.call_args.args[0], [(self.stale[0].id, 'Yorum 0')])
+
+    def test_max_attempts(self):
+        """Test Case 3: Exhausted comments are not sent to the agent again"""
+        from datetime import timedelta
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        stdout = io.StringIO()
+        with mock.patch('integrations.ai.agents.agent_comment.langchain.creator.enqueue_many') as enqueue:
+            for _ in range(3):
+                # The agent failed again: the comments are still waiting, untouched since
+                call_command('requeue_comments', max_attempts=2, stdout=stdout)
+                Comment.objects.filter(id__in=[comment.id for comment in self.stale]).update(
+                    updated=timezone.now() - timedelta(hours=1)
+                )
+
+        self.assertEqual(enqueue.call_count, 3)
+        self.assertEqual(enqueue.call_args.args[0], [])
+        self.assertIn('2 comments moved to ERROR after 2 attempts', stdout.getvalue())
+        statuses = dict(Comment.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[comment.id] for comment in self.stale], ['ERROR'] * 2)
+
+        # Retrying by hand starts counting again
+        response = self.client.post(
+            reverse('comments:update_answered_comments'), {'id': self.stale[0].id, 'status': 'WAITING_FOR_ANSWER'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Comment.objects.get(id=self.stale[0].id).requeue_attempts, 0)
@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.db.models import Case, F, TextField, Value, When
+from django.utils import timezone
+
+from app.comments.enums import AGENT_STATUS
+from app.comments.models import Comment
+from app.comments.signals import comments_changed
+
+STATUSES = {value for value, _ in AGENT_STATUS}
+
+# Allowed moves between AGENT_STATUS values, keyed by the current status
+TRANSITIONS = {
+    'WAITING_FOR_ANSWER': {'WAITING_FOR_APPROVE', 'REPORTED', 'REJECTED', 'ERROR'},
+    # Reprocessing a comment that waits for approval refreshes its draft response
+    'WAITING_FOR_APPROVE': {'WAITING_FOR_APPROVE', 'APPROVED', 'REJECTED', 'REPORTED', 'WAITING_FOR_ANSWER', 'ERROR'},
+    'APPROVED': {'ANSWERED', 'REJECTED', 'REPORTED'},
+    'ANSWERED': {'REPORTED'},
+    'REPORTED': {'WAITING_FOR_ANSWER'},
+    'REJECTED': {'WAITING_FOR_ANSWER'},
+    'ERROR': {'WAITING_FOR_ANSWER', 'WAITING_FOR_APPROVE'},
+}
+
+
+class IllegalTransition(Exception):
+    def __init__(self, target, current=None):
+        self.target = target
+        self.current = current
+        if target not in STATUSES:
+            message = f"Invalid status: {target}"
+        elif current is None:
+            message = f"Comment cannot be moved to {target}"
+        else:
+            message = f"Comment status cannot change from {current} to {target}"
+        super().__init__(message)
+
+
+def can_transition(current, target):
+    return target in TRANSITIONS.get(current, set())
+
+
+def sources_of(target):
+    """Statuses a comment may be in to move to `target`."""
+    return {current for current, targets in TRANSITIONS.items() if target in targets}
+
+
+def stamps(target):
+    """
+    Columns written with a move to `target`: `updated`, `approved_at` when the response is approved, and a reset
+    of `requeue_attempts` when the comment goes back to the agent.
+    """
+    now = timezone.now()
+    if target == 'APPROVED':
+        return {'updated': now, 'approved_at': now}
+    if target == 'WAITING_FOR_ANSWER':
+        return {'updated': now, 'requeue_attempts': 0}
+    return {'updated': now}
+
+
+def transition(comment_id, target, expected=None, **fields):
+    """
+    Moves a comment to `target` with a single conditional
+    UPDATE ... SET status = target WHERE id = comment_id AND status IN (allowed sources).
+
+    Only `status`, the stamps of `target` and the given `fields` are written, so concurrent
+    writers of other columns are never overwritten and a comment that changed status in the meantime is left alone.
+    `expected` narrows the allowed source statuses. Returns the number of updated rows (0 or 1).
+    """
+    allowed = allowed_sources(target, expected)
+    updated = Comment.objects.filter(id=comment_id, status__in=allowed).update(
+        status=target,
+        **stamps(target),
+        **fields
+    )
+    if updated:
+        comments_changed.send(sender=Comment, comment_ids=[comment_id])
+    return updated
+
+
+def bulk_transition(ids, target, expected=None, responses=None):
+    """
+    Moves many comments to `target` with one SELECT ... FOR UPDATE of their current status and one
+    UPDATE of the eligible rows. `responses` maps ids to a new response, written in the same UPDATE
+    with a CASE expression.
+
+    Returns the status of every found id before the change and the set of updated ids.
+    """
+    allowed = allowed_sources(target, expected)
+    responses = responses or {}
+
+    with transaction.atomic():
+        previous = dict(Comment.objects.select_for_update().filter(id__in=ids).values_list('id', 'status'))
+        eligible = {id for id, status in previous.items() if status in allowed}
+        if eligible:
+            fields = {}
+            overrides = [When(id=id, then=Value(responses[id])) for id in eligible if id in responses]
+            if overrides:
+                fields['response'] = Case(*overrides, default=F('response'), output_field=TextField())
+            Comment.objects.filter(id__in=eligible, status__in=allowed).update(
+                status=target,
+                **stamps(target),
+                **fields
+            )
+            comments_changed.send(sender=Comment, comment_ids=list(eligible))
+    return previous, eligible
+
+
+def allowed_sources(target, expected=None):
+    """
+    Source statuses a transition to `target` applies to, narrowed to `expected` when given.
+    Raises IllegalTransition when no source status could ever lead to `target`.
+    """
+    allowed = sources_of(target)
+    if expected is not None:
+        expected = {expected} if isinstance(expected, str) else set(expected)
+        for current in expected - allowed:
+            raise IllegalTransition(target, current)
+        allowed = expected
+    if not allowed:
+        raise IllegalTransition(target)
+    return allowed
+
+
+def current_status(comment_id):
+    """Status of a comment, None when it does not exist. Used to explain a transition that updated nothing."""
+    return Comment.objects.filter(id=comment_id).values_list('status', flat=True).first()
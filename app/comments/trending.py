@@ -0,0 +1,294 @@
+"""
+Streaming detection of trending keywords and issues per product.
+
+Every saved analysis adds its keywords and main issues, keyed by (product, kind, term), to the current
+time bucket of a sliding window. A bucket holds a Count-Min sketch (counts of every key in fixed memory,
+overestimated by collisions only) and the keys seen in it, the candidates heavy hitters are reported from.
+Buckets that leave the window make up an exponentially weighted baseline, so the window is always compared with
+what came before it. A key is flagged when its window count reaches COMMENT_TRENDING_MIN_COUNT and
+COMMENT_TRENDING_RATIO times its baseline expectation. No alert is raised until the baseline has seen a whole
+window of buckets.
+
+State is shared by every process through the database, like the rollups: sketch counters (TrendingSketchCell) and
+candidates (TrendingCandidate) are added with INSERT ... ON CONFLICT DO UPDATE increments, so API workers, agent
+threads and commands such as requeue_comments feed and read the same window, and it survives restarts.
+Candidates are kept for the window only and counters for as long as they weigh 1% of the baseline.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Min, Q
+from django.utils import timezone as django_timezone
+
+from app.comments import metrics
+from app.comments.models import TrendingAlert, TrendingCandidate, TrendingSketchCell
+from app.comments.rollups import increment
+from app.comments.terms import TERM_COLUMNS, split_terms
+
+CELL_KEYS = ['bucket', 'row', 'col']
+CANDIDATE_KEYS = ['bucket', 'product_name', 'kind', 'term']
+# Share of the baseline below which expired buckets are deleted
+BASELINE_CUTOFF = 0.01
+
+
+class CountMinSketch:
+    """`depth` rows of `width` counters; a key's estimate is the smallest of its counters, never below its count."""
+
+    def __init__(self, width, depth, dtype=np.int64):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=dtype)
+        self.rows = np.arange(depth)
+
+    def columns(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=8 * self.depth).digest()
+        return np.frombuffer(digest, dtype=np.uint64) % self.width
+
+    def add(self, key, count=1):
+        self.table[self.rows, self.columns(key)] += count
+
+    def estimate(self, key):
+        return self.table[self.rows, self.columns(key)].min().item()
+
+
+def make_key(product_name, kind, term):
+    return '\x1f'.join([product_name, kind, term])
+
+
+def split_key(key):
+    product_name, kind, term = key.split('\x1f')
+    return {'product_name': product_name, 'kind': kind, 'term': term}
+
+
+class TrendingDetector:
+    """
+    Detection settings and the queries over the shared state; instances hold no counts, so every process may
+    have its own.
+    """
+
+    def __init__(self, bucket_seconds=60, window_buckets=15, baseline_alpha=0.05, width=2048, depth=4,
+                 min_count=5, ratio=3.0, max_alerts=100, clock=time.time):
+        self.bucket_seconds = bucket_seconds
+        self.window_buckets = window_buckets
+        self.baseline_alpha = baseline_alpha
+        self.width = width
+        self.depth = depth
+        self.min_count = min_count
+        self.ratio = ratio
+        self.max_alerts = max_alerts
+        self.clock = clock
+        # Expired buckets kept for the baseline, the older ones weigh less than BASELINE_CUTOFF of it
+        self.horizon = math.ceil(math.log(BASELINE_CUTOFF) / math.log(1 - baseline_alpha))
+        self.hasher = CountMinSketch(width, depth)
+        self.pruned = None  # Bucket this process last pruned the state at
+
+    def index(self):
+        return int(self.clock() // self.bucket_seconds)
+
+    def cells(self, key):
+        return [(row, int(column)) for row, column in enumerate(self.hasher.columns(key))]
+
+    def record(self, product_name, analyzers):
+        """Adds the keywords and main issues of `analyzers` (CommentAnalyzer instances) and returns the new alerts."""
+        keys = {}
+        for analyzer in analyzers:
+            for kind, column in TERM_COLUMNS.items():
+                for term in split_terms(getattr(analyzer, column)):
+                    key = make_key(product_name, kind, term)
+                    keys[key] = keys.get(key, 0) + 1
+        if not keys:
+            return []
+
+        index = self.index()
+        cells = defaultdict(int)
+        for key, count in keys.items():
+            for cell in self.cells(key):
+                cells[cell] += count
+        alerts = []
+        with transaction.atomic():
+            self.prune(index)
+            increment(TrendingSketchCell, CELL_KEYS, ['count'], [
+                {'bucket': index, 'row': row, 'col': col, 'count': count} for (row, col), count in cells.items()
+            ])
+            increment(TrendingCandidate, CANDIDATE_KEYS, ['count'], [
+                {'bucket': index, **split_key(key), 'count': count} for key, count in keys.items()
+            ])
+            window, baseline, seen = self.load(index, keys)
+            for key in keys:
+                alert = self.check(key, index, window, baseline, seen)
+                if alert:
+                    alerts.append(alert)
+        for alert in alerts:
+            metrics.TRENDING_ALERTS.labels(kind=alert['kind']).inc()
+        return alerts
+
+    def prune(self, index):
+        """
+        Deletes the candidates that left the window, the counters that no longer weigh in the baseline and the alerts
+        beyond `max_alerts`, once per bucket and process.
+        """
+        if self.pruned == index:
+            return
+        expired = index - self.window_buckets
+        first_kept = expired - self.horizon + 1
+        TrendingCandidate.objects.filter(bucket__lte=expired).delete()
+        deleted, _ = TrendingSketchCell.objects.filter(bucket__lt=first_kept).delete()
+        if deleted:
+            # Keeps the age of the baseline once its oldest counters are gone; row -1 is never looked up
+            increment(TrendingSketchCell, CELL_KEYS, ['count'], [{'bucket': first_kept, 'row': -1, 'col': 0, 'count': 0}])
+        oldest = TrendingAlert.objects.order_by('-detected_at', '-id').values_list('detected_at', flat=True)
+        cutoff = oldest[self.max_alerts:self.max_alerts + 1]
+        if cutoff:
+            TrendingAlert.objects.filter(detected_at__lte=cutoff[0]).delete()
+        self.pruned = index
+
+    def load(self, index, keys):
+        """
+        Window and baseline sketches holding the counters of `keys`, read in one query, and the number of buckets
+        the baseline has seen. The baseline weighs an expired bucket by alpha * (1 - alpha) ** age.
+        """
+        first = TrendingSketchCell.objects.aggregate(first=Min('bucket'))['first']
+        expired = index - self.window_buckets  # Newest bucket of the baseline
+        seen = max(expired - first + 1, 0) if first is not None else 0
+
+        columns = defaultdict(set)
+        for key in keys:
+            for row, col in self.cells(key):
+                columns[row].add(col)
+        condition = Q()
+        for row, cols in columns.items():
+            condition |= Q(row=row, col__in=cols)
+
+        window = CountMinSketch(self.width, self.depth)
+        baseline = CountMinSketch(self.width, self.depth, dtype=np.float64)
+        if columns:
+            rows = TrendingSketchCell.objects.filter(
+                condition, bucket__gt=expired - self.horizon, bucket__lte=index
+            ).values_list('bucket', 'row', 'col', 'count')
+            for bucket, row, col, count in rows:
+                if bucket > expired:
+                    window.table[row, col] += count
+                else:
+                    baseline.table[row, col] += self.baseline_alpha * (1 - self.baseline_alpha) ** (expired - bucket) * count
+        return window, baseline, seen
+
+    def expected(self, key, baseline, seen):
+        if not seen:
+            return 0.0
+        # The average starts from zero: dividing by the weight it has accumulated removes that bias
+        weight = 1 - (1 - self.baseline_alpha) ** seen
+        return baseline.estimate(key) / weight * self.window_buckets
+
+    def check(self, key, index, window, baseline, seen):
+        if seen < self.window_buckets:
+            return None
+        count = window.estimate(key)
+        expected = self.expected(key, baseline, seen)
+        if count < self.min_count or count < self.ratio * max(expected, 1):
+            return None
+        alert = {**split_key(key), 'count': count, 'expected': round(expected, 2)}
+        detected_at = datetime.fromtimestamp(self.clock(), tz=timezone.utc)
+        # One alert per key and window, decided by the database so concurrent processes raise it once
+        if not insert_alert(alert, detected_at, datetime.fromtimestamp(self.window_start(index), tz=timezone.utc)):
+            return None
+        return {**alert, 'detected_at': timestamp(detected_at.timestamp())}
+
+    def window_start(self, index):
+        return (index - self.window_buckets + 1) * self.bucket_seconds
+
+    def heavy_hitters(self, product_name=None, kind=None, limit=20):
+        """The most frequent keys of the current window, with their baseline expectation."""
+        index = self.index()
+        candidates = TrendingCandidate.objects.filter(bucket__gt=index - self.window_buckets, bucket__lte=index)
+        if product_name:
+            candidates = candidates.filter(product_name=product_name)
+        if kind:
+            candidates = candidates.filter(kind=kind)
+        keys = {make_key(*key) for key in candidates.values_list('product_name', 'kind', 'term').distinct()}
+        window, baseline, seen = self.load(index, keys)
+
+        items = []
+        for key in keys:
+            count = window.estimate(key)
+            if count:
+                items.append({**split_key(key), 'count': count, 'expected': round(self.expected(key, baseline, seen), 2)})
+        items.sort(key=lambda item: (-item['count'], item['product_name'], item['kind'], item['term']))
+        return items[:limit]
+
+    def recent_alerts(self, product_name=None, limit=20):
+        alerts = TrendingAlert.objects.order_by('-detected_at', '-id')
+        if product_name:
+            alerts = alerts.filter(product_name=product_name)
+        return [
+            {**alert, 'detected_at': timestamp(alert['detected_at'].timestamp())}
+            for alert in alerts.values('product_name', 'kind', 'term', 'count', 'expected', 'detected_at')[:limit]
+        ]
+
+    def window_bounds(self):
+        start = self.window_start(self.index())
+        return timestamp(start), timestamp(start + self.window_buckets * self.bucket_seconds)
+
+
+def insert_alert(alert, detected_at, window_start):
+    """
+    Stores `alert` unless its key already has one since `window_start`, with one INSERT ... SELECT ... WHERE NOT
+    EXISTS. Returns whether it was stored.
+    """
+    quote = connection.ops.quote_name
+    table = quote(TrendingAlert._meta.db_table)
+    now = django_timezone.now()
+    values = {**alert, 'created': now, 'updated': now, 'detected_at': detected_at}
+    fields = [TrendingAlert._meta.get_field(column) for column in values]
+    params = [field.get_db_prep_save(values[field.name], connection) for field in fields]
+    key_params = [alert['product_name'], alert['kind'], alert['term'],
+                  TrendingAlert._meta.get_field('detected_at').get_db_prep_save(window_start, connection)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(quote(field.column) for field in fields)}) '
+            f'SELECT {", ".join(["%s"] * len(fields))} WHERE NOT EXISTS ('
+            f'SELECT 1 FROM {table} WHERE {quote("product_name")} = %s AND {quote("kind")} = %s '
+            f'AND {quote("term")} = %s AND {quote("detected_at")} >= %s)',
+            params + key_params
+        )
+        return cursor.rowcount == 1
+
+
+def timestamp(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_detector():
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = TrendingDetector(
+                bucket_seconds=settings.COMMENT_TRENDING_BUCKET_SECONDS,
+                window_buckets=settings.COMMENT_TRENDING_WINDOW_BUCKETS,
+                baseline_alpha=settings.COMMENT_TRENDING_BASELINE_ALPHA,
+                width=settings.COMMENT_TRENDING_SKETCH_WIDTH,
+                depth=settings.COMMENT_TRENDING_SKETCH_DEPTH,
+                min_count=settings.COMMENT_TRENDING_MIN_COUNT,
+                ratio=settings.COMMENT_TRENDING_RATIO,
+            )
+        return _detector
+
+
+def reset_detector():
+    global _detector
+    with _detector_lock:
+        _detector = None
+
+
+def record(product_name, analyzers):
+    return get_detector().record(product_name, analyzers)
@@ -0,0 +1,15 @@
+import unicodedata
+
+# Turkish dotted/dotless i all fold to 'i' so "IŞIK", "ışık" and "isik" match each other
+TR_I_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def tr_fold(text):
+    """
+    Case and diacritic folding for Turkish search: lower case with Turkish i rules,
+    then ç/ğ/ö/ş/ü and other accents are stripped (ç -> c, ğ -> g, ...).
+    """
+    if text is None:
+        return None
+    text = unicodedata.normalize('NFKD', text.translate(TR_I_FOLD).casefold())
+    return ''.join(char for char in text if not unicodedata.combining(char))
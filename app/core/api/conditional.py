@@ -0,0 +1,32 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(request, *versions):
+    """
+    Strong ETag of a representation: the versions of the data it is built from, the full URL
+    (query parameters select the page and fields) and the negotiated media type.
+    """
+    key = '|'.join([request.build_absolute_uri(), getattr(request, 'accepted_media_type', '') or ''] + [
+        value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in versions
+    ])
+    return '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def not_modified(request, etag, last_modified=None):
+    """A 304 response when If-None-Match / If-Modified-Since match, None when the body must be built."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None
+    )
+
+
+def set_validators(response, etag, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,318 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are kept in memory per process. When
+METRICS_MULTIPROC_DIR is set (e.g. one directory shared by all gunicorn
+workers), a background thread of every process writes a snapshot of its values to that
+directory at most METRICS_FLUSH_INTERVAL after they change, and the process serving `/metrics` merges all snapshots: counters and
+histograms are summed across processes (including exited ones), gauges are
+combined according to their `multiprocess_mode`.
+"""
+import atexit
+import glob
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return f'{float(value):.1f}'
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self._values = {}
+        self.registry.register(self)
+
+    def labels(self, **labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return _Child(self, tuple((name, str(labels[name])) for name in self.labelnames))
+
+    def _key(self, key):
+        if key is None:
+            if self.labelnames:
+                raise ValueError(f"{self.name} requires labels {self.labelnames}")
+            return ()
+        return key
+
+    def snapshot(self):
+        with self.registry.lock:
+            return [[list(map(list, key)), self._copy(value)] for key, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+
+class _Child:
+    def __init__(self, metric, key):
+        self.metric = metric
+        self.key = key
+
+    def __getattr__(self, name):
+        method = getattr(self.metric, name)
+        return lambda *args, **kwargs: method(*args, key=self.key, **kwargs)
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, key=None):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(key)
+        with self.registry.lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self.registry.changed()
+
+
+class Gauge(_Metric):
+    """
+    multiprocess_mode: 'livesum' sums the values of live processes, 'max' takes the maximum of all processes.
+    """
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, multiprocess_mode='livesum'):
+        self.multiprocess_mode = multiprocess_mode
+        super().__init__(name, documentation, labelnames, registry)
+
+    def set(self, value, key=None):
+        key = self._key(key)
+        with self.registry.lock:
+            self._values[key] = value
+        self.registry.changed()
+
+    def inc(self, amount=1, key=None):
+        key = self._key(key)
+        with self.registry.lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self.registry.changed()
+
+    def dec(self, amount=1, key=None):
+        self.inc(-amount, key=key)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), registry=None, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, key=None):
+        key = self._key(key)
+        with self.registry.lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+        self.registry.changed()
+
+    @contextmanager
+    def time(self, key=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, key=key)
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.metrics = {}
+        self.collectors = []
+        self._dirty = False
+        self._flusher_pid = None
+        self._pid = None
+        self._process_token = None
+
+    def register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def collector(self, func):
+        """
+        Registers a callable evaluated at scrape time. It yields (name, type, documentation, samples)
+        where samples is a list of (labels dict, value). Collected values are never aggregated across processes.
+        """
+        self.collectors.append(func)
+        return func
+
+    # Multi-process support
+
+    def multiproc_dir(self):
+        return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+    def process_token(self):
+        # Re-evaluated after fork (gunicorn --preload) so workers never share a snapshot file
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._process_token = f'{self._pid}_{uuid.uuid4().hex[:8]}'
+        return self._process_token
+
+    def changed(self):
+        if self.multiproc_dir():
+            self._dirty = True
+            self.start_flusher()
+
+    def start_flusher(self):
+        """
+        Starts the flush thread of this process once (again after a fork: threads do not survive it). Snapshots are
+        written by the timer rather than by the next change, so a worker that goes idle is never left behind.
+        """
+        with self._flush_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if not self._dirty:
+                continue
+            try:
+                self.flush()
+            except OSError:
+                # The directory may be gone for a moment; the next tick retries
+                self._dirty = True
+
+    def flush(self):
+        directory = self.multiproc_dir()
+        if not directory:
+            return
+        with self._flush_lock:
+            # Cleared before the snapshot: a change made while writing marks the registry dirty again
+            self._dirty = False
+            data = {
+                'pid': os.getpid(),
+                'metrics': {name: metric.snapshot() for name, metric in self.metrics.items()},
+            }
+            path = os.path.join(directory, f'metrics_{self.process_token()}.json')
+            temp_path = f'{path}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(temp_path, path)
+
+    def _merged_values(self):
+        """
+        Returns {metric name: {labels: value}} for this process or, in multi-process mode, for all processes.
+        """
+        directory = self.multiproc_dir()
+        if not directory:
+            return {name: dict((tuple(map(tuple, key)), value) for key, value in metric.snapshot())
+                    for name, metric in self.metrics.items()}
+
+        self.flush()
+        merged = {name: {} for name in self.metrics}
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            try:
+                with open(path, encoding='utf-8') as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(data['pid'])
+            for name, samples in data['metrics'].items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                if metric.type == 'gauge' and metric.multiprocess_mode == 'livesum' and not alive:
+                    continue
+                values = merged[name]
+                for key, value in samples:
+                    key = tuple(map(tuple, key))
+                    values[key] = _combine(metric, values.get(key), value)
+        return merged
+
+    # Exposition
+
+    def render(self):
+        lines = []
+        merged = self._merged_values()
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {_escape(metric.documentation)}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key, value in sorted(merged[name].items()):
+                if metric.type == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value[0]):
+                        cumulative += count
+                        labels = key + (('le', _format_value(bound) if bound != math.inf else '+Inf'),)
+                        lines.append(f'{name}_bucket{_format_labels(labels)} {_format_value(cumulative)}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {_format_value(value[1])}')
+                    lines.append(f'{name}_count{_format_labels(key)} {_format_value(value[2])}')
+                else:
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+
+        for collect in self.collectors:
+            for name, metric_type, documentation, samples in collect():
+                lines.append(f'# HELP {name} {_escape(documentation)}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(tuple(labels.items()))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _combine(metric, current, value):
+    if current is None:
+        return value
+    if metric.type == 'histogram':
+        return [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]]
+    if metric.type == 'gauge' and metric.multiprocess_mode == 'max':
+        return max(current, value)
+    return current + value
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+REGISTRY = Registry()
+
+atexit.register(REGISTRY.flush)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
@@ -0,0 +1,66 @@
+import time
+
+from app.core import tracing
+from app.core.metrics import Counter, Histogram
+
+
+class TracingMiddleware:
+    """
+    Opens a SERVER span for every HTTP request and traces the database writes it performs.
+    Views can attach `comment.id` to the active span so the request joins the comment's pipeline spans.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        attributes = {
+            'http.method': request.method,
+            'http.target': request.get_full_path(),
+        }
+        with tracing.span(f'HTTP {request.method}', attributes=attributes, kind='SERVER') as current:
+            with tracing.trace_db_writes():
+                response = self.get_response(request)
+
+            match = request.resolver_match
+            if match is not None:
+                current.set_attribute('http.route', match.route)
+                current.set_attribute('django.view', match.view_name)
+            current.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                current.set_status(tracing.STATUS_ERROR)
+            return response
+
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'HTTP requests by view, method and status code',
+    ['view', 'method', 'status'],
+)
+HTTP_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'HTTP request duration by view and method',
+    ['view', 'method'],
+)
+
+
+class MetricsMiddleware:
+    """
+    Counts requests and records latency per resolved view name (e.g. comments:comment_detail).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unresolved'
+        if view == 'metrics':
+            return response
+        HTTP_REQUESTS.labels(view=view, method=request.method, status=response.status_code).inc()
+        HTTP_DURATION.labels(view=view, method=request.method).observe(duration)
+        return response
@@ -0,0 +1,272 @@
+"""
+Span based tracing for the request and agent pipeline.
+
+Spans follow the OpenTelemetry data model (trace id, span id, parent span id,
+start/end unix nanoseconds, attributes and status) and are exported as one JSON
+object per line, so the output can be tailed on the console, kept in a local
+file or shipped to any collector that accepts OTLP-style JSON.
+
+Configured from settings:
+    TRACING_EXPORTER: 'none', 'console' or 'file'
+    TRACING_FILE: target path of the file exporter
+    TRACING_SERVICE_NAME: value of the service.name resource attribute
+"""
+import contextvars
+import json
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+STATUS_UNSET = 'UNSET'
+STATUS_OK = 'OK'
+STATUS_ERROR = 'ERROR'
+
+_WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class SpanContext:
+    """
+    Identifies a span so that work done elsewhere (another thread, a queue worker) can be parented to it.
+    """
+    __slots__ = ('trace_id', 'span_id')
+
+    def __init__(self, trace_id, span_id):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class Span:
+    """
+    A single timed operation. Use the `span()` context manager instead of creating spans directly.
+    """
+    is_recording = True
+
+    def __init__(self, name, parent=None, kind='INTERNAL', attributes=None, start_ns=None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.status_message = ''
+
+    @property
+    def context(self):
+        return SpanContext(self.trace_id, self.span_id)
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def add_to_attribute(self, key, value):
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def set_status(self, status, message=''):
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, exc):
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+        self.set_status(STATUS_ERROR, str(exc))
+
+    def end(self, end_ns=None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(self)
+
+    def to_dict(self):
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_span_id or '',
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'attributes': self.attributes,
+            'status': {'code': self.status, 'message': self.status_message},
+            'resource': {'service.name': settings.TRACING_SERVICE_NAME},
+        }
+
+
+class NonRecordingSpan:
+    """
+    Returned when tracing is disabled so callers never have to check for None.
+    """
+    is_recording = False
+    context = None
+    duration_ms = 0.0
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def add_to_attribute(self, key, value):
+        pass
+
+    def set_status(self, status, message=''):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+
+NON_RECORDING_SPAN = NonRecordingSpan()
+
+
+class ConsoleSpanExporter:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self.lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+
+class FileSpanExporter:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line + '\n')
+
+
+_exporter = None
+_exporter_key = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """
+    Returns the exporter configured in settings, or None when tracing is disabled.
+    """
+    global _exporter, _exporter_key
+
+    key = (settings.TRACING_EXPORTER, str(settings.TRACING_FILE))
+    if key != _exporter_key:
+        with _exporter_lock:
+            if key != _exporter_key:
+                if settings.TRACING_EXPORTER == 'console':
+                    _exporter = ConsoleSpanExporter()
+                elif settings.TRACING_EXPORTER == 'file':
+                    _exporter = FileSpanExporter(settings.TRACING_FILE)
+                else:
+                    _exporter = None
+                _exporter_key = key
+    return _exporter
+
+
+def is_enabled():
+    return get_exporter() is not None
+
+
+def current_span():
+    return _current_span.get() or NON_RECORDING_SPAN
+
+
+def capture_context():
+    """
+    Returns the SpanContext of the active span, to be handed over to work running elsewhere.
+    """
+    active = _current_span.get()
+    return active.context if active else None
+
+
+@contextmanager
+def span(name, attributes=None, parent=None, kind='INTERNAL'):
+    """
+    Starts a child span of `parent` (or of the active span) and makes it the active span.
+    Exceptions are recorded on the span and re-raised.
+    """
+    if not is_enabled():
+        yield NON_RECORDING_SPAN
+        return
+
+    if parent is None:
+        parent = capture_context()
+    current = Span(name, parent=parent, kind=kind, attributes=attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def record_span(name, start_ns, end_ns, attributes=None, parent=None):
+    """
+    Records an already finished interval, e.g. the time a comment spent waiting in the queue.
+    """
+    if not is_enabled():
+        return NON_RECORDING_SPAN
+
+    if parent is None:
+        parent = capture_context()
+    finished = Span(name, parent=parent, attributes=attributes, start_ns=start_ns)
+    finished.end(end_ns)
+    return finished
+
+
+def _db_write_wrapper(execute, sql, params, many, context):
+    if not sql.lstrip().upper().startswith(_WRITE_STATEMENTS):
+        return execute(sql, params, many, context)
+
+    attributes = {
+        'db.system': connection.vendor,
+        'db.statement': sql[:500],
+        'db.operation': sql.lstrip().split(' ', 1)[0].upper(),
+    }
+    with span('db.write', attributes=attributes, kind='CLIENT') as current:
+        result = execute(sql, params, many, context)
+        rowcount = getattr(context['cursor'], 'rowcount', -1)
+        if rowcount is not None and rowcount >= 0:
+            current.set_attribute('db.rows_affected', rowcount)
+        return result
+
+
+@contextmanager
+def trace_db_writes():
+    """
+    Emits a `db.write` span for every INSERT/UPDATE/DELETE executed on the default connection.
+    """
+    if not is_enabled():
+        yield
+        return
+
+    with connection.execute_wrapper(_db_write_wrapper):
+        yield
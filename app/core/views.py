@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+
+from app.core.metrics import REGISTRY, CONTENT_TYPE
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint, merged across worker processes when METRICS_MULTIPROC_DIR is set.
+    """
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,86 @@
+"""
+Memory and throughput of the streaming export (app/comments/export.py) for growing numbers of comments.
+
+    cd {PROJECT_PATH}/aia/comm && python benchmarks/export.py [--rows 100000 1000000] [--chunk-size 2000]
+
+Runs against a throw-away test database. Every comment has one analysis and a quality score. Peak memory is
+the tracemalloc peak while the export is consumed; it should stay flat as the row count grows.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'comm.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.utils import setup_databases, teardown_databases  # noqa: E402
+
+from app.comments.export import export_chunks  # noqa: E402
+from app.comments.models import Comment, CommentAnalyzer, CommentQualityScore  # noqa: E402
+
+
+def populate(start, stop, batch_size=5000):
+    for first in range(start, stop, batch_size):
+        last = min(first + batch_size, stop)
+        comments = Comment.objects.bulk_create([
+            Comment(
+                source='bench', customer_id=f'CUST{index % 50000:05d}', product_name='iPhone 14 Pro',
+                content_id=f'CONT{index:07d}', content='Bataryası çabuk bitiyor, kargo da gecikti.',
+                web_url=f'https://example.com/{index}', response='Değerli yorumunuz için teşekkür ederiz.',
+                status='WAITING_FOR_APPROVE',
+            )
+            for index in range(first, last)
+        ])
+        CommentAnalyzer.objects.bulk_create([
+            CommentAnalyzer(
+                comment=comment, sentiment='negatif', sentiment_score=3, category='şikayet', urgency='orta',
+                keywords='batarya,kargo', summary='Batarya ve kargo şikayeti', main_issue='batarya', required_action=True,
+                response_tone='empatik', response=comment.response, quality_control='',
+            )
+            for comment in comments
+        ])
+        CommentQualityScore.objects.bulk_create([
+            CommentQualityScore(comment=comment, professionalism=8, relevance=8, warmth=7, solution_focus=8, overall=8)
+            for comment in comments
+        ])
+
+
+def measure(output, compression, chunk_size):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in export_chunks(Comment.objects.all(), output, compression, chunk_size))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    config = setup_databases(verbosity=0, interactive=False)
+    try:
+        stored = 0
+        print(f'{"rows":>10}{"output":>14}{"seconds":>10}{"rows/s":>10}{"MB out":>10}{"peak MB":>10}')
+        for rows in sorted(args.rows):
+            populate(stored, rows)
+            stored = rows
+            for output, compression in [('csv', None), ('ndjson', None), ('ndjson', 'zstd')]:
+                elapsed, size, peak = measure(output, compression, args.chunk_size)
+                label = output + ('+zstd' if compression else '')
+                print(f'{rows:>10}{label:>14}{elapsed:>10.1f}{rows / elapsed:>10.0f}{size / 1e6:>10.1f}{peak / 1e6:>10.1f}')
+    finally:
+        teardown_databases(config, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
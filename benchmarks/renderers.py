@@ -0,0 +1,79 @@
+"""
+Compares DRF's JSONRenderer and JSONParser with their orjson versions on a 10k comment list response.
+
+    cd {PROJECT_PATH}/aia/comm && python benchmarks/renderers.py [--rows 10000] [--repeat 20]
+
+No database is needed: the payload is built from unsaved comments serialized by CommentListSerializer,
+wrapped in the usual status/message/payload envelope.
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'comm.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from app.comments.api.serializers import CommentListSerializer  # noqa: E402
+from app.comments.models import Comment  # noqa: E402
+from app.core.api.parsers import ORJSONParser  # noqa: E402
+from app.core.api.renderers import ORJSONRenderer  # noqa: E402
+
+
+def build_payload(rows):
+    now = timezone.now()
+    comments = [
+        Comment(
+            id=index,
+            source='trendyol',
+            customer_id=f'CUST{index:06d}',
+            product_name='iPhone 14 Pro',
+            content_id=f'CONT{index:06d}',
+            content='Ürün çok hızlı geldi, paketleme özenliydi. Batarya ömrü beklediğimden kısa. ' * 3,
+            web_url=f'https://example.com/review/{index}',
+            response='Değerli yorumunuz için teşekkür ederiz, geri bildiriminizi ekibimize ilettik.',
+            status='WAITING_FOR_APPROVE',
+            created=now - timedelta(seconds=index),
+            updated=now,
+        )
+        for index in range(rows)
+    ]
+    return {'status': 'true', 'message': 'successful', 'payload': CommentListSerializer(comments, many=True).data}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    data = build_payload(args.rows)
+    renderers = {'JSONRenderer': JSONRenderer(), 'ORJSONRenderer': ORJSONRenderer()}
+
+    body = renderers['JSONRenderer'].render(data)
+    assert renderers['ORJSONRenderer'].render(data) == body, 'Renderers disagree'
+    print(f'{args.rows} comments, {len(body) / 1024 / 1024:.1f} MiB, best of {args.repeat}')
+
+    results = {}
+    for name, renderer in renderers.items():
+        results[name] = min(timeit.repeat(lambda: renderer.render(data), number=1, repeat=args.repeat))
+        print(f'  render  {name:<15} {results[name] * 1000:8.1f} ms')
+    print(f'  speedup {results["JSONRenderer"] / results["ORJSONRenderer"]:.1f}x')
+
+    for name, json_parser in {'JSONParser': JSONParser(), 'ORJSONParser': ORJSONParser()}.items():
+        seconds = min(timeit.repeat(lambda: json_parser.parse(io.BytesIO(body)), number=1, repeat=args.repeat))
+        print(f'  parse   {name:<15} {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -48,9 +48,14 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
+    'django_filters',
 ]
 
 MIDDLEWARE = [
+    # Project Middlewares
+    'app.core.middlewares.TracingMiddleware',
+    'app.core.middlewares.MetricsMiddleware',
+
     # Django Built-in Middlewares
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -128,10 +133,16 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication'
     ],
-# 'DEFAULT_RENDERER_CLASSES': [
-    #     'rest_framework.renderers.JSONRenderer',
-    #     'rest_framework.renderers.BrowsableAPIRenderer',
-    # ]
+    # orjson-backed drop-in replacements of JSONRenderer and JSONParser
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.core.api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'app.core.api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     # 'DEFAULT_AUTHENTICATION_CLASSES': [
     #     'rest_framework_simplejwt.authentication.JWTAuthentication',
     #     'rest_framework.authentication.SessionAuthentication'
@@ -166,6 +177,67 @@ SIMPLE_JWT = {
 
 CORS_ORIGIN_ALLOW_ALL = True
 
+# Comment Agent
+# 'thread' runs queued comments on a background pool, 'inline' processes them within the request.
+# The pool is best-effort: comments queued when a worker stops are picked up again by `manage.py requeue_comments`
+COMMENT_AGENT_DISPATCH = os.getenv('COMMENT_AGENT_DISPATCH', 'thread')
+COMMENT_AGENT_WORKERS = int(os.getenv('COMMENT_AGENT_WORKERS', '2'))
+COMMENT_AGENT_BATCH_SIZE = 20
+COMMENT_REQUEUE_AFTER_MINUTES = 15  # WAITING_FOR_ANSWER comments untouched for this long are requeued
+COMMENT_REQUEUE_MAX_ATTEMPTS = 3  # then they are moved to ERROR
+COMMENT_BULK_MAX_ITEMS = 5000
+COMMENT_INGEST_CHUNK_SIZE = 500
+COMMENT_EXPORT_CHUNK_SIZE = 2000
+COMMENT_REPORT_CHUNK_SIZE = 5000
+# Keyset pagination of the comment list endpoints (?page_size=)
+COMMENT_PAGE_SIZE = 50
+COMMENT_MAX_PAGE_SIZE = 500
+# Analysis history of one comment (comments/<id>/analyses): rows carry the full generated response
+COMMENT_ANALYSES_PAGE_SIZE = 10
+# Comments per comments/batch?ids= request
+COMMENT_BATCH_MAX_IDS = 100
+COMMENT_SEARCH_LIMIT = 20
+COMMENT_TOP_TERMS_LIMIT = 20
+# Trending keywords/issues (app.comments.trending): a window of WINDOW_BUCKETS buckets of BUCKET_SECONDS is compared
+# with an exponentially weighted baseline of the buckets before it. The sketches are stored in the database and shared
+# by every process: changing BUCKET_SECONDS, SKETCH_WIDTH or SKETCH_DEPTH invalidates the stored counters
+COMMENT_TRENDING_BUCKET_SECONDS = 60
+COMMENT_TRENDING_WINDOW_BUCKETS = 15
+COMMENT_TRENDING_BASELINE_ALPHA = 0.05
+COMMENT_TRENDING_SKETCH_WIDTH = 2048
+COMMENT_TRENDING_SKETCH_DEPTH = 4
+COMMENT_TRENDING_MIN_COUNT = 5
+COMMENT_TRENDING_RATIO = 3.0
+# Issue clusters (app.comments.clustering): mini-batch k-means over hashed n-grams of the comments with these sentiments
+COMMENT_CLUSTER_COUNT = 20
+COMMENT_CLUSTER_FEATURES = 4096
+COMMENT_CLUSTER_BATCH_SIZE = 256
+COMMENT_CLUSTER_SENTIMENTS = ['negatif']
+
+# Cache
+# Read endpoints are cached and invalidated by version keys on every write. locmem is per process:
+# with several workers use a shared backend (CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache, redis, ...)
+# and for the management commands that rebuild cached data, which refuse to run on locmem
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'ai-agent-commenter'),
+    }
+}
+COMMENT_CACHE_ALIAS = 'default'
+COMMENT_CACHE_TIMEOUT = int(os.getenv('COMMENT_CACHE_TIMEOUT', '300'))  # 0 disables the response cache
+
+# Tracing
+# Spans are exported as OpenTelemetry-style JSON lines: 'none', 'console' or 'file'
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'none')
+TRACING_FILE = os.getenv('TRACING_FILE', os.path.join(BASE_DIR, 'traces.jsonl'))
+TRACING_SERVICE_NAME = 'ai-agent-commenter'
+
+# Metrics
+# Set PROMETHEUS_MULTIPROC_DIR to a directory shared by all gunicorn workers to aggregate /metrics across processes
+METRICS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+METRICS_FLUSH_INTERVAL = 1.0  # Seconds between the snapshots a worker writes after its metrics change
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
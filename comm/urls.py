@@ -17,12 +17,14 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
+from app.core.views import metrics_view
 from comm import settings
 
 urlpatterns = [
     # Built-in URLs
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
+    path('metrics', metrics_view, name='metrics'),
 
     # Domain URLs
     path("api/v1/comments/", include("app.comments.api.urls"), name="comments"),
@@ -1,5 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from app.comments import metrics
+from app.core import tracing
 from integrations.ai.agents.agent_comment.llm import claude
 
+_executor = None
+_executor_lock = threading.Lock()
+
 
 def create(id: int, content: str):
-    claude.execute(id, content)
+    parent = tracing.capture_context()
+    enqueued_at = time.time_ns()
+    metrics.QUEUE_DEPTH.inc()
+    _process(id, content, parent, enqueued_at)
+
+
+def enqueue_many(items: List[Tuple[int, str]], inline: bool = False):
+    """
+    Queues (id, content) pairs for the agent in batches of COMMENT_AGENT_BATCH_SIZE.
+    Each batch shares one agent instance and runs on the background pool, or inline
+    when COMMENT_AGENT_DISPATCH is 'inline' or `inline` is given.
+
+    The pool lives in memory: batches still queued when the process stops are lost and their
+    comments stay WAITING_FOR_ANSWER until `manage.py requeue_comments` dispatches them again.
+    """
+    parent = tracing.capture_context()
+    enqueued_at = time.time_ns()
+    batch_size = settings.COMMENT_AGENT_BATCH_SIZE
+
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        metrics.QUEUE_DEPTH.inc(len(batch))
+        if inline or settings.COMMENT_AGENT_DISPATCH == 'inline':
+            _process_batch(batch, parent, enqueued_at)
+        else:
+            _get_executor().submit(_run_in_worker, batch, parent, enqueued_at)
+
+
+def _get_executor():
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.COMMENT_AGENT_WORKERS,
+                    thread_name_prefix='comment-agent'
+                )
+    return _executor
+
+
+def _run_in_worker(batch, parent, enqueued_at: int):
+    try:
+        _process_batch(batch, parent, enqueued_at)
+    finally:
+        # Worker threads own their connection, release it once the batch is done
+        connection.close()
+
+
+def _process_batch(batch, parent, enqueued_at: int):
+    try:
+        agent = claude.build_agent()
+    except Exception as e:
+        print(f"Error: {e}")
+        agent = None
+
+    for id, content in batch:
+        _process(id, content, parent, enqueued_at, agent)
+
+
+def _process(id: int, content: str, parent, enqueued_at: int, agent=None):
+    # Time between the API accepting the comment and the agent picking it up
+    metrics.QUEUE_DEPTH.dec()
+    tracing.record_span('queue.wait', enqueued_at, time.time_ns(), attributes={'comment.id': id}, parent=parent)
+    claude.execute(id, content, parent=parent, agent=agent)
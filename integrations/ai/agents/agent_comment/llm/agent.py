@@ -6,6 +6,8 @@ from datetime import datetime
 
 from langchain_anthropic import ChatAnthropic
 from langchain.memory import ConversationBufferMemory
+from app.core import tracing
+from .callbacks import TracingCallbackHandler
 from .chains import setup_chains
 from .utils import load_reviews_from_text
 from .analysis import analyze_review
@@ -23,8 +25,10 @@ class ECommerceReviewAgent:
             model=model_name,
             anthropic_api_key=anthropic_api_key or os.getenv("ANTHROPIC_API_KEY"),
             temperature=0.7,
-            max_tokens=1000
+            max_tokens=1000,
+            callbacks=[TracingCallbackHandler()]
         )
+        self.model_name = model_name
         self.memory = ConversationBufferMemory(return_messages=True)
         self.analysis_chain, self.response_chain, self.quality_chain = setup_chains(self.llm)
 
@@ -34,31 +38,32 @@ class ECommerceReviewAgent:
         results = []
 
         for i, review_data in enumerate(reviews, 1):
-            analysis = analyze_review(self.analysis_chain, review_data['review'])
+            with tracing.span('review.process', attributes={'review.index': i, 'llm.model': self.model_name}):
+                analysis = analyze_review(self.analysis_chain, review_data['review'])
 
-            if 'error' not in analysis:
-                response = generate_response(self.response_chain, review_data, analysis)
-                quality = {}
+                if 'error' not in analysis:
+                    response = generate_response(self.response_chain, review_data, analysis)
+                    quality = {}
 
-                if enable_quality_check:
-                    quality = quality_check(self.quality_chain, review_data['review'], response)
+                    if enable_quality_check:
+                        quality = quality_check(self.quality_chain, review_data['review'], response)
 
-                result = {
-                    'original': review_data,
-                    'analysis': analysis,
-                    'generated_response': response,
-                    'quality_check': quality,
-                    'processed_at': datetime.now().isoformat()
-                }
-            else:
-                result = {
-                    'original': review_data,
-                    'analysis': analysis,
-                    'generated_response': "Response could not be generated due to analysis error.",
-                    'quality_check': {},
-                    'processed_at': datetime.now().isoformat()
-                }
-            results.append(result)
+                    result = {
+                        'original': review_data,
+                        'analysis': analysis,
+                        'generated_response': response,
+                        'quality_check': quality,
+                        'processed_at': datetime.now().isoformat()
+                    }
+                else:
+                    result = {
+                        'original': review_data,
+                        'analysis': analysis,
+                        'generated_response': "Response could not be generated due to analysis error.",
+                        'quality_check': {},
+                        'processed_at': datetime.now().isoformat()
+                    }
+                results.append(result)
         return results
 
     def save_results(self, id: int, results: List[Dict]):
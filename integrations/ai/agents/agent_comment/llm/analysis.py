@@ -2,33 +2,40 @@ import json
 
 from typing import Dict
 
+from app.comments import metrics
+from app.core import tracing
+
 """Analyzes the review using Claude."""
 def analyze_review(analysis_chain, review: str) -> Dict:
-    try:
-        analysis_result = analysis_chain.run(review=review)
-
+    with tracing.span('chain.analysis', attributes={'review.length': len(review)}) as span, \
+            metrics.CHAIN_DURATION.labels(chain='analysis').time():
         try:
-            json_start = analysis_result.find('{')
-            json_end = analysis_result.rfind('}') + 1
-            if json_start != -1 and json_end != -1:
-                json_str = analysis_result[json_start:json_end]
-                analysis = json.loads(json_str)
-            else:
-                raise ValueError("JSON not found")
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"⚠️ JSON parse error, using default analysis: {e}")
-            analysis = {
-                "sentiment": "neutral",
-                "sentiment_score": 5,
-                "category": "general",
-                "urgency": "medium",
-                "keywords": ["customer", "review"],
-                "summary": review[:100] + "..." if len(review) > 100 else review,
-                "main_issues": ["could not analyze"],
-                "requires_action": True,
-                "response_tone": "friendly"
-            }
-        return analysis
-    except Exception as e:
-        print(f"❌ Analysis error: {e}")
-        return {"error": str(e)}
+            analysis_result = analysis_chain.run(review=review)
+
+            try:
+                json_start = analysis_result.find('{')
+                json_end = analysis_result.rfind('}') + 1
+                if json_start != -1 and json_end != -1:
+                    json_str = analysis_result[json_start:json_end]
+                    analysis = json.loads(json_str)
+                else:
+                    raise ValueError("JSON not found")
+            except (json.JSONDecodeError, ValueError) as e:
+                print(f"⚠️ JSON parse error, using default analysis: {e}")
+                span.set_attribute('analysis.fallback', True)
+                analysis = {
+                    "sentiment": "neutral",
+                    "sentiment_score": 5,
+                    "category": "general",
+                    "urgency": "medium",
+                    "keywords": ["customer", "review"],
+                    "summary": review[:100] + "..." if len(review) > 100 else review,
+                    "main_issues": ["could not analyze"],
+                    "requires_action": True,
+                    "response_tone": "friendly"
+                }
+            return analysis
+        except Exception as e:
+            print(f"❌ Analysis error: {e}")
+            span.record_exception(e)
+            return {"error": str(e)}
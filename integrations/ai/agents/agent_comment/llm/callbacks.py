@@ -0,0 +1,40 @@
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.comments import metrics
+from app.core import tracing
+
+
+# Callback handler that attaches model name and token usage to the active chain span and token metrics
+class TracingCallbackHandler(BaseCallbackHandler):
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        span = tracing.current_span()
+        llm_output = response.llm_output or {}
+        model_name = llm_output.get('model_name') or llm_output.get('model')
+        if model_name:
+            span.set_attribute('llm.model', model_name)
+
+        input_tokens, output_tokens = token_usage(response)
+        span.add_to_attribute('llm.usage.input_tokens', input_tokens)
+        span.add_to_attribute('llm.usage.output_tokens', output_tokens)
+
+        model_label = model_name or 'unknown'
+        metrics.LLM_TOKENS.labels(model=model_label, type='input').inc(input_tokens)
+        metrics.LLM_TOKENS.labels(model=model_label, type='output').inc(output_tokens)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        tracing.current_span().record_exception(error)
+
+
+def token_usage(response: LLMResult):
+    """Sums input/output tokens over all generations of an LLM result."""
+    input_tokens = output_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, 'message', None)
+            usage = getattr(message, 'usage_metadata', None) or {}
+            input_tokens += usage.get('input_tokens', 0)
+            output_tokens += usage.get('output_tokens', 0)
+    return input_tokens, output_tokens
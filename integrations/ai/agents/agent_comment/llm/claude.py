@@ -1,27 +1,41 @@
 import os
 
 from dotenv import load_dotenv
+from app.comments import metrics
+from app.core import tracing
 from .agent import ECommerceReviewAgent
 
 load_dotenv()
 
-def execute(id, content):
+MODEL_NAME = "claude-3-5-sonnet-20241022"
+
+def build_agent():
     API_KEY = os.getenv("ANTHROPIC_API_KEY")
 
-    try:
-        # Run Agent
-        agent = ECommerceReviewAgent(
-            anthropic_api_key=API_KEY,
-            model_name="claude-3-5-sonnet-20241022"
-        )
-
-        # Process Comments
-        results = agent.process_all_reviews(
-            content=content,
-            enable_quality_check=True  # Enable Quality Check
-        )
-
-        # Save Results
-        agent.save_results(id, results)
-    except Exception as e:
-        print(f"Error: {e}")
+    return ECommerceReviewAgent(
+        anthropic_api_key=API_KEY,
+        model_name=MODEL_NAME
+    )
+
+def execute(id, content, parent=None, agent=None):
+    attributes = {'comment.id': id, 'llm.model': MODEL_NAME, 'content.length': len(content)}
+    with tracing.span('comment.process', attributes=attributes, parent=parent) as span, tracing.trace_db_writes(), \
+            metrics.PIPELINE_DURATION.time():
+        try:
+            # Run Agent, reused across a batch when given
+            agent = agent or build_agent()
+
+            # Process Comments
+            results = agent.process_all_reviews(
+                content=content,
+                enable_quality_check=True  # Enable Quality Check
+            )
+            span.set_attribute('review.count', len(results))
+
+            # Save Results
+            agent.save_results(id, results)
+            metrics.COMMENTS_PROCESSED.labels(outcome='success').inc()
+        except Exception as e:
+            span.record_exception(e)
+            metrics.COMMENTS_PROCESSED.labels(outcome='error').inc()
+            print(f"Error: {e}")
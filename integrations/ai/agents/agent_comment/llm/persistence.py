@@ -1,57 +1,131 @@
-from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from django.db import transaction
+
 from app.comments.models import Comment, CommentAnalyzer, CommentQualityScore
+from app.comments.signals import comments_changed
+from app.comments import metrics, rollups, summaries, trending
+from app.comments.terms import index_analyses
+from app.comments.transitions import transition
+from app.core import tracing
+
+QUALITY_SCORE_FIELDS = ['professionalism', 'relevance', 'warmth', 'solution_focus', 'overall']
 
 # Persistence function for saving results to the database
 def save_results(id: int, results: List[Dict]):
+    """
+    Saves every result of a comment inside one transaction with a fixed number of queries,
+    whatever the number of reviews: one UPDATE of the comment, one bulk INSERT of the analyses,
+    one upsert of the quality score, one UPDATE of the comment summary, three queries of the keyword
+    index and two of the analytics rollups.
+    """
+    attributes = {'comment.id': id, 'result.count': len(results)}
+    with tracing.span('persistence.save_results', attributes=attributes) as span, \
+            metrics.PERSISTENCE_DURATION.time():
+        try:
+            if not results:
+                raise ValueError("No results to save")
+
+            analyzers = [build_analyzer(id, result) for result in results]
+            quality_score = build_quality_score(id, results)
+
+            with transaction.atomic():
+                # The first review's response is the answer of the comment, every response is kept on its analysis.
+                # A comment moderated while the agent ran keeps its status and response, only the analyses are added.
+                updated = transition(id, 'WAITING_FOR_APPROVE', response=results[0]['generated_response'])
+                # Read before the quality score is replaced: the rollups take the previous score out
+                comment = Comment.objects.filter(id=id).values(
+                    'status', 'product_name', 'created', 'quality_score__overall'
+                ).first()
+                if comment is None:
+                    raise Comment.DoesNotExist(f"Comment {id} does not exist")
+                if not updated:
+                    span.set_attribute('comment.status', comment['status'])
+                    span.set_attribute('comment.transition_skipped', True)
+
+                CommentAnalyzer.objects.bulk_create(analyzers)
+                index_analyses(analyzers)
+                if quality_score:
+                    CommentQualityScore.objects.bulk_create(
+                        [quality_score],
+                        update_conflicts=True,
+                        unique_fields=['comment'],
+                        update_fields=QUALITY_SCORE_FIELDS + ['feedback', 'approved', 'updated']
+                    )
+                # The last result is the latest analysis (same analyzed_at, highest id)
+                summaries.update_summary(id, analyzers[-1], quality_score)
+                rollups.record_results(
+                    comment['product_name'],
+                    comment['created'],
+                    analyzers,
+                    quality_overall=quality_score.overall if quality_score else None,
+                    previous_overall=comment['quality_score__overall']
+                )
+                # Analyses are bulk inserted without post_save, even when the status was left alone
+                comments_changed.send(sender=Comment, comment_ids=[id])
+                transaction.on_commit(lambda: record_trending(comment['product_name'], analyzers))
+            metrics.PERSISTENCE_RESULTS.labels(outcome='success').inc()
+        except Exception as e:
+            span.record_exception(e)
+            metrics.PERSISTENCE_RESULTS.labels(outcome='error').inc()
+            print(f"❌ Error while saving results: {e}")
+
+
+def record_trending(product_name: str, analyzers: List[CommentAnalyzer]):
+    """Runs after the commit: a failure here leaves the saved results and their persistence outcome alone."""
     try:
-        comment = Comment.objects.get(id=id)
-        result = results[0]
-        original = result['original']
-        analysis = result['analysis']
-        response = result['generated_response']
-        quality = result.get('quality_check', {})
-
-        # Update Comment Model
-        comment.response = response
-        comment.status = "WAITING_FOR_APPROVE"
-        comment.save()
-
-        # Customer original['customer']
-        # Product original['product']
-        # Rating original.get('rating', 'N/A')
-        # Date original['date']
-        # Comment original['review']
-        # Emotion/Sentiment analysis['sentiment'] (analysis['sentiment_score']/10)
-
-        # Create CommentAnalyzer
-        analyzer = CommentAnalyzer(
-            comment=comment,
-            analyzed_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            sentiment=analysis.get('sentiment', 'N/A'),
-            sentiment_score=analysis.get('sentiment_score', 'N/A'),
-            category=analysis.get('category', 'N/A'),
-            urgency=analysis.get('urgency', 'N/A'),
-            keywords=','.join(analysis.get('keywords', [])),
-            summary=analysis.get('summary', ''),
-            main_issue=','.join(analysis.get('main_issues', [])),
-            required_action=analysis.get('requires_action', False),
-            response_tone=analysis.get('tone', 'professional'),
-            response=response,
-            quality_control=str(quality.get('scores', {})) if quality else ''
-        )
-        analyzer.save()
-        if quality and 'scores' in quality:
-            scores = quality['scores']
-            CommentQualityScore.objects.create(
-                comment=comment,
-                professionalism=scores.get('professionalism', 0),
-                relevance=scores.get('relevance', 0),
-                warmth=scores.get('warmth', 0),
-                solution_focus=scores.get('solution_focus', 0),
-                overall=scores.get('overall', 0),
-                feedback=quality.get('feedback', ''),
-                approved=quality.get('approved', False)
-            )
+        trending.record(product_name, analyzers)
     except Exception as e:
-        print(f"❌ Error while saving results: {e}")
+        print(f"❌ Error while recording trending terms: {e}")
+
+
+def build_analyzer(id: int, result: Dict) -> CommentAnalyzer:
+    # Customer original['customer']
+    # Product original['product']
+    # Rating original.get('rating', 'N/A')
+    # Date original['date']
+    # Comment original['review']
+    # Emotion/Sentiment analysis['sentiment'] (analysis['sentiment_score']/10)
+    analysis = result['analysis']
+    quality = result.get('quality_check', {})
+
+    return CommentAnalyzer(
+        comment_id=id,
+        sentiment=analysis.get('sentiment', 'N/A'),
+        sentiment_score=to_float(analysis.get('sentiment_score')),
+        category=analysis.get('category', 'N/A'),
+        urgency=analysis.get('urgency', 'N/A'),
+        keywords=','.join(analysis.get('keywords', [])),
+        summary=analysis.get('summary', ''),
+        main_issue=','.join(analysis.get('main_issues', [])),
+        required_action=analysis.get('requires_action', False),
+        response_tone=analysis.get('response_tone', analysis.get('tone', 'professional')),
+        response=result['generated_response'],
+        quality_control=str(quality.get('scores', {})) if quality else ''
+    )
+
+
+def build_quality_score(id: int, results: List[Dict]) -> Optional[CommentQualityScore]:
+    """A comment has one quality score: the average of the scores of its reviews."""
+    checks = [result['quality_check'] for result in results if 'scores' in result.get('quality_check', {})]
+    if not checks:
+        return None
+
+    scores = {
+        field: round(sum(check['scores'].get(field, 0) for check in checks) / len(checks))
+        for field in QUALITY_SCORE_FIELDS
+    }
+    feedback = '\n'.join(dict.fromkeys(check['feedback'] for check in checks if check.get('feedback')))
+    return CommentQualityScore(
+        comment_id=id,
+        feedback=feedback,
+        approved=all(check.get('approved', False) for check in checks),
+        **scores
+    )
+
+
+def to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
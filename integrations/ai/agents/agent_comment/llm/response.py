@@ -2,19 +2,25 @@ import json
 
 from typing import Dict
 
+from app.comments import metrics
+from app.core import tracing
+
 """Generates a response for the review using Claude."""
 def generate_response(response_chain, review_data: Dict, analysis: Dict) -> str:
-    try:
-        response = response_chain.run(
-            customer_name=review_data['customer'],
-            product_name=review_data['product'],
-            review=review_data['review'],
-            analysis=json.dumps(analysis, ensure_ascii=False, indent=2)
-        )
-        return response.strip()
-    except Exception as e:
-        print(f"❌ Response generation error: {e}")
-        return """Değerli müşterimiz,
+    with tracing.span('chain.response') as span, \
+            metrics.CHAIN_DURATION.labels(chain='response').time():
+        try:
+            response = response_chain.run(
+                customer_name=review_data['customer'],
+                product_name=review_data['product'],
+                review=review_data['review'],
+                analysis=json.dumps(analysis, ensure_ascii=False, indent=2)
+            )
+            return response.strip()
+        except Exception as e:
+            print(f"❌ Response generation error: {e}")
+            span.record_exception(e)
+            return """Değerli müşterimiz,
 
         Yorumunuz için teşekkür ederiz. Şu anda sistemimizde geçici bir sorun yaşanmaktadır.
         Lütfen daha sonra tekrar deneyin veya müşteri hizmetlerimizle iletişime geçin.